@@ -35,6 +35,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -53,6 +54,8 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            # SQLite cannot ALTER most table properties; batch mode recreates the table.
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
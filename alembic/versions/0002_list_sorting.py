@@ -0,0 +1,58 @@
+"""list sorting: sort indexes and precomputed rating stats
+
+Revision ID: 0002_list_sorting
+Revises: 0001_initial
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002_list_sorting"
+down_revision: Union[str, None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_movies_release_year_id", "movies", ["release_year", "id"])
+    op.create_index("ix_movies_title_id", "movies", ["title", "id"])
+
+    op.create_table(
+        "movie_rating_stats",
+        sa.Column("movie_id", sa.Integer(), primary_key=True),
+        sa.Column("ratings_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ratings_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("average_rating", sa.Float(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["movie_id"], ["movies.id"]),
+    )
+    op.execute(
+        """
+        INSERT INTO movie_rating_stats (movie_id, ratings_count, ratings_sum, average_rating)
+        SELECT m.id, COUNT(r.id), COALESCE(SUM(r.score), 0), COALESCE(AVG(r.score), 0)
+        FROM movies m
+        LEFT JOIN movie_ratings r ON r.movie_id = m.id
+        GROUP BY m.id
+        """
+    )
+    op.create_index(
+        "ix_movie_rating_stats_average_rating",
+        "movie_rating_stats",
+        ["average_rating", "movie_id"],
+    )
+    op.create_index(
+        "ix_movie_rating_stats_ratings_count",
+        "movie_rating_stats",
+        ["ratings_count", "movie_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movie_rating_stats_ratings_count", table_name="movie_rating_stats")
+    op.drop_index("ix_movie_rating_stats_average_rating", table_name="movie_rating_stats")
+    op.drop_table("movie_rating_stats")
+    op.drop_index("ix_movies_title_id", table_name="movies")
+    op.drop_index("ix_movies_release_year_id", table_name="movies")
@@ -0,0 +1,28 @@
+"""director filmography index
+
+Revision ID: 0003_director_filmography
+Revises: 0002_list_sorting
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003_director_filmography"
+down_revision: Union[str, None] = "0002_list_sorting"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_movies_director_id_release_year",
+        "movies",
+        ["director_id", "release_year", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movies_director_id_release_year", table_name="movies")
@@ -0,0 +1,28 @@
+"""movie_genres lookup by genre
+
+Revision ID: 0004_genre_movies_index
+Revises: 0003_director_filmography
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0004_genre_movies_index"
+down_revision: Union[str, None] = "0003_director_filmography"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_movie_genres_genre_id_movie_id",
+        "movie_genres",
+        ["genre_id", "movie_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movie_genres_genre_id_movie_id", table_name="movie_genres")
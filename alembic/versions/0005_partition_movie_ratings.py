@@ -0,0 +1,112 @@
+"""partition movie_ratings by created_at
+
+Revision ID: 0005_partition_movie_ratings
+Revises: 0004_genre_movies_index
+Create Date: 2026-10-19 00:00:00.000000
+
+On PostgreSQL, `movie_ratings` is rebuilt as a table range-partitioned by
+`created_at`: one partition per month from the oldest rating through three
+months ahead, plus a DEFAULT partition. The primary key becomes
+(id, created_at), since a partitioned table's unique keys must include the
+partition key; ids still come from the same sequence. Existing rows are
+copied, so run it in a maintenance window on large tables.
+
+Other dialects only get the `movie_id` index.
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0005_partition_movie_ratings"
+down_revision: Union[str, None] = "0004_genre_movies_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.create_index("ix_movie_ratings_movie_id", "movie_ratings", ["movie_id"])
+        return
+
+    op.execute("ALTER TABLE movie_ratings RENAME TO movie_ratings_unpartitioned")
+    op.execute(
+        "ALTER TABLE movie_ratings_unpartitioned "
+        "RENAME CONSTRAINT movie_ratings_pkey TO movie_ratings_unpartitioned_pkey"
+    )
+    op.execute(
+        """
+        CREATE TABLE movie_ratings (
+            id integer NOT NULL DEFAULT nextval('movie_ratings_id_seq'::regclass),
+            movie_id integer NOT NULL REFERENCES movies (id),
+            score integer NOT NULL,
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT movie_ratings_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE INDEX ix_movie_ratings_movie_id ON movie_ratings (movie_id)")
+    op.execute("CREATE TABLE movie_ratings_default PARTITION OF movie_ratings DEFAULT")
+
+    oldest = bind.exec_driver_sql("SELECT min(created_at) FROM movie_ratings_unpartitioned").scalar()
+    today = datetime.now(timezone.utc).date()
+    first = oldest.astimezone(timezone.utc).date() if oldest else today
+    month = date(first.year, first.month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE movie_ratings_p{month.year:04d}_{month.month:02d} "
+            f"PARTITION OF movie_ratings FOR VALUES "
+            f"FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+
+    op.execute(
+        "INSERT INTO movie_ratings (id, movie_id, score, created_at) "
+        "SELECT id, movie_id, score, created_at FROM movie_ratings_unpartitioned"
+    )
+    # Keep the sequence when the old table goes, and let pg_get_serial_sequence find it.
+    op.execute("ALTER SEQUENCE movie_ratings_id_seq OWNED BY movie_ratings.id")
+    op.execute("DROP TABLE movie_ratings_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.drop_index("ix_movie_ratings_movie_id", table_name="movie_ratings")
+        return
+
+    op.execute("ALTER TABLE movie_ratings RENAME TO movie_ratings_partitioned")
+    op.execute(
+        "ALTER TABLE movie_ratings_partitioned "
+        "RENAME CONSTRAINT movie_ratings_pkey TO movie_ratings_partitioned_pkey"
+    )
+    op.execute(
+        """
+        CREATE TABLE movie_ratings (
+            id integer NOT NULL DEFAULT nextval('movie_ratings_id_seq'::regclass),
+            movie_id integer NOT NULL REFERENCES movies (id),
+            score integer NOT NULL,
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT movie_ratings_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO movie_ratings (id, movie_id, score, created_at) "
+        "SELECT id, movie_id, score, created_at FROM movie_ratings_partitioned"
+    )
+    op.execute("ALTER SEQUENCE movie_ratings_id_seq OWNED BY movie_ratings.id")
+    # Detached (archived) partitions are standalone tables and are left alone.
+    op.execute("DROP TABLE movie_ratings_partitioned CASCADE")
+    op.execute("CREATE INDEX ix_movie_ratings_movie_id ON movie_ratings (movie_id)")
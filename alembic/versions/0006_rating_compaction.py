@@ -0,0 +1,35 @@
+"""daily rating summaries for compaction
+
+Revision ID: 0006_rating_compaction
+Revises: 0005_partition_movie_ratings
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006_rating_compaction"
+down_revision: Union[str, None] = "0005_partition_movie_ratings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "movie_rating_daily",
+        sa.Column("movie_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("ratings_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["movie_id"], ["movies.id"]),
+        sa.PrimaryKeyConstraint("movie_id", "day", "score"),
+    )
+    op.create_index("ix_movie_ratings_created_at", "movie_ratings", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movie_ratings_created_at", table_name="movie_ratings")
+    op.drop_table("movie_rating_daily")
@@ -0,0 +1,48 @@
+"""sharded rating counters
+
+Revision ID: 0007_rating_stat_shards
+Revises: 0006_rating_compaction
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007_rating_stat_shards"
+down_revision: Union[str, None] = "0006_rating_compaction"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "movie_rating_stat_shards",
+        sa.Column("movie_id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("ratings_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("ratings_sum", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["movie_id"], ["movies.id"]),
+        sa.PrimaryKeyConstraint("movie_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    # Fold pending shard counts back into the stats before dropping them.
+    op.execute(
+        """
+        UPDATE movie_rating_stats SET
+            ratings_count = movie_rating_stats.ratings_count + p.ratings_count,
+            ratings_sum = movie_rating_stats.ratings_sum + p.ratings_sum,
+            average_rating = CAST(movie_rating_stats.ratings_sum + p.ratings_sum AS FLOAT)
+                / NULLIF(movie_rating_stats.ratings_count + p.ratings_count, 0)
+        FROM (
+            SELECT movie_id, SUM(ratings_count) AS ratings_count, SUM(ratings_sum) AS ratings_sum
+            FROM movie_rating_stat_shards GROUP BY movie_id
+        ) AS p
+        WHERE p.movie_id = movie_rating_stats.movie_id
+        """
+    )
+    op.drop_table("movie_rating_stat_shards")
@@ -1,10 +1,127 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     database_url: str
+    debug: bool = False
+
+    # Connection pool (ignored for SQLite). On startup the lifespan hook opens
+    # `db_pool_size` connections and runs the hot queries once, unless
+    # `warmup_enabled` is false.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    warmup_enabled: bool = True
+
+    # SQLite (embedded / single-node deployments): pragmas applied to every
+    # new connection. WAL lets reads run alongside the single writer;
+    # synchronous=normal is durable across application crashes and only risks
+    # the last transactions on power loss. `sqlite_busy_timeout_ms` is how long
+    # a writer waits for the write lock before failing.
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Logging: "json" for structured output, "text" for the human-readable format.
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    # Per-route controls keyed by endpoint name (e.g. "list_movies", "create_rating").
+    # Sample rates are in [0, 1]; level overrides raise the minimum level of
+    # routine per-request lines for that route. Errors and requests slower than
+    # `log_slow_request_ms` are always logged.
+    log_sample_rates: dict[str, float] = {}
+    log_level_overrides: dict[str, str] = {}
+    log_slow_request_ms: float = 500.0
+
+    # Requests that execute the same statement shape at least this many times
+    # are logged as likely N+1 patterns. In debug mode the per-request counts
+    # are also returned as X-DB-* response headers.
+    query_repeat_threshold: int = 3
+
+    # Slow query log (disabled unless a threshold is set). With
+    # `slow_query_explain`, an EXPLAIN (ANALYZE, BUFFERS) of slow SELECTs is
+    # captured on a background connection (PostgreSQL only).
+    slow_query_ms: Optional[float] = None
+    slow_query_log_path: str = "logs/slow_queries.log"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backup_count: int = 5
+    slow_query_explain: bool = False
+
+    # Admission control (opt-in). Reads (GET/HEAD) and writes each get a concurrency
+    # limit and a bounded wait queue; requests beyond that, or waiting longer
+    # than `admission_queue_timeout_ms`, get 503 with Retry-After. Keep the
+    # two limits together at or below the pool size plus overflow.
+    admission_enabled: bool = False
+    admission_read_concurrency: int = 10
+    admission_read_queue: int = 50
+    admission_write_concurrency: int = 5
+    admission_write_queue: int = 20
+    admission_queue_timeout_ms: float = 1000.0
+    admission_retry_after_s: int = 1
+
+    # Stale-while-revalidate for movie list/detail reads (opt-in). Reads slower
+    # than `stale_read_budget_ms`, or failing with a database error, are
+    # answered from the last known good response (up to `stale_max_age_s` old)
+    # and marked with a `Warning: 110` header. After
+    # `circuit_failure_threshold` consecutive database errors, reads stop
+    # querying for `circuit_reset_timeout_s`.
+    stale_reads_enabled: bool = False
+    stale_read_budget_ms: float = 300.0
+    stale_max_age_s: float = 3600.0
+    stale_cache_max_entries: int = 2048
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout_s: float = 30.0
+
+    # In-process catalog index for genre/year list filters (opt-in). Loaded on
+    # startup and updated by this process's writes; with several workers, set
+    # `catalog_index_refresh_s` so writes made by other workers show up.
+    catalog_index_enabled: bool = False
+    catalog_index_refresh_s: float = 0.0
+
+    # Monthly `movie_ratings` partitions (PostgreSQL, after migration 0005):
+    # keep this many future months created, re-checking every
+    # `rating_partition_check_s`. 0 months disables the maintenance task.
+    rating_partition_months_ahead: int = 3
+    rating_partition_check_s: float = 43200.0
+
+    # Rating compaction: fold ratings older than `rating_compaction_after_days`
+    # into daily summaries every `rating_compaction_interval_s`, at most
+    # `rating_compaction_max_batches` batches per run.
+    rating_compaction_enabled: bool = False
+    rating_compaction_after_days: int = 90
+    rating_compaction_interval_s: float = 3600.0
+    rating_compaction_batch_size: int = 10000
+    rating_compaction_max_batches: int = 100
+
+    # Rating counter shards: spread each movie's stats increments over this many
+    # rows so concurrent ratings of one movie do not queue on a single row lock
+    # (0 writes the stats row directly). Pending shards are merged into
+    # `movie_rating_stats` every `rating_shard_merge_interval_s`, which bounds
+    # how far the average_rating/ratings_count list sorts can lag.
+    rating_stat_shards: int = 0
+    rating_shard_merge_interval_s: float = 5.0
+    rating_shard_merge_batch_size: int = 1000
+
+    # Genre name/id cache; also dropped whenever this process commits a genre change.
+    genre_cache_ttl_s: float = 300.0
+
+    # Precomputed similar-movies index, written by
+    # `scripts/build_similarity_index.py` and memory-mapped by every worker.
+    similarity_index_path: str = "data/similarity.npy"
+
+    # Read-only catalog snapshot written by `scripts/build_snapshot.py`. With
+    # `catalog_snapshot_serving`, movie list and detail reads are answered from
+    # the memory-mapped file and startup skips every database task, so edge
+    # nodes serving that traffic need no database. A newly published file is
+    # picked up within `catalog_snapshot_check_s`.
+    catalog_snapshot_path: str = "data/catalog.snapshot"
+    catalog_snapshot_serving: bool = False
+    catalog_snapshot_check_s: float = 1.0
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).resolve().parent.parent / ".env",
@@ -12,4 +129,13 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+def __getattr__(name: str):
+    # `settings` is created on first access rather than at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
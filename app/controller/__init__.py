@@ -1,5 +1,9 @@
+from app.controller.directors import router as directors_router
+from app.controller.genres import router as genres_router
 from app.controller.movies import router as movies_router
 
 __all__ = [
+    "directors_router",
+    "genres_router",
     "movies_router",
 ]
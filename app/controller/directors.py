@@ -0,0 +1,35 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.schemas.common import SuccessResponse
+from app.schemas.director import DirectorDetailOut, DirectorListPageOut
+from app.services.directors_service import DirectorsService
+
+router = APIRouter(prefix="/api/v1/directors", tags=["Directors"])
+
+
+@router.get("", response_model=SuccessResponse[DirectorListPageOut])
+def list_directors(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    name: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    service = DirectorsService(db)
+    payload = service.list_directors(page=page, page_size=page_size, name=name)
+    return SuccessResponse(data=payload)
+
+
+@router.get("/{director_id}", response_model=SuccessResponse[DirectorDetailOut])
+def get_director(
+    director_id: int,
+    page: int = Query(1, ge=1, description="Filmography page"),
+    page_size: int = Query(20, ge=1, le=100, description="Filmography page size"),
+    db: Session = Depends(get_db),
+):
+    service = DirectorsService(db)
+    payload = service.get_director(director_id, page=page, page_size=page_size)
+    return SuccessResponse(data=payload)
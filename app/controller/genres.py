@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.schemas.common import SuccessResponse
+from app.schemas.genre import GenreListItemOut
+from app.services.genres_service import GenresService
+
+router = APIRouter(prefix="/api/v1/genres", tags=["Genres"])
+
+
+@router.get("", response_model=SuccessResponse[list[GenreListItemOut]])
+def list_genres(db: Session = Depends(get_db)):
+    service = GenresService(db)
+    return SuccessResponse(data=service.list_genres())
@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Response
@@ -6,66 +7,143 @@ from sqlalchemy.orm import Session
 
 from app.db.database import get_db
 from app.schemas.common import SuccessResponse
-from app.schemas.movie import MovieCreateIn, MovieDetailOut, MovieListPageOut, MovieUpdate, RatingCreateIn, RatingOut
+from app.schemas.movie import (
+    MovieCreateIn,
+    MovieDetailOut,
+    MovieListPageOut,
+    MovieUpdate,
+    RatingCreateIn,
+    RatingOut,
+    SimilarMoviesOut,
+)
 from app.exceptions import ValidationError
+from app.logging_config import route_sampler
+from app.resilience.stale import ReadResult
 from app.services.movie import MovieService
-from app.services.movies_service import MoviesService
+from app.services.movies_service import MoviesService, get_movie_detail_async, list_movies_async
 
 router = APIRouter(prefix="/api/v1/movies", tags=["Movies"])
 logger = logging.getLogger("movie_rating")
 
 
+def _unwrap(result: ReadResult, response: Response) -> dict:
+    if result.stale:
+        response.headers["Warning"] = '110 - "Response is Stale"'
+        response.headers["Age"] = str(int(result.age_s))
+    return result.value
+
+
 @router.get("", response_model=SuccessResponse[MovieListPageOut])
-def list_movies(
+async def list_movies(
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
     title: Optional[str] = None,
     release_year: Optional[int] = None,
-    genre: Optional[str] = None,
-    db: Session = Depends(get_db),
+    genre: Optional[str] = Query(None, description="Comma-separated genre names"),
+    genre_match: str = Query("any", description="any or all of the listed genres"),
+    year_from: Optional[int] = Query(None, description="Earliest release year (inclusive)"),
+    year_to: Optional[int] = Query(None, description="Latest release year (inclusive)"),
+    director_id: Optional[int] = None,
+    min_rating: Optional[float] = Query(None, ge=1, le=10),
+    min_rating_count: Optional[int] = Query(None, ge=0),
+    facets: Optional[str] = Query(None, description="Comma-separated facets: genre,release_year"),
+    sort: str = Query("id", description="id, release_year, title, average_rating or ratings_count"),
+    order: str = Query("asc", description="asc or desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces page"),
 ):
     route = "/api/v1/movies"
-    params = {
-        "page": page,
-        "page_size": page_size,
-        "title": title,
-        "release_year": release_year,
-        "genre": genre,
-    }
-    logger.info("Listing movies", extra={"route": route, **params})
-    try:
-        service = MoviesService(db)
-        payload = service.list_movies(
-            page=page,
-            page_size=page_size,
-            title=title,
-            release_year=release_year,
-            genre=genre,
-        )
+    sampled = route_sampler.sample("list_movies")
+    if sampled:
         logger.info(
-            "Movies listed successfully",
+            "Listing movies",
             extra={
                 "route": route,
-                "total_items": payload.get("total_items"),
-                "returned_count": len(payload.get("items", [])),
                 "page": page,
                 "page_size": page_size,
+                "title": title,
+                "release_year": release_year,
+                "genre": genre,
+                "genre_match": genre_match,
+                "year_from": year_from,
+                "year_to": year_to,
+                "director_id": director_id,
+                "min_rating": min_rating,
+                "min_rating_count": min_rating_count,
+                "sort": sort,
+                "order": order,
             },
         )
+    started = time.perf_counter()
+    try:
+        result = await list_movies_async(
+            page=page,
+            page_size=page_size,
+            title=title,
+            release_year=release_year,
+            genre=genre,
+            genre_match=genre_match,
+            year_from=year_from,
+            year_to=year_to,
+            director_id=director_id,
+            min_rating=min_rating,
+            min_rating_count=min_rating_count,
+            facets=[name.strip() for name in facets.split(",") if name.strip()] if facets else None,
+            sort=sort,
+            order=order,
+            cursor=cursor,
+        )
+        payload = _unwrap(result, response)
+        elapsed = time.perf_counter() - started
+        if sampled or route_sampler.is_slow(elapsed):
+            logger.info(
+                "Movies listed successfully",
+                extra={
+                    "route": route,
+                    "total_items": payload.get("total_items"),
+                    "returned_count": len(payload.get("items", [])),
+                    "page": page,
+                    "page_size": page_size,
+                    "duration_ms": round(elapsed * 1000, 2),
+                },
+            )
         return SuccessResponse(data=payload)
+    except ValidationError as exc:
+        logger.warning(
+            "Invalid movie list parameters",
+            extra={"route": route, "error": exc.message},
+        )
+        raise
     except Exception:
         logger.error(
             "Failed to list movies",
             exc_info=True,
-            extra={"route": route, **params},
+            extra={
+                "route": route,
+                "page": page,
+                "page_size": page_size,
+                "title": title,
+                "release_year": release_year,
+                "genre": genre,
+            },
         )
         raise
 
 
 @router.get("/{movie_id}", response_model=SuccessResponse[MovieDetailOut])
-def get_movie(movie_id: int, db: Session = Depends(get_db)):
+async def get_movie(movie_id: int, response: Response):
+    payload = _unwrap(await get_movie_detail_async(movie_id), response)
+    return SuccessResponse(data=payload)
+
+
+@router.get("/{movie_id}/similar", response_model=SuccessResponse[SimilarMoviesOut])
+def get_similar_movies(
+    movie_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
     service = MoviesService(db)
-    payload = service.get_movie_detail(movie_id)
+    payload = service.get_similar_movies(movie_id, limit)
     return SuccessResponse(data=payload)
 
 
@@ -93,10 +171,13 @@ def create_movie(payload: MovieCreateIn, db: Session = Depends(get_db)):
 @router.post("/{movie_id}/ratings", response_model=SuccessResponse[RatingOut], status_code=201)
 def create_rating(movie_id: int, payload: RatingCreateIn, db: Session = Depends(get_db)):
     route = f"/api/v1/movies/{movie_id}/ratings"
-    logger.info(
-        "Rating movie",
-        extra={"movie_id": movie_id, "rating": payload.score, "route": route},
-    )
+    sampled = route_sampler.sample("create_rating")
+    if sampled:
+        logger.info(
+            "Rating movie",
+            extra={"movie_id": movie_id, "rating": payload.score, "route": route},
+        )
+    started = time.perf_counter()
     service = MoviesService(db)
     try:
         rating = service.create_rating(movie_id, payload)
@@ -113,8 +194,14 @@ def create_rating(movie_id: int, payload: RatingCreateIn, db: Session = Depends(
             extra={"movie_id": movie_id, "rating": payload.score, "route": route},
         )
         raise
-    logger.info(
-        "Rating saved successfully",
-        extra={"movie_id": movie_id, "rating": payload.score},
-    )
+    elapsed = time.perf_counter() - started
+    if sampled or route_sampler.is_slow(elapsed):
+        logger.info(
+            "Rating saved successfully",
+            extra={
+                "movie_id": movie_id,
+                "rating": payload.score,
+                "duration_ms": round(elapsed * 1000, 2),
+            },
+        )
     return SuccessResponse(data=rating)
@@ -1,3 +1,11 @@
-from app.db.database import engine, SessionLocal, get_db
+from app.db.database import get_db, get_engine, get_sessionmaker
 
-__all__ = ["engine", "SessionLocal", "get_db"]
+__all__ = ["engine", "SessionLocal", "get_db", "get_engine", "get_sessionmaker"]
+
+
+def __getattr__(name: str):
+    if name in ("engine", "SessionLocal"):
+        from app.db import database
+
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
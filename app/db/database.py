@@ -1,18 +1,111 @@
-from sqlalchemy import create_engine
+import threading
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
-from app.config import settings
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-)
+from app.config import Settings, get_settings
+from app.observability.db import instrument_engine
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_lock = threading.Lock()
+
+
+_SQLITE_JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+_SQLITE_SYNCHRONOUS = ("off", "normal", "full", "extra")
+
+
+def _sqlite_pragmas(settings: Settings) -> list[str]:
+    journal_mode = settings.sqlite_journal_mode.lower()
+    synchronous = settings.sqlite_synchronous.lower()
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {_SQLITE_JOURNAL_MODES}")
+    if synchronous not in _SQLITE_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {_SQLITE_SYNCHRONOUS}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        # Negative values are KiB rather than pages.
+        f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        "PRAGMA foreign_keys=ON",
+    ]
+
+
+def _configure_sqlite(engine: Engine, pragmas: list[str]) -> None:
+    """Apply `pragmas` to every new SQLite connection."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _create_engine() -> Engine:
+    settings = get_settings()
+    if make_url(settings.database_url).get_backend_name() == "sqlite":
+        engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+        _configure_sqlite(engine, _sqlite_pragmas(settings))
+    else:
+        engine = create_engine(
+            settings.database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+    instrument_engine(engine)
+    if settings.slow_query_ms is not None:
+        from app.observability.slow_query import install_slow_query_log
+
+        install_slow_query_log(
+            engine,
+            threshold_ms=settings.slow_query_ms,
+            path=settings.slow_query_log_path,
+            max_bytes=settings.slow_query_log_max_bytes,
+            backup_count=settings.slow_query_log_backup_count,
+            explain=settings.slow_query_explain,
+        )
+    return engine
+
+
+def get_engine() -> Engine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = _create_engine()
+    return _engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        engine = get_engine()
+        with _lock:
+            if _session_factory is None:
+                _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return _session_factory
 
 
 def get_db() -> Session:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+def __getattr__(name: str):
+    # Backwards-compatible `engine` / `SessionLocal` attributes, created lazily.
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,275 @@
+"""Monthly range partitions of `movie_ratings` (PostgreSQL only).
+
+Migration `0005_partition_movie_ratings` turns `movie_ratings` into a table
+partitioned by `created_at`, with one partition per calendar month
+(`movie_ratings_pYYYY_MM`) and a DEFAULT partition that catches anything
+outside them. This module keeps future months created ahead of time and
+archives old months by detaching them, which is a metadata change instead of
+a DELETE that bloats the table and its indexes. Detached months are first
+summarised into `movie_rating_daily`, so rating aggregates stay unchanged.
+
+Every function is a no-op on other dialects or on an unpartitioned table.
+"""
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("movie_rating")
+
+PARENT = "movie_ratings"
+DEFAULT_PARTITION = "movie_ratings_default"
+_NAME_PATTERN = re.compile(r"^movie_ratings_p(\d{4})_(\d{2})$")
+# Serialises partition DDL between workers starting at the same time.
+_LOCK_KEY = 7_240_044
+# How long detaching the DEFAULT partition may wait for its lock.
+_DEFAULT_LOCK_TIMEOUT = "5s"
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month.year:04d}_{month.month:02d}"
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name "
+                "AND pg_table_is_visible(c.oid))"
+            ),
+            {"name": PARENT},
+        ).scalar()
+    )
+
+
+def list_rating_partitions(connection: Connection) -> list[tuple[str, date]]:
+    """Attached monthly partitions as (name, first day of month), oldest first."""
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name AND pg_table_is_visible(parent.oid)"
+        ),
+        {"name": PARENT},
+    ).scalars()
+    partitions = []
+    for name in rows:
+        match = _NAME_PATTERN.match(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def _create_partition(connection: Connection, month: date) -> None:
+    name, upper = partition_name(month), add_months(month, 1)
+    bounds = f"FROM ({_bound(month)}) TO ({_bound(upper)})"
+    stranded = connection.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :lower AND created_at < :upper)"
+        ),
+        {
+            "lower": datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+            "upper": datetime(upper.year, upper.month, 1, tzinfo=timezone.utc),
+        },
+    ).scalar()
+    if not stranded:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES {bounds}"))
+        return
+    # Postgres refuses a new partition while the DEFAULT partition holds rows
+    # in its range, so move those rows into it first and then attach it.
+    connection.execute(
+        text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= {_bound(month)} AND created_at < {_bound(upper)} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+    )
+    connection.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+
+
+def ensure_rating_partitions(
+    engine: Engine,
+    *,
+    months_ahead: int = 3,
+    since: Optional[date] = None,
+    today: Optional[date] = None,
+) -> list[str]:
+    """Create any missing monthly partitions from `since` (default: this month)
+    through `months_ahead` months from now. Returns the names created."""
+    current = month_start(today or datetime.now(timezone.utc).date())
+    first = month_start(since) if since else current
+    last = add_months(current, months_ahead)
+    created = []
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            return created
+        existing = {month for _, month in list_rating_partitions(connection)}
+    month = first
+    while month <= last:
+        if month not in existing:
+            with engine.begin() as connection:
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+                if month not in {m for _, m in list_rating_partitions(connection)}:
+                    _create_partition(connection, month)
+                    created.append(partition_name(month))
+        month = add_months(month, 1)
+    if created:
+        logger.info("Rating partitions created", extra={"partitions": created})
+    return created
+
+
+def _has_default_partition(connection: Connection) -> bool:
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name "
+                "AND pg_table_is_visible(c.oid) AND p.partdefid <> 0)"
+            ),
+            {"name": PARENT},
+        ).scalar()
+    )
+
+
+def _detach_default(engine: Engine) -> None:
+    # A plain DETACH needs an ACCESS EXCLUSIVE lock on the parent; give up
+    # rather than queue every rating read and write behind a long query.
+    with engine.begin() as connection:
+        connection.execute(text(f"SET LOCAL lock_timeout = '{_DEFAULT_LOCK_TIMEOUT}'"))
+        connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}"))
+
+
+def _attach_default(engine: Engine) -> None:
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text(f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+            )
+    except Exception:
+        logger.error(
+            "DEFAULT rating partition was not re-attached; ratings outside the monthly "
+            "partitions are rejected until it is",
+            extra={"partition": DEFAULT_PARTITION},
+        )
+        raise
+
+
+def _summarise_detached(connection: Connection, name: str) -> None:
+    """Fold a detached month into `movie_rating_daily` and drop its foreign keys.
+
+    Aggregates read raw ratings plus daily summaries, so this keeps them (and
+    the list/detail numbers) equal to `movie_rating_stats`. Without the
+    foreign keys, the archive no longer blocks deleting its movies.
+    """
+    connection.execute(
+        text(
+            "INSERT INTO movie_rating_daily (movie_id, day, score, ratings_count) "
+            "SELECT movie_id, (created_at AT TIME ZONE 'UTC')::date, score, count(*) "
+            f"FROM {name} GROUP BY 1, 2, 3 "
+            "ON CONFLICT (movie_id, day, score) DO UPDATE "
+            "SET ratings_count = movie_rating_daily.ratings_count + EXCLUDED.ratings_count"
+        )
+    )
+    foreign_keys = connection.execute(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+        ),
+        {"name": name},
+    ).scalars()
+    for constraint in list(foreign_keys):
+        connection.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+
+
+def detach_rating_partitions(
+    engine: Engine,
+    *,
+    before: date,
+    drop: bool = False,
+    concurrently: bool = False,
+) -> list[str]:
+    """Detach monthly partitions that end on or before `before`.
+
+    Each month's ratings are summarised into `movie_rating_daily` as it is
+    detached, so averages and counts do not change. Detached tables keep
+    their rows (without foreign keys) and can be dumped or moved to cheaper
+    storage; pass `drop=True` to remove them instead. Do not re-attach a
+    summarised month: its ratings would then be counted twice.
+
+    `concurrently=True` uses `DETACH ... CONCURRENTLY` (PostgreSQL 14+), which
+    does not block queries on `movie_ratings` but cannot run in a transaction.
+    PostgreSQL refuses it while a DEFAULT partition is attached, so the
+    DEFAULT partition is detached first (a brief exclusive lock, bounded by a
+    lock timeout) and re-attached afterwards, even on failure. Meanwhile,
+    ratings outside the monthly partitions are rejected, and re-attaching
+    scans the DEFAULT partition, so keep it empty and months created ahead.
+    Each month is summarised in a second transaction, so its ratings are
+    briefly missing from aggregates. Without `concurrently`, detaching and
+    summarising commit together.
+    """
+    detached = []
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            return detached
+        candidates = [
+            name for name, month in list_rating_partitions(connection) if add_months(month, 1) <= before
+        ]
+        detach_default = concurrently and bool(candidates) and _has_default_partition(connection)
+    if detach_default:
+        _detach_default(engine)
+    try:
+        for name in candidates:
+            if concurrently:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                    connection.execute(
+                        text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY")
+                    )
+                try:
+                    with engine.begin() as connection:
+                        _summarise_detached(connection, name)
+                        if drop:
+                            connection.execute(text(f"DROP TABLE {name}"))
+                except Exception:
+                    logger.error(
+                        "Detached rating partition was not summarised; its ratings are missing "
+                        "from aggregates until it is re-attached",
+                        extra={"partition": name},
+                    )
+                    raise
+            else:
+                with engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+                    _summarise_detached(connection, name)
+                    if drop:
+                        connection.execute(text(f"DROP TABLE {name}"))
+            detached.append(name)
+    finally:
+        if detach_default:
+            _attach_default(engine)
+    if detached:
+        logger.info("Rating partitions detached", extra={"partitions": detached, "dropped": drop})
+    return detached
@@ -1,9 +1,15 @@
 from app.exceptions.handlers import register_exception_handlers
-from app.exceptions.http_exceptions import AppHTTPException, NotFoundError, ValidationError
+from app.exceptions.http_exceptions import (
+    AppHTTPException,
+    NotFoundError,
+    ServiceUnavailableError,
+    ValidationError,
+)
 
 __all__ = [
     "AppHTTPException",
     "NotFoundError",
+    "ServiceUnavailableError",
     "ValidationError",
     "register_exception_handlers",
 ]
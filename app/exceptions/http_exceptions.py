@@ -16,3 +16,8 @@ class NotFoundError(AppHTTPException):
 class ValidationError(AppHTTPException):
     def __init__(self, message: str = "Validation error") -> None:
         super().__init__(status.HTTP_422_UNPROCESSABLE_ENTITY, message)
+
+
+class ServiceUnavailableError(AppHTTPException):
+    def __init__(self, message: str = "Service unavailable") -> None:
+        super().__init__(status.HTTP_503_SERVICE_UNAVAILABLE, message)
@@ -1,5 +1,29 @@
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import TextIO
+
+from app.config import get_settings
+
+_CONTEXT_DEFAULTS = {
+    "movie_id": "-",
+    "rating": "-",
+    "route": "-",
+    "context": "",
+}
+
+# Attributes every LogRecord carries; anything else was passed through `extra`.
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "context"}
+
+_listener: QueueListener | None = None
 
 
 class _SafeExtraFilter(logging.Filter):
@@ -25,28 +49,180 @@ class _SafeExtraFilter(logging.Filter):
         return True
 
 
+class _JsonFormatter(logging.Formatter):
+    """Render a record as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key in _RECORD_ATTRS or value in (None, "-", ""):
+                continue
+            payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller.
+
+    Records are enqueued with `put_nowait`; when the queue is full the record
+    is dropped and counted instead of stalling the request thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge msg/args here; the expensive formatting happens on the
+        # listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # `Handler.handle` holds `self.lock` around emit, so this is not racy.
+            self._dropped += 1
+
+
+class RouteLogSampler:
+    """Decide up front whether a request's routine log lines are emitted.
+
+    Call `sample()` once per request before building any `extra` dicts; when it
+    returns False the request's INFO lines are skipped entirely. Error paths
+    should log unconditionally, and `is_slow()` lets callers keep the
+    completion line for slow requests regardless of the sampling decision.
+    """
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self._logger = logger
+        self._sample_rates: dict[str, float] = {}
+        self._min_levels: dict[str, int] = {}
+        self._slow_request_s = 0.5
+
+    def configure(
+        self,
+        sample_rates: dict[str, float],
+        level_overrides: dict[str, str],
+        slow_request_ms: float,
+    ) -> None:
+        levels = logging.getLevelNamesMapping()
+        self._sample_rates = dict(sample_rates)
+        self._min_levels = {
+            route: levels[level.upper()] for route, level in level_overrides.items()
+        }
+        self._slow_request_s = slow_request_ms / 1000
+
+    def sample(self, route: str, level: int = logging.INFO) -> bool:
+        if level < self._min_levels.get(route, logging.NOTSET):
+            return False
+        if not self._logger.isEnabledFor(level):
+            return False
+        rate = self._sample_rates.get(route, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+    def is_slow(self, elapsed_s: float) -> bool:
+        return elapsed_s >= self._slow_request_s
+
+
+# Logs everything until `configure_logging()` applies the configured policy.
+route_sampler = RouteLogSampler(logging.getLogger("movie_rating"))
+
+
+def _build_output_handler(log_format: str, stream: TextIO) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    handler.addFilter(_SafeExtraFilter(defaults=_CONTEXT_DEFAULTS))
+    if log_format == "json":
+        handler.setFormatter(_JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s%(context)s")
+        )
+    return handler
+
+
+def _build_queue_pipeline(
+    target: logging.Handler,
+    queue_size: int,
+) -> tuple[_DroppingQueueHandler, QueueListener]:
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    listener = QueueListener(log_queue, target, respect_handler_level=True)
+    return _DroppingQueueHandler(log_queue), listener
+
+
+def build_file_pipeline(
+    path: str,
+    *,
+    max_bytes: int,
+    backup_count: int,
+    queue_size: int = 1000,
+) -> tuple[QueueHandler, QueueListener]:
+    """Build a queued handler writing JSON lines to a rotating file at `path`.
+
+    The caller attaches the returned handler to its logger and starts (and
+    eventually stops) the listener. Records are dropped, not blocked on, when
+    the queue is full.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(_JsonFormatter())
+    return _build_queue_pipeline(file_handler, queue_size)
+
+
+def get_dropped_log_records() -> int:
+    """Return how many records were dropped because the log queue was full."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _DroppingQueueHandler):
+            return handler.dropped
+    return 0
+
+
+def shutdown_logging() -> None:
+    """Stop the background listener, flushing any queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def configure_logging() -> None:
+    global _listener
+    settings = get_settings()
+    route_sampler.configure(
+        settings.log_sample_rates,
+        settings.log_level_overrides,
+        settings.log_slow_request_ms,
+    )
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s%(context)s"
-    )
-
     for handler in root_logger.handlers:
-        if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+        if isinstance(handler, _DroppingQueueHandler):
             return
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.addFilter(
-        _SafeExtraFilter(
-            defaults={
-                "movie_id": "-",
-                "rating": "-",
-                "route": "-",
-                "context": "",
-            }
-        )
-    )
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    output = _build_output_handler(settings.log_format, sys.stdout)
+    queue_handler, _listener = _build_queue_pipeline(output, settings.log_queue_size)
+    root_logger.addHandler(queue_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
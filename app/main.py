@@ -1,16 +1,223 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
+from app.config import get_settings
+from app.controller import directors_router, genres_router, movies_router
+from app.db.database import get_engine, get_sessionmaker
+from app.db.partitions import ensure_rating_partitions
 from app.exceptions import register_exception_handlers
-from app.controller import movies_router
-from app.logging_config import configure_logging
+from app.logging_config import configure_logging, get_dropped_log_records
+from app.observability import MetricsMiddleware, QueryBudgetMiddleware, registry
+from app.resilience import AdmissionLimits, AdmissionMiddleware
+from app.services.catalog_index import catalog_index
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.genre_cache import genre_cache
+from app.services.movies_service import configure_stale_reads
+from app.services.rating_compaction import compact_ratings
+from app.services.rating_stats import configure_rating_shards, merge_rating_shards
+from app.services.similarity import similarity_index
 
-configure_logging()
-app = FastAPI(title="Movie-Rating-System")
-register_exception_handlers(app)
-app.include_router(movies_router)
+logger = logging.getLogger("movie_rating")
 
 
-@app.get("/health", tags=["Health"])
 def health_check() -> dict:
     return {"status": "success", "data": {"ok": True}}
 
+
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _refresh_catalog_index(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await run_in_threadpool(catalog_index.load, get_sessionmaker())
+        except Exception:
+            logger.warning("Catalog index refresh failed", exc_info=True)
+
+
+async def _maintain_rating_partitions(engine, months_ahead: int, interval_s: float) -> None:
+    while True:
+        try:
+            await run_in_threadpool(ensure_rating_partitions, engine, months_ahead=months_ahead)
+        except Exception:
+            # New ratings land in the DEFAULT partition until this succeeds.
+            logger.warning("Rating partition maintenance failed", exc_info=True)
+        await asyncio.sleep(interval_s)
+
+
+async def _compact_ratings_periodically(settings) -> None:
+    while True:
+        await asyncio.sleep(settings.rating_compaction_interval_s)
+        try:
+            await run_in_threadpool(
+                compact_ratings,
+                get_sessionmaker(),
+                older_than_days=settings.rating_compaction_after_days,
+                batch_size=settings.rating_compaction_batch_size,
+                max_batches=settings.rating_compaction_max_batches,
+            )
+        except Exception:
+            logger.warning("Rating compaction failed", exc_info=True)
+
+
+async def _merge_rating_shards_periodically(settings) -> None:
+    while True:
+        await asyncio.sleep(settings.rating_shard_merge_interval_s)
+        try:
+            await run_in_threadpool(
+                merge_rating_shards,
+                get_sessionmaker(),
+                batch_size=settings.rating_shard_merge_batch_size,
+            )
+        except Exception:
+            # Shards keep counting; the next run merges them.
+            logger.warning("Rating shard merge failed", exc_info=True)
+
+
+def _load_genre_cache() -> None:
+    with get_sessionmaker()() as db:
+        genre_cache.load(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    engine = get_engine()
+    if settings.catalog_snapshot_serving:
+        # Movie reads come from the snapshot file: no background jobs, cache
+        # loads or warmup queries, so startup never touches the database.
+        if catalog_snapshot.current() is None:
+            logger.warning(
+                "Catalog snapshot not available; movie reads return 503 until one is published",
+                extra={"path": settings.catalog_snapshot_path},
+            )
+        yield
+        engine.dispose()
+        return
+    refresher = None
+    partitioner = None
+    if engine.dialect.name == "postgresql" and settings.rating_partition_months_ahead > 0:
+        partitioner = asyncio.create_task(
+            _maintain_rating_partitions(
+                engine, settings.rating_partition_months_ahead, settings.rating_partition_check_s
+            )
+        )
+    compactor = None
+    if settings.rating_compaction_enabled:
+        compactor = asyncio.create_task(_compact_ratings_periodically(settings))
+    # Runs even with sharding off, so shards left from an earlier configuration drain.
+    merger = None
+    if settings.rating_shard_merge_interval_s > 0:
+        merger = asyncio.create_task(_merge_rating_shards_periodically(settings))
+    try:
+        await run_in_threadpool(_load_genre_cache)
+    except Exception:
+        # Loaded lazily by the first request that needs it.
+        logger.warning("Genre cache load failed", exc_info=True)
+    if settings.catalog_index_enabled:
+        try:
+            await run_in_threadpool(catalog_index.load, get_sessionmaker())
+        except Exception:
+            # List filters fall back to SQL while the index is not ready.
+            logger.warning("Catalog index load failed", exc_info=True)
+        if settings.catalog_index_refresh_s > 0:
+            refresher = asyncio.create_task(
+                _refresh_catalog_index(settings.catalog_index_refresh_s)
+            )
+    if settings.warmup_enabled:
+        from app.warmup import run_warmup
+
+        try:
+            await run_in_threadpool(
+                run_warmup, app, engine, get_sessionmaker(), settings.db_pool_size
+            )
+        except Exception:
+            # A cold start is better than no start; requests will retry the DB.
+            logger.warning("Warmup failed", exc_info=True)
+    yield
+    for task in (refresher, partitioner, compactor, merger):
+        if task is not None:
+            task.cancel()
+    engine.dispose()
+
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+    configure_logging()
+    configure_stale_reads(
+        enabled=settings.stale_reads_enabled,
+        budget_ms=settings.stale_read_budget_ms,
+        max_age_s=settings.stale_max_age_s,
+        max_entries=settings.stale_cache_max_entries,
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout_s=settings.circuit_reset_timeout_s,
+    )
+    similarity_index.configure(settings.similarity_index_path)
+    catalog_snapshot.configure(
+        settings.catalog_snapshot_path,
+        serving=settings.catalog_snapshot_serving,
+        check_interval_s=settings.catalog_snapshot_check_s,
+    )
+    genre_cache.configure(settings.genre_cache_ttl_s)
+    configure_rating_shards(settings.rating_stat_shards)
+
+    app = FastAPI(title="Movie-Rating-System", lifespan=lifespan)
+    register_exception_handlers(app)
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        repeat_threshold=settings.query_repeat_threshold,
+        debug_headers=settings.debug,
+    )
+    if settings.admission_enabled:
+        timeout_s = settings.admission_queue_timeout_ms / 1000
+        app.add_middleware(
+            AdmissionMiddleware,
+            read_limits=AdmissionLimits(
+                settings.admission_read_concurrency, settings.admission_read_queue, timeout_s
+            ),
+            write_limits=AdmissionLimits(
+                settings.admission_write_concurrency, settings.admission_write_queue, timeout_s
+            ),
+            retry_after_s=settings.admission_retry_after_s,
+        )
+    # Outermost, so shed requests are still measured.
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(movies_router)
+    app.include_router(directors_router)
+    app.include_router(genres_router)
+    app.add_api_route("/health", health_check, methods=["GET"], tags=["Health"])
+    app.add_api_route(
+        "/metrics",
+        metrics,
+        methods=["GET"],
+        tags=["Health"],
+        response_class=PlainTextResponse,
+    )
+
+    registry.callback_gauge(
+        "log_records_dropped",
+        "Log records dropped because the log queue was full.",
+        get_dropped_log_records,
+    )
+    return app
+
+
+_app = None
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` keeps working; the app is built on first access.
+    # Prefer `uvicorn --factory app.main:create_app`.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
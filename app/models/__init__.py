@@ -3,6 +3,9 @@ from app.models.director import Director
 from app.models.genre import Genre
 from app.models.movie import Movie, movie_genres
 from app.models.movie_rating import MovieRating
+from app.models.movie_rating_daily import MovieRatingDaily
+from app.models.movie_rating_stat_shard import MovieRatingStatShard
+from app.models.movie_rating_stats import MovieRatingStats
 
 __all__ = [
     "Base",
@@ -10,5 +13,8 @@ __all__ = [
     "Genre",
     "Movie",
     "MovieRating",
+    "MovieRatingDaily",
+    "MovieRatingStatShard",
+    "MovieRatingStats",
     "movie_genres",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -18,11 +18,20 @@ movie_genres = Table(
         ForeignKey("genres.id"),
         primary_key=True,
     ),
+    # The primary key serves lookups by movie; this one serves genre filters.
+    Index("ix_movie_genres_genre_id_movie_id", "genre_id", "movie_id"),
 )
 
 
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        # Sort keys of the list endpoint, with id as the keyset tiebreaker.
+        Index("ix_movies_release_year_id", "release_year", "id"),
+        Index("ix_movies_title_id", "title", "id"),
+        # Director filmography, newest first.
+        Index("ix_movies_director_id_release_year", "director_id", "release_year", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
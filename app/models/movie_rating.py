@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -8,6 +8,14 @@ from app.models.base import Base
 
 class MovieRating(Base):
     __tablename__ = "movie_ratings"
+    # On PostgreSQL the table is range-partitioned by month on `created_at`
+    # (migration 0005, app/db/partitions.py) and its primary key is
+    # (id, created_at). `id` alone is still unique, so the ORM keys on it.
+    __table_args__ = (
+        Index("ix_movie_ratings_movie_id", "movie_id"),
+        # Finds the old ratings the compaction job folds into daily summaries.
+        Index("ix_movie_ratings_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), nullable=False)
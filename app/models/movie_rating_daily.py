@@ -0,0 +1,22 @@
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MovieRatingDaily(Base):
+    """Compacted ratings: how many times a movie got each score on one day (UTC).
+
+    Written by the rating compaction job, which deletes the raw
+    `movie_ratings` rows it folds in. The per-score rows are the day's
+    histogram; the count and sum follow from them.
+    """
+
+    __tablename__ = "movie_rating_daily"
+
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    score: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ratings_count: Mapped[int] = mapped_column(Integer, nullable=False)
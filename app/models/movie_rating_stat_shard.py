@@ -0,0 +1,21 @@
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MovieRatingStatShard(Base):
+    """Rating counts not yet merged into `movie_rating_stats`.
+
+    Each rating write increments one of N shard rows of its movie, chosen at
+    random, so concurrent ratings of one popular movie rarely wait on the
+    same row lock. The merge job moves shard totals into the movie's stats
+    row; exact totals are stats plus shards.
+    """
+
+    __tablename__ = "movie_rating_stat_shards"
+
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ratings_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    ratings_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,23 @@
+from sqlalchemy import Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MovieRatingStats(Base):
+    """Precomputed rating aggregates per movie, maintained on every rating write.
+
+    Used to sort the movie list by rating without aggregating all ratings.
+    Movies without ratings have a row with zero count and zero average.
+    """
+
+    __tablename__ = "movie_rating_stats"
+    __table_args__ = (
+        Index("ix_movie_rating_stats_average_rating", "average_rating", "movie_id"),
+        Index("ix_movie_rating_stats_ratings_count", "ratings_count", "movie_id"),
+    )
+
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
+    ratings_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    ratings_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    average_rating: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
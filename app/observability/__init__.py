@@ -0,0 +1,15 @@
+from app.observability.context import RequestStats, current_request
+from app.observability.db import instrument_engine
+from app.observability.metrics import registry
+from app.observability.middleware import MetricsMiddleware
+from app.observability.query_budget import QueryBudgetMiddleware, assert_query_budget
+
+__all__ = [
+    "MetricsMiddleware",
+    "QueryBudgetMiddleware",
+    "RequestStats",
+    "assert_query_budget",
+    "current_request",
+    "instrument_engine",
+    "registry",
+]
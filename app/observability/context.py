@@ -0,0 +1,42 @@
+"""Per-request state shared between the HTTP middleware and engine hooks."""
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(slots=True)
+class RequestStats:
+    method: str
+    path: str
+    route: str = "unmatched"
+    db_queries: int = 0
+    db_time: float = 0.0
+    # Raw statement text -> executions in this request (see query_budget.py).
+    statements: dict[str, int] = field(default_factory=dict)
+    # The ASGI scope; routing adds the matched route to it in place.
+    scope: Optional[dict] = field(default=None, repr=False)
+
+    def route_template(self) -> str:
+        """Path template of the matched route, e.g. `/api/v1/movies/{movie_id}`."""
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else self.route
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    """Return the stats object of the request being served, if any.
+
+    Sync endpoints run in a threadpool with a copy of the request context, so
+    the same (mutable) object is visible there and in the middleware.
+    """
+    return _current_request.get()
+
+
+def start_request(stats: RequestStats):
+    return _current_request.set(stats)
+
+
+def end_request(token) -> None:
+    _current_request.reset(token)
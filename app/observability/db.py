@@ -0,0 +1,86 @@
+"""SQLAlchemy engine instrumentation: query counts and durations."""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.observability.context import current_request
+from app.observability.metrics import registry
+
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Duration of SQL statements by statement type.",
+    ("operation",),
+    buckets=_DB_BUCKETS,
+)
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_query_duration.observe(elapsed, _operation(statement))
+    stats = current_request()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches `_after_cursor_execute`; drop its start
+    # time so it is not paired with a later statement on this connection.
+    connection = exception_context.connection
+    if connection is not None and exception_context.execution_context is not None:
+        starts = connection.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def _pool_stat(engine: Engine, name: str):
+    method = getattr(engine.pool, name, None)
+    return method() if callable(method) else None
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach timing hooks and pool/cache gauges to `engine`. Idempotent."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    registry.callback_gauge(
+        "db_pool_checked_out",
+        "Connections currently checked out of the pool.",
+        lambda: _pool_stat(engine, "checkedout"),
+    )
+    registry.callback_gauge(
+        "db_pool_checked_in",
+        "Idle connections held by the pool.",
+        lambda: _pool_stat(engine, "checkedin"),
+    )
+    registry.callback_gauge(
+        "db_pool_overflow",
+        "Connections opened beyond the configured pool size.",
+        lambda: _pool_stat(engine, "overflow"),
+    )
+    registry.callback_gauge(
+        "db_pool_size",
+        "Configured pool size.",
+        lambda: _pool_stat(engine, "size"),
+    )
+    registry.callback_gauge(
+        "db_compiled_cache_entries",
+        "Entries in SQLAlchemy's compiled statement cache.",
+        lambda: len(engine._compiled_cache) if engine._compiled_cache is not None else None,
+    )
@@ -0,0 +1,62 @@
+"""ASGI middleware recording per-route latency, in-flight requests and DB usage."""
+import time
+
+from app.observability.context import RequestStats, end_request, start_request
+from app.observability.metrics import registry
+
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "Requests currently being served.",
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("route", "method"),
+    buckets=(0, 1, 2, 3, 4, 5, 8, 10, 15, 20, 50, 100),
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per request.",
+    ("route", "method"),
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so it adds no task or body-streaming overhead."""
+
+    def __init__(self, app, excluded_paths: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope["method"], path=scope["path"], scope=scope)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = start_request(stats)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            end_request(token)
+            stats.route = stats.route_template()
+            http_request_duration.observe(elapsed, stats.route, stats.method, str(status_code))
+            http_request_db_queries.observe(stats.db_queries, stats.route, stats.method)
+            http_request_db_duration.observe(stats.db_time, stats.route, stats.method)
@@ -0,0 +1,134 @@
+"""Per-request SQL statement budget and N+1 detection.
+
+The engine hooks in `app/observability/db.py` record every statement executed
+while a request is being served. At the end of the request, statements are
+grouped by shape (expanded `IN (...)` lists collapsed) and any shape executed
+`query_repeat_threshold` times or more is reported as a likely N+1 pattern.
+"""
+import logging
+import re
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.observability.context import current_request
+
+logger = logging.getLogger("movie_rating")
+
+_IN_LIST = re.compile(r"\bIN \([^()]*\)", re.IGNORECASE)
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", " ".join(statement.split()))
+
+
+def repeated_shapes(statements: dict[str, int], threshold: int) -> list[tuple[str, int]]:
+    """Return (shape, executions) for shapes executed at least `threshold` times."""
+    shapes: dict[str, int] = {}
+    for statement, count in statements.items():
+        shape = statement_shape(statement)
+        shapes[shape] = shapes.get(shape, 0) + count
+    return sorted(
+        ((shape, count) for shape, count in shapes.items() if count >= threshold),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+class QueryBudgetMiddleware:
+    """Flag repeated statement shapes and, in debug mode, expose query counts.
+
+    Must be installed inside `MetricsMiddleware`, which owns the request stats.
+    """
+
+    def __init__(self, app, repeat_threshold: int, debug_headers: bool) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send) -> None:
+        stats = current_request() if scope["type"] == "http" else None
+        if stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if self.debug_headers and message["type"] == "http.response.start":
+                repeated = repeated_shapes(stats.statements, self.repeat_threshold)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.db_queries).encode()))
+                headers.append((b"x-db-repeated-shapes", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        for shape, count in repeated_shapes(stats.statements, self.repeat_threshold):
+            route = scope.get("route")
+            logger.warning(
+                "Repeated SQL statement shape (possible N+1)",
+                extra={
+                    "route": route.path if route is not None else stats.path,
+                    "executions": count,
+                    "statement": shape[:500],
+                },
+            )
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class _StatementRecorder:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, _conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def assert_query_budget(
+    engine: Engine,
+    max_queries: int,
+    *,
+    max_repeats: Optional[int] = None,
+) -> Iterator[_StatementRecorder]:
+    """Fail if the block executes more than `max_queries` statements on `engine`.
+
+    Intended for tests that pin the query count of an endpoint::
+
+        with assert_query_budget(engine, 4, max_repeats=1):
+            client.get("/api/v1/movies")
+
+    With `max_repeats`, the block also fails when any statement shape is
+    executed more than that many times.
+    """
+    recorder = _StatementRecorder()
+    event.listen(engine, "after_cursor_execute", recorder)
+    try:
+        yield recorder
+    finally:
+        event.remove(engine, "after_cursor_execute", recorder)
+
+    if recorder.count > max_queries:
+        listing = "\n".join(f"  {statement_shape(s)[:200]}" for s in recorder.statements)
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, executed {recorder.count}:\n{listing}"
+        )
+    if max_repeats is not None:
+        counts: dict[str, int] = {}
+        for statement in recorder.statements:
+            counts[statement] = counts.get(statement, 0) + 1
+        repeated = repeated_shapes(counts, max_repeats + 1)
+        if repeated:
+            listing = "\n".join(f"  {count}x {shape[:200]}" for shape, count in repeated)
+            raise QueryBudgetExceeded(
+                f"Statement shapes repeated more than {max_repeats} times:\n{listing}"
+            )
@@ -0,0 +1,161 @@
+"""Slow query log with optional out-of-band EXPLAIN capture.
+
+Statements slower than the configured threshold are written as JSON lines to a
+rotating local file with their shape, bound-parameter types (never values),
+duration and originating request. When EXPLAIN capture is enabled, slow
+SELECTs are re-run as `EXPLAIN (ANALYZE, BUFFERS)` on a separate connection in
+a single background thread so the request that hit the slow query is never
+delayed by it.
+"""
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.logging_config import build_file_pipeline
+from app.observability.context import current_request
+from app.observability.query_budget import statement_shape
+
+_START_KEY = "slow_query_start_time"
+# Re-explain the same statement at most once per interval.
+_EXPLAIN_INTERVAL_S = 300.0
+_MAX_PENDING_EXPLAINS = 4
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Describe bound parameters by type only, so no values end up on disk."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class _Explainer:
+    """Runs EXPLAIN (ANALYZE, BUFFERS) for slow SELECTs on a background thread."""
+
+    def __init__(self, engine: Engine, slow_logger: logging.Logger) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._engine = engine
+        self._logger = slow_logger
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._last_explained: dict[str, float] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, statement: str, parameters: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._pending >= _MAX_PENDING_EXPLAINS:
+                return
+            if now - self._last_explained.get(statement, -_EXPLAIN_INTERVAL_S) < _EXPLAIN_INTERVAL_S:
+                return
+            self._last_explained[statement] = now
+            self._pending += 1
+        self._executor.submit(self._explain, statement, parameters)
+
+    def _explain(self, statement: str, parameters: Any) -> None:
+        try:
+            with self._engine.connect() as conn:
+                result = conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement,
+                    parameters,
+                )
+                plan = "\n".join(row[0] for row in result)
+                conn.rollback()
+            self._logger.info(
+                "Slow query plan",
+                extra={"statement": statement_shape(statement), "plan": plan},
+            )
+        except Exception:
+            self._logger.warning(
+                "Failed to capture slow query plan",
+                exc_info=True,
+                extra={"statement": statement_shape(statement)},
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        engine: Engine,
+        threshold_ms: float,
+        slow_logger: logging.Logger,
+        explain: bool,
+    ) -> None:
+        self._threshold_s = threshold_ms / 1000
+        self._logger = slow_logger
+        self._explainer: Optional[_Explainer] = None
+        if explain and engine.dialect.name == "postgresql":
+            self._explainer = _Explainer(engine, slow_logger)
+
+    def before(self, conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def after(self, conn, _cursor, statement, parameters, _context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info[_START_KEY].pop()
+        if elapsed < self._threshold_s or statement.startswith("EXPLAIN"):
+            return
+        stats = current_request()
+        self._logger.warning(
+            "Slow query",
+            extra={
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": statement_shape(statement),
+                "parameters": parameter_shape(parameters, executemany),
+                "route": stats.route_template() if stats is not None else None,
+                "method": stats.method if stats is not None else None,
+            },
+        )
+        if (
+            self._explainer is not None
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+        ):
+            self._explainer.submit(statement, parameters)
+
+    def handle_error(self, exception_context) -> None:
+        # Failed statements skip `after`; see `app/observability/db.py`.
+        connection = exception_context.connection
+        if connection is not None and exception_context.execution_context is not None:
+            starts = connection.info.get(_START_KEY)
+            if starts:
+                starts.pop()
+
+
+def install_slow_query_log(
+    engine: Engine,
+    *,
+    threshold_ms: float,
+    path: str,
+    max_bytes: int,
+    backup_count: int,
+    explain: bool = False,
+) -> SlowQueryLog:
+    """Log statements slower than `threshold_ms` on `engine` to a rotating file."""
+    queue_handler, listener = build_file_pipeline(
+        path, max_bytes=max_bytes, backup_count=backup_count
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    slow_logger = logging.getLogger("movie_rating.slow_query")
+    slow_logger.setLevel(logging.INFO)
+    slow_logger.propagate = False
+    slow_logger.addHandler(queue_handler)
+
+    slow_log = SlowQueryLog(engine, threshold_ms, slow_logger, explain)
+    event.listen(engine, "before_cursor_execute", slow_log.before)
+    event.listen(engine, "after_cursor_execute", slow_log.after)
+    event.listen(engine, "handle_error", slow_log.handle_error)
+    return slow_log
@@ -1,7 +1,11 @@
+from app.repositories.directors_repository import DirectorsRepository
+from app.repositories.genres_repository import GenresRepository
 from app.repositories.movie import MovieRepository
 from app.repositories.movies_repository import MoviesRepository
 
 __all__ = [
+    "DirectorsRepository",
+    "GenresRepository",
     "MovieRepository",
     "MoviesRepository",
 ]
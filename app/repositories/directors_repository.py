@@ -0,0 +1,127 @@
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Float, Select, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie, movie_genres
+from app.models.movie_rating_stats import MovieRatingStats
+from app.repositories.rating_stats import pending_shard_totals
+
+
+class DirectorsRepository:
+    """Repository for director pages: career aggregates and filmography.
+
+    Ratings are read from `movie_rating_stats` plus any not yet merged counter
+    shards, so a director's totals are a sum over their movies' rows rather
+    than an aggregate over every rating.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get_director(self, director_id: int) -> Optional[Director]:
+        return self.db.get(Director, director_id)
+
+    def list_directors(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        name: Optional[str] = None,
+    ) -> tuple[int, list[dict]]:
+        """Return one page of directors (by id) with their career aggregates."""
+        ids_query = select(Director.id)
+        if name:
+            ids_query = ids_query.where(Director.name.ilike(f"%{name}%"))
+
+        total_items = self.db.execute(
+            select(func.count()).select_from(ids_query.subquery()),
+        ).scalar_one()
+
+        page_ids = (
+            ids_query.order_by(Director.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .subquery()
+        )
+        query = self._career_query(select(page_ids.c.id))
+        return total_items, [dict(row._mapping) for row in self.db.execute(query)]
+
+    def get_career_stats(self, director_id: int) -> dict:
+        row = self.db.execute(self._career_query([director_id])).one()
+        return dict(row._mapping)
+
+    def get_filmography(self, director_id: int, *, page: int, page_size: int) -> list[dict]:
+        """Return one page of a director's movies, newest first, with rating aggregates."""
+        pending = pending_shard_totals(select(Movie.id).where(Movie.director_id == director_id))
+        ratings_count = func.coalesce(MovieRatingStats.ratings_count, 0) + func.coalesce(
+            pending.c.ratings_count, 0
+        )
+        ratings_sum = func.coalesce(MovieRatingStats.ratings_sum, 0) + func.coalesce(
+            pending.c.ratings_sum, 0
+        )
+        query = (
+            select(
+                Movie.id,
+                Movie.title,
+                Movie.release_year,
+                case(
+                    (ratings_count > 0, cast(ratings_sum, Float) / ratings_count),
+                    else_=None,
+                ).label("avg_rating"),
+                ratings_count.label("rating_count"),
+            )
+            .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+            .outerjoin(pending, pending.c.movie_id == Movie.id)
+            .where(Movie.director_id == director_id)
+            .order_by(Movie.release_year.desc(), Movie.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        movies = [dict(row._mapping) for row in self.db.execute(query)]
+        if not movies:
+            return movies
+
+        genres_query = (
+            select(movie_genres.c.movie_id, Genre.name)
+            .join(Genre, Genre.id == movie_genres.c.genre_id)
+            .where(movie_genres.c.movie_id.in_([movie["id"] for movie in movies]))
+            .order_by(movie_genres.c.movie_id, Genre.name)
+        )
+        genres_by_movie: dict[int, list[str]] = {}
+        for row in self.db.execute(genres_query):
+            genres_by_movie.setdefault(row.movie_id, []).append(row.name)
+        for movie in movies:
+            movie["genres"] = genres_by_movie.get(movie["id"], [])
+        return movies
+
+    @staticmethod
+    def _career_query(director_ids: Union[Iterable[int], Select]) -> Select:
+        """The given directors with movie count, total ratings and rating-weighted average."""
+        pending = pending_shard_totals(select(Movie.id).where(Movie.director_id.in_(director_ids)))
+        ratings_count = func.coalesce(func.sum(MovieRatingStats.ratings_count), 0) + func.coalesce(
+            func.sum(pending.c.ratings_count), 0
+        )
+        ratings_sum = func.coalesce(func.sum(MovieRatingStats.ratings_sum), 0) + func.coalesce(
+            func.sum(pending.c.ratings_sum), 0
+        )
+        return (
+            select(
+                Director.id,
+                Director.name,
+                Director.birth_year,
+                func.count(Movie.id).label("movie_count"),
+                ratings_count.label("ratings_count"),
+                (
+                    cast(ratings_sum, Float) / func.nullif(ratings_count, 0)
+                ).label("average_rating"),
+            )
+            .outerjoin(Movie, Movie.director_id == Director.id)
+            .outerjoin(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+            .outerjoin(pending, pending.c.movie_id == Movie.id)
+            .where(Director.id.in_(director_ids))
+            .group_by(Director.id, Director.name, Director.birth_year)
+            .order_by(Director.id)
+        )
@@ -0,0 +1,16 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.movie import movie_genres
+
+
+class GenresRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def movie_counts(self) -> dict[int, int]:
+        """Number of movies per genre id; genres without movies are absent."""
+        query = select(movie_genres.c.genre_id, func.count().label("movie_count")).group_by(
+            movie_genres.c.genre_id
+        )
+        return {row.genre_id: row.movie_count for row in self.db.execute(query)}
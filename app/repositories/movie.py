@@ -1,11 +1,14 @@
 from typing import Optional
 
-from sqlalchemy import Float, delete, func, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.models.genre import Genre
 from app.models.movie import Movie, movie_genres
 from app.models.movie_rating import MovieRating
+from app.models.movie_rating_daily import MovieRatingDaily
+from app.models.movie_rating_stat_shard import MovieRatingStatShard
+from app.models.movie_rating_stats import MovieRatingStats
+from app.repositories.rating_aggregates import rating_aggregates
 
 
 class MovieRepository:
@@ -23,23 +26,18 @@ class MovieRepository:
             List of dicts with keys: id, title, director_id, release_year, cast,
                                      avg_rating, rating_count
         """
+        aggregates = rating_aggregates()
         query = select(
             Movie.id,
             Movie.title,
             Movie.director_id,
             Movie.release_year,
             Movie.cast,
-            func.avg(MovieRating.score).cast(Float).label("avg_rating"),
-            func.count(MovieRating.id).label("rating_count"),
+            aggregates.c.avg_rating,
+            aggregates.c.rating_count,
         ).outerjoin(
-            MovieRating,
-            Movie.id == MovieRating.movie_id,
-        ).group_by(
-            Movie.id,
-            Movie.title,
-            Movie.director_id,
-            Movie.release_year,
-            Movie.cast,
+            aggregates,
+            Movie.id == aggregates.c.movie_id,
         )
 
         result = self.db.execute(query).fetchall()
@@ -72,25 +70,20 @@ class MovieRepository:
                            avg_rating, rating_count
             Returns None if movie not found.
         """
+        aggregates = rating_aggregates([movie_id])
         query = select(
             Movie.id,
             Movie.title,
             Movie.director_id,
             Movie.release_year,
             Movie.cast,
-            func.avg(MovieRating.score).cast(Float).label("avg_rating"),
-            func.count(MovieRating.id).label("rating_count"),
+            aggregates.c.avg_rating,
+            aggregates.c.rating_count,
         ).where(
             Movie.id == movie_id,
         ).outerjoin(
-            MovieRating,
-            Movie.id == MovieRating.movie_id,
-        ).group_by(
-            Movie.id,
-            Movie.title,
-            Movie.director_id,
-            Movie.release_year,
-            Movie.cast,
+            aggregates,
+            Movie.id == aggregates.c.movie_id,
         )
 
         result = self.db.execute(query).first()
@@ -120,12 +113,8 @@ class MovieRepository:
         Returns:
             Dict with keys: avg_rating (float or None), rating_count (int)
         """
-        query = select(
-            func.avg(MovieRating.score).cast(Float).label("avg_rating"),
-            func.count(MovieRating.id).label("rating_count"),
-        ).where(
-            MovieRating.movie_id == movie_id,
-        )
+        aggregates = rating_aggregates([movie_id])
+        query = select(aggregates.c.avg_rating, aggregates.c.rating_count)
 
         result = self.db.execute(query).first()
         return {
@@ -150,15 +139,7 @@ class MovieRepository:
         if not movie_ids:
             return {}
 
-        query = select(
-            MovieRating.movie_id,
-            func.avg(MovieRating.score).cast(Float).label("avg_rating"),
-            func.count(MovieRating.id).label("rating_count"),
-        ).where(
-            MovieRating.movie_id.in_(movie_ids),
-        ).group_by(
-            MovieRating.movie_id,
-        )
+        query = select(rating_aggregates(movie_ids))
 
         results = self.db.execute(query).fetchall()
 
@@ -179,11 +160,16 @@ class MovieRepository:
         )
         return self.db.execute(query).scalars().first()
 
-    def get_genres_by_ids(self, genre_ids: list[int]) -> list[Genre]:
-        if not genre_ids:
-            return []
-        query = select(Genre).where(Genre.id.in_(genre_ids))
-        return self.db.execute(query).scalars().all()
+    def replace_movie_genres(self, movie_id: int, genre_ids: list[int]) -> None:
+        """Replace a movie's genre links; `genre_ids` must already be validated."""
+        self.db.execute(
+            delete(movie_genres).where(movie_genres.c.movie_id == movie_id),
+        )
+        if genre_ids:
+            self.db.execute(
+                insert(movie_genres),
+                [{"movie_id": movie_id, "genre_id": genre_id} for genre_id in genre_ids],
+            )
 
     def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
         query = select(Movie).where(Movie.id == movie_id)
@@ -196,6 +182,15 @@ class MovieRepository:
         self.db.execute(
             delete(MovieRating).where(MovieRating.movie_id == movie_id),
         )
+        self.db.execute(
+            delete(MovieRatingDaily).where(MovieRatingDaily.movie_id == movie_id),
+        )
+        self.db.execute(
+            delete(MovieRatingStatShard).where(MovieRatingStatShard.movie_id == movie_id),
+        )
+        self.db.execute(
+            delete(MovieRatingStats).where(MovieRatingStats.movie_id == movie_id),
+        )
         self.db.execute(
             delete(Movie).where(Movie.id == movie_id),
         )
@@ -1,12 +1,39 @@
+from dataclasses import dataclass
 from typing import Optional
 
-from sqlalchemy import Float, func, select
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import Select, String, cast, func, insert, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
 
 from app.models.director import Director
 from app.models.genre import Genre
-from app.models.movie import Movie
+from app.models.movie import Movie, movie_genres
 from app.models.movie_rating import MovieRating
+from app.models.movie_rating_stats import MovieRatingStats
+from app.repositories.projections import DirectorRecord, MovieDetailRecord, MovieListRecord
+from app.repositories.rating_aggregates import rating_aggregates
+from app.repositories.rating_stats import RatingStatsRepository
+
+FACETS = ("genre", "release_year")
+SORT_KEYS = ("id", "release_year", "title", "average_rating", "ratings_count")
+
+
+@dataclass(frozen=True)
+class MovieFilters:
+    """List filters. Genre names are resolved to ids by the caller.
+
+    `genre_ids` match movies with any of the genres, or all of them with
+    `match_all_genres`. The rating filters read `movie_rating_stats`.
+    """
+
+    title: Optional[str] = None
+    release_year: Optional[int] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    genre_ids: tuple[int, ...] = ()
+    match_all_genres: bool = False
+    director_id: Optional[int] = None
+    min_rating: Optional[float] = None
+    min_rating_count: Optional[int] = None
 
 
 class MoviesRepository:
@@ -20,88 +47,220 @@ class MoviesRepository:
         *,
         page: int,
         page_size: int,
-        title: Optional[str] = None,
-        release_year: Optional[int] = None,
-        genre: Optional[str] = None,
-    ) -> tuple[int, list[Movie], dict[int, dict]]:
-        base_query = select(Movie.id)
-
-        if title:
-            base_query = base_query.where(Movie.title.ilike(f"%{title}%"))
-        if release_year is not None:
-            base_query = base_query.where(Movie.release_year == release_year)
-        if genre:
-            base_query = base_query.join(Movie.genres).where(
-                func.lower(Genre.name) == func.lower(genre),
-            )
-
-        base_query = base_query.distinct()
+        filters: MovieFilters = MovieFilters(),
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[tuple] = None,
+    ) -> tuple[int, list[MovieListRecord], Optional[tuple]]:
+        """Return one page of filtered movies in `sort` order.
 
+        With `after` (the `(sort value, id)` key of the last row already seen)
+        the page is selected by keyset instead of OFFSET and `page` is ignored.
+        The last element of the result is the key of this page's last row when
+        more rows follow, otherwise None.
+        """
         total_items = self.db.execute(
-            select(func.count()).select_from(base_query.subquery()),
+            self._apply_filters(select(func.count(Movie.id)), filters),
         ).scalar_one()
 
-        offset = (page - 1) * page_size
-        page_query = (
-            base_query.order_by(Movie.id)
-            .offset(offset)
-            .limit(page_size)
-        )
-        movie_ids = [row.id for row in self.db.execute(page_query).all()]
-        if not movie_ids:
-            return total_items, [], {}
+        sort_column = self._sort_column(sort)
+        page_query = self._apply_filters(select(Movie.id, sort_column.label("sort_value")), filters)
+        if sort in ("average_rating", "ratings_count"):
+            page_query = page_query.join(MovieRatingStats, MovieRatingStats.movie_id == Movie.id)
+        if after is not None:
+            key = tuple_(sort_column, Movie.id)
+            bound = tuple_(literal(after[0]), literal(after[1]))
+            page_query = page_query.where(key < bound if descending else key > bound)
+        else:
+            page_query = page_query.offset((page - 1) * page_size)
+        if descending:
+            page_query = page_query.order_by(sort_column.desc(), Movie.id.desc())
+        else:
+            page_query = page_query.order_by(sort_column, Movie.id)
 
-        movies_query = (
-            select(Movie)
-            .options(joinedload(Movie.director), selectinload(Movie.genres))
-            .where(Movie.id.in_(movie_ids))
-        )
-        movies = self.db.execute(movies_query).scalars().all()
+        rows = self.db.execute(page_query.limit(page_size + 1)).all()
+        next_key = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_key = (rows[-1].sort_value, rows[-1].id)
+        return total_items, self.get_movies_page([row.id for row in rows]), next_key
+
+    def get_movies_page(self, movie_ids: list[int]) -> list[MovieListRecord]:
+        """Load list records for the given movies, in the given order."""
+        if not movie_ids:
+            return []
 
-        aggregates_query = (
+        aggregates = rating_aggregates(movie_ids)
+        query = (
             select(
-                MovieRating.movie_id,
-                func.avg(MovieRating.score).cast(Float).label("average_rating"),
-                func.count(MovieRating.id).label("ratings_count"),
+                Movie.id,
+                Movie.title,
+                Movie.release_year,
+                Director.id.label("director_id"),
+                Director.name.label("director_name"),
+                aggregates.c.avg_rating,
+                aggregates.c.rating_count,
             )
-            .where(MovieRating.movie_id.in_(movie_ids))
-            .group_by(MovieRating.movie_id)
+            .join(Director, Director.id == Movie.director_id)
+            .outerjoin(aggregates, aggregates.c.movie_id == Movie.id)
+            .where(Movie.id.in_(movie_ids))
         )
-        aggregates = self.db.execute(aggregates_query).all()
-        aggregates_map = {
-            row.movie_id: {
-                "average_rating": row.average_rating,
-                "ratings_count": row.ratings_count,
-            }
-            for row in aggregates
+        genres = self._genre_names(movie_ids)
+        records = {
+            row.id: MovieListRecord(
+                row.id,
+                row.title,
+                row.release_year,
+                DirectorRecord(row.director_id, row.director_name),
+                genres.get(row.id, []),
+                row.avg_rating,
+                row.rating_count or 0,
+            )
+            for row in self.db.execute(query)
         }
+        return [records[movie_id] for movie_id in movie_ids if movie_id in records]
 
-        movie_by_id = {movie.id: movie for movie in movies}
-        ordered_movies = [movie_by_id[movie_id] for movie_id in movie_ids if movie_id in movie_by_id]
-        return total_items, ordered_movies, aggregates_map
-
-    def get_movie_detail(self, movie_id: int) -> tuple[Optional[Movie], dict]:
-        movie_query = (
-            select(Movie)
-            .options(joinedload(Movie.director), selectinload(Movie.genres))
-            .where(Movie.id == movie_id)
+    def _genre_names(self, movie_ids: list[int]) -> dict[int, list[str]]:
+        query = (
+            select(movie_genres.c.movie_id, Genre.name)
+            .join(Genre, Genre.id == movie_genres.c.genre_id)
+            .where(movie_genres.c.movie_id.in_(movie_ids))
+            .order_by(movie_genres.c.movie_id, Genre.name)
         )
-        movie = self.db.execute(movie_query).scalars().first()
-        if not movie:
-            return None, {"average_rating": None, "ratings_count": 0}
+        names: dict[int, list[str]] = {}
+        for movie_id, name in self.db.execute(query):
+            names.setdefault(movie_id, []).append(name)
+        return names
 
-        aggregate_query = (
+    def facet_counts(
+        self,
+        facets: list[str],
+        filters: MovieFilters = MovieFilters(),
+    ) -> dict[str, list[dict]]:
+        """Count matching movies per genre and/or release year.
+
+        All requested facets are computed in one round trip: one grouped query
+        per facet over the filtered id set, combined with UNION ALL.
+        """
+        if not facets:
+            return {}
+        filtered_ids = self._apply_filters(select(Movie.id), filters)
+        parts = []
+        if "genre" in facets:
+            parts.append(
+                select(
+                    literal("genre").label("facet"),
+                    Genre.name.label("value"),
+                    func.count().label("count"),
+                )
+                .join(movie_genres, movie_genres.c.genre_id == Genre.id)
+                .where(movie_genres.c.movie_id.in_(filtered_ids))
+                .group_by(Genre.id, Genre.name)
+            )
+        if "release_year" in facets:
+            parts.append(
+                select(
+                    literal("release_year").label("facet"),
+                    cast(Movie.release_year, String).label("value"),
+                    func.count().label("count"),
+                )
+                .where(Movie.id.in_(filtered_ids))
+                .group_by(Movie.release_year)
+            )
+        query = parts[0] if len(parts) == 1 else union_all(*parts)
+
+        counts: dict[str, list[dict]] = {facet: [] for facet in facets}
+        for row in self.db.execute(query).all():
+            value = int(row.value) if row.facet == "release_year" else row.value
+            counts[row.facet].append({"value": value, "count": row.count})
+        counts.get("genre", []).sort(key=lambda item: (-item["count"], item["value"]))
+        counts.get("release_year", []).sort(key=lambda item: item["value"])
+        return counts
+
+    def get_movie_detail(self, movie_id: int) -> Optional[MovieDetailRecord]:
+        aggregates = rating_aggregates([movie_id])
+        query = (
             select(
-                func.avg(MovieRating.score).cast(Float).label("average_rating"),
-                func.count(MovieRating.id).label("ratings_count"),
+                Movie.id,
+                Movie.title,
+                Movie.release_year,
+                Movie.cast,
+                Director.id.label("director_id"),
+                Director.name.label("director_name"),
+                Director.birth_year,
+                Director.description,
+                aggregates.c.avg_rating,
+                aggregates.c.rating_count,
             )
-            .where(MovieRating.movie_id == movie_id)
+            .join(Director, Director.id == Movie.director_id)
+            .outerjoin(aggregates, aggregates.c.movie_id == Movie.id)
+            .where(Movie.id == movie_id)
+        )
+        row = self.db.execute(query).first()
+        if row is None:
+            return None
+        return MovieDetailRecord(
+            row.id,
+            row.title,
+            row.release_year,
+            DirectorRecord(row.director_id, row.director_name, row.birth_year, row.description),
+            self._genre_names([movie_id]).get(movie_id, []),
+            row.avg_rating,
+            row.rating_count or 0,
+            cast=row.cast,
         )
-        aggregate_row = self.db.execute(aggregate_query).first()
-        return movie, {
-            "average_rating": aggregate_row.average_rating if aggregate_row else None,
-            "ratings_count": aggregate_row.ratings_count if aggregate_row else 0,
-        }
+
+    @staticmethod
+    def _sort_column(sort: str):
+        return {
+            "id": Movie.id,
+            "release_year": Movie.release_year,
+            "title": Movie.title,
+            "average_rating": MovieRatingStats.average_rating,
+            "ratings_count": MovieRatingStats.ratings_count,
+        }[sort]
+
+    @staticmethod
+    def _apply_filters(query: Select, filters: MovieFilters) -> Select:
+        """Add `filters` as predicates on `movies`.
+
+        Genre and rating filters are semi-joins (`movies.id IN (...)`) on the
+        indexed `movie_genres (genre_id, movie_id)` and `movie_rating_stats`
+        columns, so they never duplicate rows and need no DISTINCT.
+        """
+        if filters.title:
+            query = query.where(Movie.title.ilike(f"%{filters.title}%"))
+        if filters.release_year is not None:
+            query = query.where(Movie.release_year == filters.release_year)
+        if filters.year_from is not None:
+            query = query.where(Movie.release_year >= filters.year_from)
+        if filters.year_to is not None:
+            query = query.where(Movie.release_year <= filters.year_to)
+        if filters.director_id is not None:
+            query = query.where(Movie.director_id == filters.director_id)
+        if filters.genre_ids:
+            genre_ids = sorted(set(filters.genre_ids))
+            with_genres = select(movie_genres.c.movie_id)
+            if len(genre_ids) == 1:
+                with_genres = with_genres.where(movie_genres.c.genre_id == genre_ids[0])
+            else:
+                with_genres = with_genres.where(movie_genres.c.genre_id.in_(genre_ids))
+                if filters.match_all_genres:
+                    with_genres = with_genres.group_by(movie_genres.c.movie_id).having(
+                        func.count() == len(genre_ids)
+                    )
+            query = query.where(Movie.id.in_(with_genres))
+        if filters.min_rating is not None or filters.min_rating_count is not None:
+            rated = select(MovieRatingStats.movie_id)
+            if filters.min_rating is not None:
+                rated = rated.where(
+                    MovieRatingStats.average_rating >= filters.min_rating,
+                    MovieRatingStats.ratings_count > 0,
+                )
+            if filters.min_rating_count is not None:
+                rated = rated.where(MovieRatingStats.ratings_count >= filters.min_rating_count)
+            query = query.where(Movie.id.in_(rated))
+        return query
 
     def get_director_by_id(self, director_id: int) -> Optional[Director]:
         query = select(Director).where(Director.id == director_id)
@@ -111,12 +270,6 @@ class MoviesRepository:
         query = select(Movie).where(Movie.id == movie_id)
         return self.db.execute(query).scalars().first()
 
-    def get_genres_by_ids(self, genre_ids: list[int]) -> list[Genre]:
-        if not genre_ids:
-            return []
-        query = select(Genre).where(Genre.id.in_(genre_ids))
-        return self.db.execute(query).scalars().all()
-
     def create_movie(
         self,
         *,
@@ -124,21 +277,34 @@ class MoviesRepository:
         director_id: int,
         release_year: int,
         cast: Optional[str],
-        genres: list[Genre],
+        genre_ids: list[int],
     ) -> Movie:
+        """Insert a movie, its genre links and its rating stats row.
+
+        `genre_ids` must already be validated; links are inserted directly
+        rather than loading `Genre` rows for the relationship.
+        """
         movie = Movie(
             title=title,
             director_id=director_id,
             release_year=release_year,
             cast=cast,
         )
-        movie.genres = genres
         self.db.add(movie)
         self.db.flush()
+        if genre_ids:
+            self.db.execute(
+                insert(movie_genres),
+                [{"movie_id": movie.id, "genre_id": genre_id} for genre_id in genre_ids],
+            )
+        self.db.add(MovieRatingStats(movie_id=movie.id))
+        self.db.flush()
         return movie
 
-    def create_rating(self, *, movie_id: int, score: int) -> MovieRating:
+    def create_rating(self, *, movie_id: int, score: int, shards: int = 0) -> MovieRating:
+        """Insert a rating and count it in the movie's stats (see `RatingStatsRepository.add`)."""
         rating = MovieRating(movie_id=movie_id, score=score)
         self.db.add(rating)
         self.db.flush()
+        RatingStatsRepository(self.db).add(movie_id, score, shards=shards)
         return rating
@@ -0,0 +1,55 @@
+"""Plain records for the movie list and detail read paths.
+
+These queries select only the columns a response needs, straight into these
+`__slots__` classes: no ORM identity map, no lazy-load state and no per-row
+dict copy. The response schemas read them by attribute (`from_attributes`).
+Attribute names follow the schemas' validation aliases (`avg_rating`,
+`rating_count`).
+"""
+from typing import Optional
+
+
+class DirectorRecord:
+    __slots__ = ("id", "name", "birth_year", "description")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        birth_year: Optional[int] = None,
+        description: Optional[str] = None,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.birth_year = birth_year
+        self.description = description
+
+
+class MovieListRecord:
+    __slots__ = ("id", "title", "release_year", "director", "genres", "avg_rating", "rating_count")
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        release_year: int,
+        director: DirectorRecord,
+        genres: list[str],
+        avg_rating: Optional[float],
+        rating_count: int,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.release_year = release_year
+        self.director = director
+        self.genres = genres
+        self.avg_rating = avg_rating
+        self.rating_count = rating_count
+
+
+class MovieDetailRecord(MovieListRecord):
+    __slots__ = ("cast",)
+
+    def __init__(self, *args, cast: Optional[str] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cast = cast
@@ -0,0 +1,50 @@
+"""Rating aggregates over raw ratings plus compacted daily summaries.
+
+The compaction job folds old `movie_ratings` rows into `movie_rating_daily`
+and deletes them. Every aggregate read builds on `rating_counts()`, which
+combines both tables into (movie_id, score, ratings) rows, so counts,
+averages and score histograms are the same before and after compaction.
+"""
+from typing import Optional, Sequence
+
+from sqlalchemy import BigInteger, Float, Subquery, cast, func, select, union_all
+
+from app.models.movie_rating import MovieRating
+from app.models.movie_rating_daily import MovieRatingDaily
+
+
+def rating_counts(movie_ids: Optional[Sequence[int]] = None) -> Subquery:
+    """Number of ratings per (movie_id, score), raw and compacted rows combined.
+
+    A movie/score pair may appear twice, once per source.
+    """
+    raw = select(
+        MovieRating.movie_id,
+        MovieRating.score,
+        func.count().label("ratings"),
+    ).group_by(MovieRating.movie_id, MovieRating.score)
+    compacted = select(
+        MovieRatingDaily.movie_id,
+        MovieRatingDaily.score,
+        func.sum(MovieRatingDaily.ratings_count).label("ratings"),
+    ).group_by(MovieRatingDaily.movie_id, MovieRatingDaily.score)
+    if movie_ids is not None:
+        raw = raw.where(MovieRating.movie_id.in_(movie_ids))
+        compacted = compacted.where(MovieRatingDaily.movie_id.in_(movie_ids))
+    return union_all(raw, compacted).subquery("rating_counts")
+
+
+def rating_aggregates(movie_ids: Optional[Sequence[int]] = None) -> Subquery:
+    """`movie_id`, `avg_rating` and `rating_count` for every rated movie."""
+    counts = rating_counts(movie_ids)
+    total = func.sum(counts.c.ratings)
+    score_sum = func.sum(counts.c.score * counts.c.ratings)
+    return (
+        select(
+            counts.c.movie_id,
+            (cast(score_sum, Float) / cast(total, Float)).label("avg_rating"),
+            cast(total, BigInteger).label("rating_count"),
+        )
+        .group_by(counts.c.movie_id)
+        .subquery("rating_aggregates")
+    )
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+from typing import Sequence
+
+from sqlalchemy import Row, delete, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.movie_rating import MovieRating
+from app.models.movie_rating_daily import MovieRatingDaily
+
+
+class RatingCompactionRepository:
+    """Moves old raw ratings into `movie_rating_daily`, one batch at a time."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def claim_batch(self, cutoff: datetime, limit: int) -> Sequence[Row]:
+        """Lock up to `limit` ratings created before `cutoff`.
+
+        Rows locked by a concurrent compaction run are skipped (PostgreSQL),
+        so several workers can compact at once without double counting.
+        """
+        query = (
+            select(MovieRating.id, MovieRating.movie_id, MovieRating.score, MovieRating.created_at)
+            .where(MovieRating.created_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return self.db.execute(query).all()
+
+    def add_daily_counts(self, counts: dict[tuple[int, date, int], int]) -> None:
+        """Add `counts[(movie_id, day, score)]` to the summary rows (upsert)."""
+        rows = [
+            {"movie_id": movie_id, "day": day, "score": score, "ratings_count": count}
+            for (movie_id, day, score), count in counts.items()
+        ]
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            for row in rows:
+                key = (row["movie_id"], row["day"], row["score"])
+                summary = self.db.get(MovieRatingDaily, key, with_for_update=True)
+                if summary is None:
+                    self.db.add(MovieRatingDaily(**row))
+                else:
+                    summary.ratings_count += row["ratings_count"]
+            self.db.flush()
+            return
+
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(MovieRatingDaily)
+        statement = statement.on_conflict_do_update(
+            index_elements=[MovieRatingDaily.movie_id, MovieRatingDaily.day, MovieRatingDaily.score],
+            set_={"ratings_count": MovieRatingDaily.ratings_count + statement.excluded.ratings_count},
+        )
+        self.db.execute(statement, rows)
+
+    def delete_ratings(self, rating_ids: list[int], *, since: datetime, before: datetime) -> None:
+        """Delete claimed ratings, all created in `[since, before)`.
+
+        The `created_at` bounds let PostgreSQL prune a partitioned
+        `movie_ratings` to the compacted months instead of probing the
+        `id` index of every partition.
+        """
+        self.db.execute(
+            delete(MovieRating).where(
+                MovieRating.id.in_(rating_ids),
+                MovieRating.created_at >= since,
+                MovieRating.created_at < before,
+            )
+        )
@@ -0,0 +1,173 @@
+import random
+from typing import Iterable, Sequence, Union
+
+from sqlalchemy import Float, Row, Select, bindparam, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.movie_rating_stat_shard import MovieRatingStatShard
+from app.models.movie_rating_stats import MovieRatingStats
+
+
+def pending_shard_totals(movie_ids: Union[Iterable[int], Select]):
+    """Subquery of (movie_id, ratings_count, ratings_sum) not yet merged into stats.
+
+    Only shards of `movie_ids` (ids or a select of ids) are aggregated, so the
+    cost follows the movies being read rather than the whole shard table.
+    """
+    return (
+        select(
+            MovieRatingStatShard.movie_id,
+            func.sum(MovieRatingStatShard.ratings_count).label("ratings_count"),
+            func.sum(MovieRatingStatShard.ratings_sum).label("ratings_sum"),
+        )
+        .where(MovieRatingStatShard.movie_id.in_(movie_ids))
+        .group_by(MovieRatingStatShard.movie_id)
+        .subquery("pending_shards")
+    )
+
+
+class RatingStatsRepository:
+    """Writes to `movie_rating_stats`, directly or through counter shards."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def add(self, movie_id: int, score: int, *, shards: int = 0) -> None:
+        """Count one new score for the movie.
+
+        With `shards` > 0 the score goes to one of that many shard rows, picked
+        at random, instead of the movie's single stats row.
+        """
+        if shards > 0:
+            self._add_to_shard(movie_id, random.randrange(shards), score)
+        else:
+            self.add_to_stats([{"movie_id": movie_id, "ratings_count": 1, "ratings_sum": score}])
+
+    def add_to_stats(self, rows: list[dict]) -> None:
+        """Add each row's `ratings_count`/`ratings_sum` to its movie's stats (upsert)."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            for row in rows:
+                stats = self.db.get(MovieRatingStats, row["movie_id"], with_for_update=True)
+                if stats is None:
+                    stats = MovieRatingStats(movie_id=row["movie_id"], ratings_count=0, ratings_sum=0)
+                    self.db.add(stats)
+                stats.ratings_count += row["ratings_count"]
+                stats.ratings_sum += row["ratings_sum"]
+                stats.average_rating = (
+                    stats.ratings_sum / stats.ratings_count if stats.ratings_count else 0.0
+                )
+            self.db.flush()
+            return
+
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(MovieRatingStats)
+        new_count = MovieRatingStats.ratings_count + statement.excluded.ratings_count
+        new_sum = MovieRatingStats.ratings_sum + statement.excluded.ratings_sum
+        statement = statement.on_conflict_do_update(
+            index_elements=[MovieRatingStats.movie_id],
+            set_={
+                "ratings_count": new_count,
+                "ratings_sum": new_sum,
+                "average_rating": func.coalesce(
+                    cast(new_sum, Float) / func.nullif(new_count, 0), 0.0
+                ),
+            },
+        )
+        self.db.execute(
+            statement,
+            [
+                {
+                    **row,
+                    "average_rating": row["ratings_sum"] / row["ratings_count"]
+                    if row["ratings_count"]
+                    else 0.0,
+                }
+                for row in rows
+            ],
+        )
+
+    def _add_to_shard(self, movie_id: int, shard: int, score: int) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            row = self.db.get(MovieRatingStatShard, (movie_id, shard), with_for_update=True)
+            if row is None:
+                row = MovieRatingStatShard(movie_id=movie_id, shard=shard, ratings_count=0, ratings_sum=0)
+                self.db.add(row)
+            row.ratings_count += 1
+            row.ratings_sum += score
+            self.db.flush()
+            return
+
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(MovieRatingStatShard).values(
+            movie_id=movie_id, shard=shard, ratings_count=1, ratings_sum=score
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[MovieRatingStatShard.movie_id, MovieRatingStatShard.shard],
+            set_={
+                "ratings_count": MovieRatingStatShard.ratings_count + 1,
+                "ratings_sum": MovieRatingStatShard.ratings_sum + score,
+            },
+        )
+        self.db.execute(statement)
+
+    def claim_shards(self, limit: int) -> Sequence[Row]:
+        """Lock up to `limit` non-empty shard rows.
+
+        Rows locked by a concurrent merge, or by a rating being written, are
+        skipped (PostgreSQL) and picked up by the next batch.
+        """
+        query = (
+            select(
+                MovieRatingStatShard.movie_id,
+                MovieRatingStatShard.shard,
+                MovieRatingStatShard.ratings_count,
+                MovieRatingStatShard.ratings_sum,
+            )
+            .where(MovieRatingStatShard.ratings_count != 0)
+            .order_by(MovieRatingStatShard.movie_id, MovieRatingStatShard.shard)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return self.db.execute(query).all()
+
+    def subtract_from_shards(self, rows: Sequence[Row]) -> None:
+        """Take the claimed amounts out of the shards and drop the emptied rows.
+
+        Subtracting exactly what was read, rather than deleting the row, keeps
+        any increment that slipped in since (possible where the claim does not
+        lock, as on SQLite).
+        """
+        # Core executemany: an ORM update with a parameter list would be taken
+        # as a bulk update by primary key, which does not allow this WHERE.
+        self.db.connection().execute(
+            update(MovieRatingStatShard)
+            .where(
+                MovieRatingStatShard.movie_id == bindparam("b_movie_id"),
+                MovieRatingStatShard.shard == bindparam("b_shard"),
+            )
+            .values(
+                ratings_count=MovieRatingStatShard.ratings_count - bindparam("b_count"),
+                ratings_sum=MovieRatingStatShard.ratings_sum - bindparam("b_sum"),
+            ),
+            [
+                {
+                    "b_movie_id": row.movie_id,
+                    "b_shard": row.shard,
+                    "b_count": row.ratings_count,
+                    "b_sum": row.ratings_sum,
+                }
+                for row in rows
+            ],
+        )
+        self.db.execute(
+            delete(MovieRatingStatShard)
+            .where(
+                MovieRatingStatShard.movie_id.in_({row.movie_id for row in rows}),
+                MovieRatingStatShard.ratings_count == 0,
+            )
+            .execution_options(synchronize_session=False)
+        )
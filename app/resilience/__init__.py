@@ -0,0 +1,13 @@
+from app.resilience.admission import AdmissionLimits, AdmissionMiddleware, ConcurrencyLimiter
+from app.resilience.circuit_breaker import CircuitBreaker, database_breaker
+from app.resilience.stale import ReadResult, StaleWhileRevalidate
+
+__all__ = [
+    "AdmissionLimits",
+    "AdmissionMiddleware",
+    "CircuitBreaker",
+    "ConcurrencyLimiter",
+    "ReadResult",
+    "StaleWhileRevalidate",
+    "database_breaker",
+]
@@ -0,0 +1,151 @@
+"""Admission control: bound concurrent work per route class and shed the rest.
+
+Each route class (reads, writes) has a concurrency limit and a bounded FIFO
+wait queue. A request that finds the queue full, or waits longer than the
+queue timeout, is rejected immediately with 503 and `Retry-After` instead of
+piling up in the threadpool waiting for a pooled connection.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from app.exceptions.handlers import _failure_payload
+from app.observability.metrics import registry
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+admission_in_flight = registry.gauge(
+    "admission_in_flight",
+    "Requests admitted and currently running, by route class.",
+    ("route_class",),
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission, by route class.",
+    ("route_class",),
+)
+admission_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted requests spent waiting in the queue.",
+    ("route_class",),
+)
+admission_rejected = registry.counter(
+    "admission_rejected_total",
+    "Requests shed with 503, by route class and reason (queue_full, timeout).",
+    ("route_class", "reason"),
+)
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_concurrency: int
+    max_queue: int
+    queue_timeout_s: float
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        super().__init__(reason)
+
+
+class ConcurrencyLimiter:
+    """FIFO concurrency limiter with a bounded wait queue.
+
+    Slots are handed directly to the oldest waiter on release, so a newly
+    arriving request can never overtake queued ones. Must be used from a
+    single event loop.
+    """
+
+    def __init__(self, name: str, limits: AdmissionLimits) -> None:
+        self.name = name
+        self.limits = limits
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self._active < self.limits.max_concurrency and not self._waiters:
+            self._active += 1
+            admission_in_flight.inc(self.name)
+            return
+        if len(self._waiters) >= self.limits.max_queue:
+            admission_rejected.inc(self.name, "queue_full")
+            raise Rejected("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        admission_queue_depth.inc(self.name)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.limits.queue_timeout_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            admission_queue_depth.dec(self.name)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            admission_rejected.inc(self.name, "timeout")
+            raise Rejected("timeout") from None
+        admission_queue_depth.dec(self.name)
+        admission_queue_wait.observe(time.perf_counter() - started, self.name)
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter; `_active` is unchanged.
+                waiter.set_result(None)
+                return
+        self._active -= 1
+        admission_in_flight.dec(self.name)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying a `ConcurrencyLimiter` per route class."""
+
+    def __init__(
+        self,
+        app,
+        read_limits: AdmissionLimits,
+        write_limits: AdmissionLimits,
+        retry_after_s: int = 1,
+        excluded_paths: tuple[str, ...] = ("/health", "/metrics"),
+    ) -> None:
+        self.app = app
+        self.readers = ConcurrencyLimiter("read", read_limits)
+        self.writers = ConcurrencyLimiter("write", write_limits)
+        self.retry_after_s = retry_after_s
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.readers if scope["method"] in READ_METHODS else self.writers
+        try:
+            await limiter.acquire()
+        except Rejected:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content=_failure_payload(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Service is overloaded, retry later",
+                ),
+                headers={"Retry-After": str(self.retry_after_s)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
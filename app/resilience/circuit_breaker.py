@@ -0,0 +1,87 @@
+"""Circuit breaker that stops sending work to a failing dependency."""
+import threading
+import time
+
+from app.observability.metrics import registry
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+    ("breaker",),
+)
+circuit_opened = registry.counter(
+    "circuit_breaker_opened_total",
+    "Times the circuit breaker opened.",
+    ("breaker",),
+)
+
+
+class CircuitBreaker:
+    """Classic closed / open / half-open breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    `allow()` returns False for `reset_timeout_s`. It then lets a single probe
+    through (half-open); the probe's outcome closes or re-opens it. A probe
+    that never reports back is replaced after another `reset_timeout_s`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        circuit_state.set(_STATE_VALUES[CLOSED], name)
+
+    def configure(self, failure_threshold: int, reset_timeout_s: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == OPEN:
+                if now - self._opened_at < self.reset_timeout_s:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout_s:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    circuit_opened.inc(self.name)
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        circuit_state.set(_STATE_VALUES[state], self.name)
+
+
+# Shared by every read path that talks to the primary database.
+database_breaker = CircuitBreaker("database")
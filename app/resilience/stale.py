@@ -0,0 +1,143 @@
+"""Stale-while-revalidate reads backed by a local last-known-good cache.
+
+Every successful read is remembered. When a later read for the same key
+misses the latency budget, fails with a database error, or is blocked by an
+open circuit breaker, the remembered value is served instead and marked as
+stale. A read that missed the budget keeps running and refreshes the cache
+when it completes.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.exceptions import ServiceUnavailableError
+from app.observability.metrics import registry
+from app.resilience.circuit_breaker import CircuitBreaker
+
+stale_responses = registry.counter(
+    "stale_responses_total",
+    "Reads answered from the last-known-good cache, by reason (slow, error, circuit_open).",
+    ("cache", "reason"),
+)
+
+
+@dataclass(slots=True)
+class ReadResult:
+    value: Any
+    stale: bool = False
+    age_s: float = 0.0
+
+
+class _LastKnownGood:
+    """Thread-safe LRU of key -> (value, stored_at)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: Hashable, max_age_s: float) -> Optional[tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > max_age_s:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class StaleWhileRevalidate:
+    """Wrap an async read with a latency budget, a breaker and a stale fallback.
+
+    Disabled by default: `get()` then just awaits the read. Call `configure()`
+    to enable it. Only `failure_types` count as database failures; any other
+    exception (e.g. NotFoundError) means the database answered and is
+    propagated unchanged.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        failure_types: tuple[type[BaseException], ...] = (SQLAlchemyError,),
+    ) -> None:
+        self.name = name
+        self.breaker = breaker
+        self.failure_types = failure_types
+        self.enabled = False
+        self.budget_s = 0.3
+        self.max_age_s = 3600.0
+        self._cache = _LastKnownGood(2048)
+
+    def configure(self, *, enabled: bool, budget_ms: float, max_age_s: float, max_entries: int) -> None:
+        self.enabled = enabled
+        self.budget_s = budget_ms / 1000
+        self.max_age_s = max_age_s
+        self._cache.max_entries = max_entries
+        self._cache.clear()
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> ReadResult:
+        if not self.enabled:
+            return ReadResult(await fetch())
+
+        entry = self._cache.get(key, self.max_age_s)
+        if not self.breaker.allow():
+            if entry is None:
+                raise ServiceUnavailableError("Database is temporarily unavailable")
+            return self._stale(entry, "circuit_open")
+
+        task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+        if entry is None:
+            return ReadResult(await task)
+
+        try:
+            # shield: on timeout the read keeps going and refreshes the cache.
+            return ReadResult(await asyncio.wait_for(asyncio.shield(task), self.budget_s))
+        except asyncio.TimeoutError:
+            task.add_done_callback(_discard_result)
+            return self._stale(entry, "slow")
+        except self.failure_types:
+            return self._stale(entry, "error")
+
+    async def _fetch_and_store(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except self.failure_types:
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        self._cache.put(key, value)
+        return value
+
+    def _stale(self, entry: tuple[Any, float], reason: str) -> ReadResult:
+        stale_responses.inc(self.name, reason)
+        value, stored_at = entry
+        return ReadResult(value, stale=True, age_s=time.monotonic() - stored_at)
+
+
+def _discard_result(task: asyncio.Future) -> None:
+    # The background refresh already reported to the breaker; retrieving the
+    # exception avoids "Task exception was never retrieved" warnings.
+    if not task.cancelled():
+        task.exception()
@@ -1,4 +1,12 @@
 from app.schemas.common import ErrorDetail, FailureResponse, SuccessResponse
+from app.schemas.director import (
+    DirectorDetailOut,
+    DirectorListItemOut,
+    DirectorListPageOut,
+    FilmographyItemOut,
+    FilmographyPageOut,
+)
+from app.schemas.genre import GenreListItemOut
 from app.schemas.movie import (
     DirectorOut,
     MovieCreateIn,
@@ -30,4 +38,10 @@ __all__ = [
     "MovieUpdateIn",
     "RatingCreateIn",
     "RatingOut",
+    "DirectorListItemOut",
+    "DirectorListPageOut",
+    "DirectorDetailOut",
+    "FilmographyItemOut",
+    "FilmographyPageOut",
+    "GenreListItemOut",
 ]
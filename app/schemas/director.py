@@ -0,0 +1,40 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class DirectorListItemOut(BaseModel):
+    id: int
+    name: str
+    birth_year: Optional[int] = None
+    movie_count: int = 0
+    ratings_count: int = 0
+    average_rating: Optional[float] = None
+
+
+class DirectorListPageOut(BaseModel):
+    page: int
+    page_size: int
+    total_items: int
+    items: list[DirectorListItemOut] = Field(default_factory=list)
+
+
+class FilmographyItemOut(BaseModel):
+    id: int
+    title: str
+    release_year: int
+    genres: list[str] = Field(default_factory=list)
+    average_rating: Optional[float] = Field(default=None, validation_alias="avg_rating")
+    ratings_count: int = Field(default=0, validation_alias="rating_count")
+
+
+class FilmographyPageOut(BaseModel):
+    page: int
+    page_size: int
+    total_items: int
+    items: list[FilmographyItemOut] = Field(default_factory=list)
+
+
+class DirectorDetailOut(DirectorListItemOut):
+    description: Optional[str] = None
+    filmography: FilmographyPageOut
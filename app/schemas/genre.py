@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class GenreListItemOut(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    movie_count: int = 0
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class RatingAggregate(BaseModel):
@@ -58,6 +58,8 @@ class MovieUpdate(BaseModel):
 
 
 class DirectorOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     birth_year: Optional[int] = None
@@ -65,11 +67,15 @@ class DirectorOut(BaseModel):
 
 
 class DirectorSummaryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
 
 
 class MovieListItemOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str
     release_year: int
@@ -93,14 +99,32 @@ class MovieListItemOut(BaseModel):
         return value
 
 
+class FacetValueOut(BaseModel):
+    value: str | int
+    count: int
+
+
 class MovieListPageOut(BaseModel):
     page: int
     page_size: int
     total_items: int
     items: list[MovieListItemOut] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+    facets: Optional[dict[str, list[FacetValueOut]]] = None
+
+
+class SimilarMovieOut(MovieListItemOut):
+    score: float
+
+
+class SimilarMoviesOut(BaseModel):
+    movie_id: int
+    items: list[SimilarMovieOut] = Field(default_factory=list)
 
 
 class MovieDetailOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str
     release_year: int
@@ -1,7 +1,11 @@
+from app.services.directors_service import DirectorsService
+from app.services.genres_service import GenresService
 from app.services.movie import MovieService
 from app.services.movies_service import MoviesService
 
 __all__ = [
+    "DirectorsService",
+    "GenresService",
     "MovieService",
     "MoviesService",
 ]
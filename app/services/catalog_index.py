@@ -0,0 +1,326 @@
+"""In-process index of catalog metadata for genre/year filtering.
+
+Movies are stored in id order in compact NumPy columns; a movie's position in
+those columns is its bit in every bitset. Each release year and each genre has
+a bitset (an array of 64-bit words) of the movies it contains, so a filter is
+a few vectorised ANDs and ORs, a count is a popcount, and a page of ids is found
+from the running popcount without touching the other words. Only the selected
+page is then loaded from the database.
+
+The index is opt-in (`CATALOG_INDEX_ENABLED`, requires `numpy`), loaded at
+startup, and kept current by the write paths of this process. Title,
+director and rating filters are not indexed and always go to SQL.
+"""
+import logging
+import threading
+import time
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.genre import Genre
+from app.models.movie import Movie, movie_genres
+from app.observability.metrics import registry
+
+# numpy is optional and imported on first use (`_require_numpy`), so
+# processes with this feature off never pay for the import.
+np = None
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            raise RuntimeError("The catalog index requires numpy (pip install numpy)") from None
+        np = numpy
+
+
+logger = logging.getLogger("movie_rating")
+
+# Spare capacity (as a fraction of the catalog) for movies created after load.
+_HEADROOM = 0.25
+
+
+def _words_for(bits: int) -> int:
+    return (bits + 63) // 64
+
+
+def _pack(flags) -> "np.ndarray":
+    """Pack a boolean column (length a multiple of 64) into little-endian words."""
+    return np.packbits(flags, bitorder="little").view("<u8").copy()
+
+
+class CatalogIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._count = 0
+        self._ids = None
+        self._years = None
+        self._live = None
+        self._by_year: dict[int, "np.ndarray"] = {}
+        self._by_genre: dict[str, "np.ndarray"] = {}
+        self._genre_names: dict[str, str] = {}
+        self.ready = False
+
+    @property
+    def size(self) -> int:
+        live = self._live
+        return 0 if live is None else int(np.bitwise_count(live).sum())
+
+    def load(self, session_factory: sessionmaker) -> None:
+        """(Re)build the index from the database and swap it in."""
+        _require_numpy()
+        started = time.perf_counter()
+        with session_factory() as db:
+            state = self._build(db)
+        with self._lock:
+            (
+                self._count,
+                self._ids,
+                self._years,
+                self._live,
+                self._by_year,
+                self._by_genre,
+                self._genre_names,
+            ) = state
+            self.ready = True
+        logger.info(
+            "Catalog index loaded",
+            extra={
+                "movies": state[0],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+
+    @staticmethod
+    def _build(db: Session):
+        rows = db.execute(select(Movie.id, Movie.release_year).order_by(Movie.id)).all()
+        count = len(rows)
+        capacity = _words_for(int(count * (1 + _HEADROOM)) + 64) * 64
+
+        ids = np.zeros(capacity, dtype=np.int64)
+        years = np.zeros(capacity, dtype=np.int32)
+        if count:
+            ids[:count], years[:count] = zip(*rows)
+
+        live_flags = np.zeros(capacity, dtype=bool)
+        live_flags[:count] = True
+        live = _pack(live_flags)
+        by_year = {
+            int(year): _pack(live_flags & (years == year))
+            for year in np.unique(years[:count])
+        }
+
+        genre_rows = db.execute(
+            select(movie_genres.c.movie_id, Genre.name).join(
+                Genre, Genre.id == movie_genres.c.genre_id
+            )
+        ).all()
+        genre_names: dict[str, str] = {}
+        by_genre = {}
+        if genre_rows:
+            movie_ids = np.fromiter((row.movie_id for row in genre_rows), dtype=np.int64)
+            for row in genre_rows:
+                genre_names.setdefault(row.name.lower(), row.name)
+            codes = {key: code for code, key in enumerate(genre_names)}
+            genre_codes = np.fromiter(
+                (codes[row.name.lower()] for row in genre_rows), dtype=np.int32
+            )
+            positions = np.searchsorted(ids[:count], movie_ids)
+            known = positions < count
+            known[known] = ids[positions[known]] == movie_ids[known]
+            for key, code in codes.items():
+                flags = np.zeros(capacity, dtype=bool)
+                flags[positions[known & (genre_codes == code)]] = True
+                by_genre[key] = _pack(flags)
+        return count, ids, years, live, by_year, by_genre, genre_names
+
+    def _position(self, movie_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self._ids[:self._count], movie_id))
+        if position < self._count and self._ids[position] == movie_id:
+            return position
+        return None
+
+    def _grow(self) -> None:
+        extra = max(64, _words_for(int(self._count * _HEADROOM)) * 64)
+        self._ids = np.concatenate([self._ids, np.zeros(extra, dtype=np.int64)])
+        self._years = np.concatenate([self._years, np.zeros(extra, dtype=np.int32)])
+        pad = np.zeros(extra // 64, dtype="<u8")
+        self._live = np.concatenate([self._live, pad])
+        self._by_year = {key: np.concatenate([bits, pad]) for key, bits in self._by_year.items()}
+        self._by_genre = {key: np.concatenate([bits, pad]) for key, bits in self._by_genre.items()}
+
+    def _empty_bits(self) -> "np.ndarray":
+        return np.zeros(len(self._live), dtype="<u8")
+
+    def upsert(self, movie_id: int, release_year: int, genre_names: Iterable[str]) -> None:
+        """Reflect a committed create or update."""
+        if not self.ready:
+            return
+        with self._lock:
+            position = self._position(movie_id)
+            if position is None:
+                if self._count and movie_id < self._ids[self._count - 1]:
+                    # Ids must stay sorted; fall back to SQL until the next load.
+                    self.ready = False
+                    logger.warning("Catalog index disabled until reload", extra={"movie_id": movie_id})
+                    return
+                if self._count == len(self._ids):
+                    self._grow()
+                position = self._count
+                self._ids[position] = movie_id
+                self._count += 1
+            else:
+                self._clear(self._by_year[int(self._years[position])], position)
+                for bits in self._by_genre.values():
+                    self._clear(bits, position)
+
+            self._years[position] = release_year
+            self._set(self._live, position)
+            self._set(self._by_year.setdefault(release_year, self._empty_bits()), position)
+            for name in genre_names:
+                key = name.lower()
+                self._genre_names.setdefault(key, name)
+                self._set(self._by_genre.setdefault(key, self._empty_bits()), position)
+
+    def remove(self, movie_id: int) -> None:
+        """Reflect a committed delete."""
+        if not self.ready:
+            return
+        with self._lock:
+            position = self._position(movie_id)
+            if position is not None:
+                self._clear(self._live, position)
+
+    @staticmethod
+    def _set(bits: "np.ndarray", position: int) -> None:
+        bits[position >> 6] |= np.uint64(1 << (position & 63))
+
+    @staticmethod
+    def _clear(bits: "np.ndarray", position: int) -> None:
+        bits[position >> 6] &= ~np.uint64(1 << (position & 63))
+
+    def _filter(
+        self,
+        release_year: Optional[int] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        genres: Sequence[str] = (),
+        match_all_genres: bool = False,
+    ) -> "np.ndarray":
+        with self._lock:
+            return self._filter_locked(release_year, year_from, year_to, genres, match_all_genres)
+
+    def _filter_locked(
+        self,
+        release_year: Optional[int],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        genres: Sequence[str],
+        match_all_genres: bool,
+    ) -> "np.ndarray":
+        """Filter bits; the caller holds `_lock`, so every bitset has the same length."""
+        bits = self._live.copy()
+        if release_year is not None:
+            year_bits = self._by_year.get(release_year)
+            if year_bits is None:
+                return self._empty_bits()
+            np.bitwise_and(bits, year_bits, out=bits)
+        if year_from is not None or year_to is not None:
+            in_range = self._empty_bits()
+            for year, year_bits in self._by_year.items():
+                if (year_from is None or year >= year_from) and (year_to is None or year <= year_to):
+                    np.bitwise_or(in_range, year_bits, out=in_range)
+            np.bitwise_and(bits, in_range, out=bits)
+        if genres:
+            genre_bits = [self._by_genre.get(genre.lower()) for genre in genres]
+            if match_all_genres:
+                if any(item is None for item in genre_bits):
+                    return self._empty_bits()
+                for item in genre_bits:
+                    np.bitwise_and(bits, item, out=bits)
+            else:
+                any_genre = self._empty_bits()
+                for item in genre_bits:
+                    if item is not None:
+                        np.bitwise_or(any_genre, item, out=any_genre)
+                np.bitwise_and(bits, any_genre, out=bits)
+        return bits
+
+    def select(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        release_year: Optional[int] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        genres: Sequence[str] = (),
+        match_all_genres: bool = False,
+    ) -> tuple[int, list[int]]:
+        """Return the total match count and the ids on the requested page, by id.
+
+        `genres` (names) match movies with any of them, or all with `match_all_genres`.
+        """
+        bits = self._filter(release_year, year_from, year_to, genres, match_all_genres)
+        running = np.cumsum(np.bitwise_count(bits), dtype=np.int64)
+        total = int(running[-1]) if len(running) else 0
+        offset = (page - 1) * page_size
+        if offset >= total:
+            return total, []
+
+        last = min(offset + page_size, total)
+        first_word = int(np.searchsorted(running, offset, side="right"))
+        last_word = int(np.searchsorted(running, last - 1, side="right"))
+        before = int(running[first_word - 1]) if first_word else 0
+        words = bits[first_word:last_word + 1]
+        positions = np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little"))
+        positions = positions[offset - before:last - before] + first_word * 64
+        return total, self._ids[positions].tolist()
+
+    def facet_counts(
+        self,
+        facets: Iterable[str],
+        *,
+        release_year: Optional[int] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        genres: Sequence[str] = (),
+        match_all_genres: bool = False,
+    ) -> dict[str, list[dict]]:
+        """Same shape and ordering as `MoviesRepository.facet_counts`."""
+        # One acquisition: `_grow()` and reloads replace the bitsets with longer
+        # ones, so the filter bits and the facet bitsets must come from the
+        # same state.
+        with self._lock:
+            bits = self._filter_locked(release_year, year_from, year_to, genres, match_all_genres)
+            by_genre = dict(self._by_genre)
+            by_year = dict(self._by_year)
+            genre_names = dict(self._genre_names)
+        counts: dict[str, list[dict]] = {}
+        for facet in facets:
+            source = by_genre if facet == "genre" else by_year
+            values = []
+            for key, facet_bits in source.items():
+                count = int(np.bitwise_count(bits & facet_bits).sum())
+                if count:
+                    value = genre_names[key] if facet == "genre" else key
+                    values.append({"value": value, "count": count})
+            if facet == "genre":
+                values.sort(key=lambda item: (-item["count"], item["value"]))
+            else:
+                values.sort(key=lambda item: item["value"])
+            counts[facet] = values
+        return counts
+
+
+catalog_index = CatalogIndex()
+
+registry.callback_gauge(
+    "catalog_index_movies",
+    "Movies in the in-process catalog index (0 when disabled).",
+    lambda: catalog_index.size if catalog_index.ready else 0,
+)
@@ -0,0 +1,527 @@
+"""Read-only catalog snapshot for serving movie reads without a database.
+
+`build_snapshot` exports movies, directors, genres and the current rating
+aggregates in one consistent read, and `save_snapshot` writes them to a
+single file (see `scripts/build_snapshot.py`):
+
+    magic (8 bytes) | header length (u64) | JSON header | arrays
+
+The header holds the genre table and the dtype, offset and length of every
+array. Arrays are little-endian columns aligned to 64 bytes:
+
+- movies in id order; `movie_id` is the ID index, so a lookup is a binary
+  search, and a movie's position indexes every other movie column;
+- titles, casts and director names/descriptions as offsets into UTF-8 blobs,
+  with null masks for the optional ones;
+- each movie's genre ids (`genre_offsets` into `genre_ids`, ordered by genre
+  name), plus the owning movie of every entry for vectorised genre filters;
+- one precomputed order per list sort key. Titles sort by code point.
+
+Workers map the file read-only, so the page cache holds one shared copy and
+opening a snapshot reads only the header. `save_snapshot` publishes by
+atomic rename; `CatalogSnapshotReader` notices the new file and swaps it in,
+while requests already holding the previous snapshot finish on it.
+
+`CatalogSnapshot` mirrors the `MoviesRepository` read methods, so with
+`CATALOG_SNAPSHOT_SERVING` the movie list and detail reads of `MoviesService`
+are answered here and never open a database connection.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.exceptions import ValidationError
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie, movie_genres
+from app.observability.metrics import registry
+from app.repositories.movies_repository import MovieFilters
+from app.repositories.projections import DirectorRecord, MovieDetailRecord, MovieListRecord
+from app.repositories.rating_aggregates import rating_aggregates
+
+# numpy is optional and imported on first use (`_require_numpy`), so
+# processes with this feature off never pay for the import.
+np = None
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            raise RuntimeError("The catalog snapshot requires numpy (pip install numpy)") from None
+        np = numpy
+
+
+def _numpy_available() -> bool:
+    try:
+        _require_numpy()
+    except RuntimeError:
+        return False
+    return True
+
+
+logger = logging.getLogger("movie_rating")
+
+MAGIC = b"MRSNAP\x00\x01"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sQ")
+_ALIGNMENT = 64
+
+# Sort keys with a precomputed order; "id" is the storage order itself.
+_ORDERED_SORTS = ("release_year", "title", "average_rating", "ratings_count")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _strings(values: Sequence[Optional[str]]) -> tuple["np.ndarray", "np.ndarray"]:
+    """Encode strings as n+1 offsets into one UTF-8 blob; None is stored empty."""
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum(np.fromiter(map(len, encoded), dtype="<u8", count=len(encoded)))
+    return offsets, np.frombuffer(b"".join(encoded), dtype="u1")
+
+
+def _nulls(values: Sequence) -> "np.ndarray":
+    return np.fromiter((value is None for value in values), dtype="u1", count=len(values))
+
+
+def build_snapshot(db: Session) -> tuple[dict, dict[str, "np.ndarray"]]:
+    """Read the catalog and return the snapshot header and arrays."""
+    _require_numpy()
+    if db.get_bind().dialect.name == "postgresql":
+        # Every table read below sees the same point in time, even while
+        # writes continue.
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    movies = db.execute(
+        select(Movie.id, Movie.title, Movie.release_year, Movie.director_id, Movie.cast).order_by(Movie.id)
+    ).all()
+    count = len(movies)
+    positions = {row.id: position for position, row in enumerate(movies)}
+    movie_ids = np.fromiter((row.id for row in movies), dtype="<i4", count=count)
+    release_years = np.fromiter((row.release_year for row in movies), dtype="<i4", count=count)
+    titles = [row.title for row in movies]
+
+    # Unrated movies keep 0 in both columns, which is also their sort value.
+    rating_counts = np.zeros(count, dtype="<i8")
+    avg_ratings = np.zeros(count, dtype="<f8")
+    aggregates = rating_aggregates()
+    for row in db.execute(select(aggregates.c.movie_id, aggregates.c.avg_rating, aggregates.c.rating_count)):
+        position = positions.get(row.movie_id)
+        if position is not None:
+            rating_counts[position] = row.rating_count
+            avg_ratings[position] = row.avg_rating
+
+    genres = db.execute(select(Genre.id, Genre.name).order_by(Genre.name)).all()
+    genre_rank = {row.id: rank for rank, row in enumerate(genres)}
+    pairs = sorted(
+        (positions[movie_id], genre_rank[genre_id], genre_id)
+        for movie_id, genre_id in db.execute(select(movie_genres.c.movie_id, movie_genres.c.genre_id))
+        if movie_id in positions
+    )
+    genre_movies = np.fromiter((pair[0] for pair in pairs), dtype="<i4", count=len(pairs))
+    genre_offsets = np.zeros(count + 1, dtype="<u8")
+    genre_offsets[1:] = np.cumsum(np.bincount(genre_movies, minlength=count))
+
+    directors = db.execute(
+        select(Director.id, Director.name, Director.birth_year, Director.description).order_by(Director.id)
+    ).all()
+    birth_years = [row.birth_year for row in directors]
+
+    arrays = {
+        "movie_id": movie_ids,
+        "director_id": np.fromiter((row.director_id for row in movies), dtype="<i4", count=count),
+        "release_year": release_years,
+        "rating_count": rating_counts,
+        "avg_rating": avg_ratings,
+        "cast_null": _nulls([row.cast for row in movies]),
+        "genre_offsets": genre_offsets,
+        "genre_ids": np.fromiter((pair[2] for pair in pairs), dtype="<i4", count=len(pairs)),
+        "genre_movies": genre_movies,
+        "order_release_year": np.lexsort((movie_ids, release_years)).astype("<i4"),
+        # Positions are in id order and sorted() is stable, so ties keep id order.
+        "order_title": np.array(sorted(range(count), key=titles.__getitem__), dtype="<i4"),
+        "order_average_rating": np.lexsort((movie_ids, avg_ratings)).astype("<i4"),
+        "order_ratings_count": np.lexsort((movie_ids, rating_counts)).astype("<i4"),
+        "directors_id": np.fromiter((row.id for row in directors), dtype="<i4", count=len(directors)),
+        "directors_birth_year": np.array([year or 0 for year in birth_years], dtype="<i4"),
+        "directors_birth_year_null": _nulls(birth_years),
+        "directors_description_null": _nulls([row.description for row in directors]),
+    }
+    for name, values in (
+        ("title", titles),
+        ("cast", [row.cast for row in movies]),
+        ("directors_name", [row.name for row in directors]),
+        ("directors_description", [row.description for row in directors]),
+    ):
+        arrays[f"{name}_offsets"], arrays[f"{name}_data"] = _strings(values)
+
+    header = {
+        "format": FORMAT_VERSION,
+        "built_at": time.time(),
+        "movies": count,
+        "directors": len(directors),
+        "genres": [[row.id, row.name] for row in genres],
+    }
+    return header, arrays
+
+
+def save_snapshot(header: dict, arrays: dict[str, "np.ndarray"], path: str) -> None:
+    """Write atomically, so readers never map a half-written file."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset += array.nbytes
+    header_bytes = json.dumps({**header, "arrays": layout}, separators=(",", ":")).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".snapshot.tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_PREAMBLE.pack(MAGIC, len(header_bytes)))
+            fh.write(header_bytes)
+            for name, array in arrays.items():
+                fh.write(b"\0" * (data_start + layout[name][1] - fh.tell()))
+                fh.write(array.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class CatalogSnapshot:
+    """One opened snapshot file. Read methods mirror `MoviesRepository`."""
+
+    def __init__(self, path: str) -> None:
+        _require_numpy()
+        self.path = path
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        magic, header_length = _PREAMBLE.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot format {header['format']}")
+        data_start = _aligned(_PREAMBLE.size + header_length)
+        self._columns = {
+            name: np.frombuffer(self._map, dtype=dtype, count=length, offset=data_start + offset)
+            if length
+            else np.empty(0, dtype=dtype)
+            for name, (dtype, offset, length) in header["arrays"].items()
+        }
+        self.built_at: float = header["built_at"]
+        self._genre_names = {genre_id: name for genre_id, name in header["genres"]}
+        self._genre_ids = {name.lower(): genre_id for genre_id, name in header["genres"]}
+
+        columns = self._columns
+        self._movie_ids = columns["movie_id"]
+        self._director_ids = columns["director_id"]
+        self._release_years = columns["release_year"]
+        self._rating_counts = columns["rating_count"]
+        self._avg_ratings = columns["avg_rating"]
+        self._genre_offsets = columns["genre_offsets"]
+        self._movie_genres = columns["genre_ids"]
+        self._genre_movies = columns["genre_movies"]
+        self._titles: Optional[list[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._movie_ids)
+
+    def genre_id(self, name: str) -> Optional[int]:
+        """Case-insensitive lookup by name."""
+        return self._genre_ids.get(name.lower())
+
+    def get_movie_detail(self, movie_id: int) -> Optional[MovieDetailRecord]:
+        position = self._position(self._movie_ids, movie_id)
+        if position is None:
+            return None
+        return MovieDetailRecord(
+            *self._list_fields(position, self._director(int(self._director_ids[position]))),
+            cast=self._string("cast", position, nullable=True),
+        )
+
+    def get_movies_page(self, movie_ids: list[int]) -> list[MovieListRecord]:
+        """Load list records for the given movies, in the given order."""
+        positions = (self._position(self._movie_ids, movie_id) for movie_id in movie_ids)
+        return self._records([position for position in positions if position is not None])
+
+    def list_movies(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        filters: MovieFilters = MovieFilters(),
+        sort: str = "id",
+        descending: bool = False,
+        after: Optional[tuple] = None,
+    ) -> tuple[int, list[MovieListRecord], Optional[tuple]]:
+        """Same contract as `MoviesRepository.list_movies`."""
+        mask = self._mask(filters)
+        order = self._columns[f"order_{sort}"] if sort in _ORDERED_SORTS else np.arange(len(self))
+        if descending:
+            order = order[::-1]
+        selected = order[mask[order]]
+
+        start = (page - 1) * page_size if after is None else self._seek(selected, sort, descending, after)
+        positions = selected[start:start + page_size + 1]
+        next_key = None
+        if len(positions) > page_size:
+            positions = positions[:page_size]
+            next_key = self._sort_key(sort, int(positions[-1]))
+        return len(selected), self._records(positions), next_key
+
+    def facet_counts(
+        self,
+        facets: list[str],
+        filters: MovieFilters = MovieFilters(),
+    ) -> dict[str, list[dict]]:
+        """Same contract as `MoviesRepository.facet_counts`."""
+        if not facets:
+            return {}
+        mask = self._mask(filters)
+        counts: dict[str, list[dict]] = {}
+        if "genre" in facets:
+            genre_ids, totals = np.unique(self._movie_genres[mask[self._genre_movies]], return_counts=True)
+            counts["genre"] = sorted(
+                (
+                    {"value": self._genre_names[int(genre_id)], "count": int(total)}
+                    for genre_id, total in zip(genre_ids, totals)
+                ),
+                key=lambda item: (-item["count"], item["value"]),
+            )
+        if "release_year" in facets:
+            years, totals = np.unique(self._release_years[mask], return_counts=True)
+            counts["release_year"] = [
+                {"value": int(year), "count": int(total)} for year, total in zip(years, totals)
+            ]
+        return {facet: counts[facet] for facet in facets}
+
+    def _mask(self, filters: MovieFilters) -> "np.ndarray":
+        mask = np.ones(len(self), dtype=bool)
+        if filters.release_year is not None:
+            mask &= self._release_years == filters.release_year
+        if filters.year_from is not None:
+            mask &= self._release_years >= filters.year_from
+        if filters.year_to is not None:
+            mask &= self._release_years <= filters.year_to
+        if filters.director_id is not None:
+            mask &= self._director_ids == filters.director_id
+        if filters.genre_ids:
+            genre_ids = sorted(set(filters.genre_ids))
+            matches = np.bincount(
+                self._genre_movies[np.isin(self._movie_genres, genre_ids)], minlength=len(self)
+            )
+            mask &= matches == len(genre_ids) if filters.match_all_genres else matches > 0
+        if filters.min_rating is not None:
+            mask &= (self._rating_counts > 0) & (self._avg_ratings >= filters.min_rating)
+        if filters.min_rating_count is not None:
+            mask &= self._rating_counts >= filters.min_rating_count
+        if filters.title:
+            # Not indexed: a scan over the titles that passed the other filters.
+            needle = filters.title.lower()
+            titles = self._lowercase_titles()
+            for position in np.flatnonzero(mask).tolist():
+                if needle not in titles[position]:
+                    mask[position] = False
+        return mask
+
+    def _lowercase_titles(self) -> list[str]:
+        # Decoded on the first title filter only; a concurrent first use just
+        # builds the same list twice.
+        if self._titles is None:
+            offsets = self._columns["title_offsets"].tolist()
+            blob = self._columns["title_data"].tobytes()
+            self._titles = [
+                blob[start:end].decode("utf-8").lower() for start, end in zip(offsets, offsets[1:])
+            ]
+        return self._titles
+
+    def _seek(self, selected: "np.ndarray", sort: str, descending: bool, after: tuple) -> int:
+        """Index of the first row of `selected` that comes after the key `after`."""
+        after = tuple(after)
+        low, high = 0, len(selected)
+        try:
+            while low < high:
+                middle = (low + high) // 2
+                key = self._sort_key(sort, int(selected[middle]))
+                if (key >= after) if descending else (key <= after):
+                    low = middle + 1
+                else:
+                    high = middle
+        except TypeError:
+            raise ValidationError("Invalid cursor") from None
+        return low
+
+    def _sort_key(self, sort: str, position: int) -> tuple:
+        movie_id = int(self._movie_ids[position])
+        if sort == "title":
+            value = self._string("title", position)
+        elif sort == "release_year":
+            value = int(self._release_years[position])
+        elif sort == "average_rating":
+            value = float(self._avg_ratings[position])
+        elif sort == "ratings_count":
+            value = int(self._rating_counts[position])
+        else:
+            value = movie_id
+        return value, movie_id
+
+    def _records(self, positions) -> list[MovieListRecord]:
+        directors: dict[int, DirectorRecord] = {}
+        records = []
+        for position in positions:
+            position = int(position)
+            director_id = int(self._director_ids[position])
+            director = directors.get(director_id)
+            if director is None:
+                director = directors[director_id] = self._director(director_id, summary=True)
+            records.append(MovieListRecord(*self._list_fields(position, director)))
+        return records
+
+    def _list_fields(self, position: int, director: DirectorRecord) -> tuple:
+        start, end = self._genre_offsets[position:position + 2]
+        rating_count = int(self._rating_counts[position])
+        return (
+            int(self._movie_ids[position]),
+            self._string("title", position),
+            int(self._release_years[position]),
+            director,
+            [self._genre_names[int(genre_id)] for genre_id in self._movie_genres[start:end]],
+            float(self._avg_ratings[position]) if rating_count else None,
+            rating_count,
+        )
+
+    def _director(self, director_id: int, *, summary: bool = False) -> DirectorRecord:
+        position = self._position(self._columns["directors_id"], director_id)
+        if position is None:
+            raise ValueError(f"Director {director_id} is missing from the catalog snapshot")
+        name = self._string("directors_name", position)
+        if summary:
+            return DirectorRecord(director_id, name)
+        birth_year = None
+        if not self._columns["directors_birth_year_null"][position]:
+            birth_year = int(self._columns["directors_birth_year"][position])
+        return DirectorRecord(
+            director_id, name, birth_year, self._string("directors_description", position, nullable=True)
+        )
+
+    def _string(self, name: str, position: int, *, nullable: bool = False) -> Optional[str]:
+        if nullable and self._columns[f"{name}_null"][position]:
+            return None
+        start, end = self._columns[f"{name}_offsets"][position:position + 2]
+        return self._columns[f"{name}_data"][start:end].tobytes().decode("utf-8")
+
+    @staticmethod
+    def _position(ids: "np.ndarray", value: int) -> Optional[int]:
+        position = int(np.searchsorted(ids, value))
+        if position < len(ids) and ids[position] == value:
+            return position
+        return None
+
+
+class CatalogSnapshotReader:
+    """The published snapshot, re-opened when the file at `path` is replaced."""
+
+    def __init__(self, path: Optional[str] = None, check_interval_s: float = 1.0) -> None:
+        self.path = path
+        self.serving = False
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._file_id: Optional[tuple] = None
+        self._checked_at = 0.0
+
+    def configure(self, path: str, *, serving: bool, check_interval_s: float = 1.0) -> None:
+        with self._lock:
+            self.path = path
+            self.serving = serving
+            self.check_interval_s = check_interval_s
+            self._snapshot = None
+            self._file_id = None
+            self._checked_at = 0.0
+
+    @property
+    def loaded(self) -> Optional[CatalogSnapshot]:
+        """The snapshot opened last, without checking the file."""
+        return self._snapshot
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Return the newest published snapshot, or None if none could be opened.
+
+        A snapshot that is deleted or replaced by an unreadable file keeps
+        being served until a valid one is published.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            if not self.path or not _numpy_available():
+                return self._snapshot
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._snapshot
+            # The inode changes on every publish, even within one mtime tick.
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id != self._file_id:
+                self._file_id = file_id
+                try:
+                    snapshot = CatalogSnapshot(self.path)
+                except (OSError, ValueError, KeyError):
+                    logger.warning("Catalog snapshot could not be opened", exc_info=True, extra={"path": self.path})
+                else:
+                    self._snapshot = snapshot
+                    logger.info(
+                        "Catalog snapshot opened",
+                        extra={"movies": len(snapshot), "built_at": snapshot.built_at, "path": self.path},
+                    )
+            return self._snapshot
+
+
+catalog_snapshot = CatalogSnapshotReader()
+
+
+def _snapshot_movies() -> int:
+    snapshot = catalog_snapshot.loaded
+    return len(snapshot) if snapshot is not None else 0
+
+
+def _snapshot_age_s() -> float:
+    snapshot = catalog_snapshot.loaded
+    return time.time() - snapshot.built_at if snapshot is not None else 0
+
+
+registry.callback_gauge(
+    "catalog_snapshot_movies",
+    "Movies in the catalog snapshot this process serves from (0 when none is open).",
+    _snapshot_movies,
+)
+registry.callback_gauge(
+    "catalog_snapshot_age_seconds",
+    "Seconds since the open catalog snapshot was built (0 when none is open).",
+    _snapshot_age_s,
+)
@@ -0,0 +1,42 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.exceptions import NotFoundError
+from app.repositories.directors_repository import DirectorsRepository
+
+
+class DirectorsService:
+    def __init__(self, db: Session) -> None:
+        self.repository = DirectorsRepository(db)
+
+    def list_directors(self, *, page: int, page_size: int, name: Optional[str] = None) -> dict:
+        total_items, directors = self.repository.list_directors(
+            page=page,
+            page_size=page_size,
+            name=name,
+        )
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total_items": total_items,
+            "items": directors,
+        }
+
+    def get_director(self, director_id: int, *, page: int, page_size: int) -> dict:
+        director = self.repository.get_director(director_id)
+        if not director:
+            raise NotFoundError("Director not found")
+
+        stats = self.repository.get_career_stats(director_id)
+        filmography = self.repository.get_filmography(director_id, page=page, page_size=page_size)
+        return {
+            **stats,
+            "description": director.description,
+            "filmography": {
+                "page": page,
+                "page_size": page_size,
+                "total_items": stats["movie_count"],
+                "items": filmography,
+            },
+        }
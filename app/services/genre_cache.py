@@ -0,0 +1,155 @@
+"""In-process cache of the genre catalog.
+
+Genres almost never change, so the list filter resolves a genre name to its
+id, and the write paths validate genre ids, from memory instead of querying
+`genres`. The cache is loaded at startup and dropped after any commit that
+inserted, updated or deleted a genre through the ORM in this process. It is
+also reloaded every `ttl_s` seconds so changes made by other workers or
+directly in SQL are picked up.
+
+The per-genre movie counts shown by `GET /genres` are cached the same way,
+separately from the genres. The movie write paths drop them after they
+commit (`invalidate_movie_counts`), and they expire after `ttl_s` too.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models.genre import Genre
+from app.repositories.genres_repository import GenresRepository
+
+logger = logging.getLogger("movie_rating")
+
+_CHANGED_FLAG = "genre_cache_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedGenre:
+    id: int
+    name: str
+    description: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    by_id: dict[int, CachedGenre]
+    by_name: dict[str, CachedGenre]
+    loaded_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class _MovieCounts:
+    by_genre_id: dict[int, int]
+    loaded_at: float
+
+
+class GenreCache:
+    def __init__(self, ttl_s: float = 300.0) -> None:
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+        self._movie_counts: Optional[_MovieCounts] = None
+        self._counts_generation = 0
+
+    def configure(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self._counts_generation += 1
+            self._movie_counts = None
+
+    def invalidate_movie_counts(self) -> None:
+        with self._lock:
+            self._counts_generation += 1
+            self._movie_counts = None
+
+    def load(self, db: Session) -> _Snapshot:
+        """Read every genre and swap the cache in, unless invalidated meanwhile."""
+        generation = self._generation
+        rows = db.execute(select(Genre.id, Genre.name, Genre.description).order_by(Genre.name)).all()
+        genres = [CachedGenre(row.id, row.name, row.description) for row in rows]
+        snapshot = _Snapshot(
+            by_id={genre.id: genre for genre in genres},
+            by_name={genre.name.lower(): genre for genre in genres},
+            loaded_at=time.monotonic(),
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+        logger.info("Genre cache loaded", extra={"genres": len(genres)})
+        return snapshot
+
+    def _current(self, db: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl_s:
+            snapshot = self.load(db)
+        return snapshot
+
+    def all(self, db: Session) -> list[CachedGenre]:
+        """Every genre, ordered by name."""
+        return list(self._current(db).by_id.values())
+
+    def resolve(self, db: Session, name: str) -> Optional[CachedGenre]:
+        """Case-insensitive lookup by name."""
+        return self._current(db).by_name.get(name.lower())
+
+    def get_many(self, db: Session, genre_ids: Iterable[int]) -> tuple[list[CachedGenre], list[int]]:
+        """Return the known genres (in the given order) and the sorted unknown ids."""
+        by_id = self._current(db).by_id
+        found, missing = [], []
+        for genre_id in genre_ids:
+            genre = by_id.get(genre_id)
+            if genre is None:
+                missing.append(genre_id)
+            else:
+                found.append(genre)
+        return found, sorted(missing)
+
+    def movie_counts(self, db: Session) -> dict[int, int]:
+        """Number of movies per genre id; genres without movies are absent."""
+        counts = self._movie_counts
+        if counts is None or time.monotonic() - counts.loaded_at > self.ttl_s:
+            generation = self._counts_generation
+            counts = _MovieCounts(GenresRepository(db).movie_counts(), time.monotonic())
+            with self._lock:
+                if generation == self._counts_generation:
+                    self._movie_counts = counts
+        return counts.by_genre_id
+
+
+genre_cache = GenreCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_genre_changes(session: Session, flush_context) -> None:
+    if any(isinstance(obj, Genre) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_CHANGED_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_genre_changes(orm_execute_state) -> None:
+    if (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert) and (
+        orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ is Genre
+    ):
+        orm_execute_state.session.info[_CHANGED_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_FLAG, False):
+        genre_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_FLAG, None)
@@ -0,0 +1,22 @@
+from sqlalchemy.orm import Session
+
+from app.repositories.genres_repository import GenresRepository
+from app.services.genre_cache import genre_cache
+
+
+class GenresService:
+    def __init__(self, db: Session) -> None:
+        self.repository = GenresRepository(db)
+
+    def list_genres(self) -> list[dict]:
+        """Every genre, by name, with its movie count."""
+        counts = genre_cache.movie_counts(self.repository.db)
+        return [
+            {
+                "id": genre.id,
+                "name": genre.name,
+                "description": genre.description,
+                "movie_count": counts.get(genre.id, 0),
+            }
+            for genre in genre_cache.all(self.repository.db)
+        ]
@@ -6,6 +6,8 @@ from app.exceptions import NotFoundError, ValidationError
 from app.models.movie import Movie
 from app.repositories.movie import MovieRepository
 from app.schemas.movie import MovieUpdate
+from app.services.catalog_index import catalog_index
+from app.services.genre_cache import genre_cache
 
 
 class MovieService:
@@ -101,21 +103,24 @@ class MovieService:
         for field, value in update_data.items():
             setattr(movie, field, value)
 
+        genre_names = [genre.name for genre in movie.genres]
         if genre_ids is not None:
-            unique_genre_ids = list(dict.fromkeys(genre_ids))
-            genres = self.repository.get_genres_by_ids(unique_genre_ids)
-            found_ids = {genre.id for genre in genres}
-            missing_ids = sorted(set(unique_genre_ids) - found_ids)
+            genres, missing_ids = genre_cache.get_many(self.repository.db, dict.fromkeys(genre_ids))
             if missing_ids:
                 self.repository.db.rollback()
                 raise ValidationError(f"Genres not found: {missing_ids}")
-            movie.genres = genres
+            genre_names = [genre.name for genre in genres]
 
         try:
+            if genre_ids is not None:
+                self.repository.replace_movie_genres(movie.id, [genre.id for genre in genres])
             self.repository.db.commit()
         except Exception:
             self.repository.db.rollback()
             raise
+        catalog_index.upsert(movie.id, movie.release_year, genre_names)
+        if genre_ids is not None:
+            genre_cache.invalidate_movie_counts()
 
         return self._build_movie_detail(movie)
 
@@ -129,3 +134,5 @@ class MovieService:
         except Exception:
             self.repository.db.rollback()
             raise
+        catalog_index.remove(movie_id)
+        genre_cache.invalidate_movie_counts()
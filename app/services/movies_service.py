@@ -1,10 +1,219 @@
+import base64
+import json
+import math
 from typing import Optional
 
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.exceptions import NotFoundError, ValidationError
+from app.db.database import get_sessionmaker
+from app.exceptions import NotFoundError, ServiceUnavailableError, ValidationError
+from app.resilience.circuit_breaker import database_breaker
+from app.resilience.stale import ReadResult, StaleWhileRevalidate
 from app.schemas.movie import MovieCreateIn, RatingCreateIn
-from app.repositories.movies_repository import MoviesRepository
+from app.repositories.movies_repository import FACETS, SORT_KEYS, MovieFilters, MoviesRepository
+from app.repositories.projections import MovieDetailRecord
+from app.services.catalog_index import catalog_index
+from app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from app.services.genre_cache import genre_cache
+from app.services.rating_stats import rating_shards
+from app.services.similarity import similarity_index
+from app.services.single_flight import SingleFlight
+
+# Concurrent identical reads share one DB round trip (see single_flight.py).
+_list_flight = SingleFlight("list_movies")
+_detail_flight = SingleFlight("movie_detail")
+
+# Last-known-good fallback for the async read paths; see configure_stale_reads().
+_list_reads = StaleWhileRevalidate("list_movies", database_breaker)
+_detail_reads = StaleWhileRevalidate("movie_detail", database_breaker)
+
+
+def configure_stale_reads(
+    *,
+    enabled: bool,
+    budget_ms: float,
+    max_age_s: float,
+    max_entries: int,
+    failure_threshold: int,
+    reset_timeout_s: float,
+) -> None:
+    database_breaker.configure(failure_threshold, reset_timeout_s)
+    for reads in (_list_reads, _detail_reads):
+        reads.configure(
+            enabled=enabled, budget_ms=budget_ms, max_age_s=max_age_s, max_entries=max_entries
+        )
+
+
+def _validate_facets(facets: Optional[list[str]]) -> tuple[str, ...]:
+    requested = tuple(dict.fromkeys(facets or ()))
+    unknown = [facet for facet in requested if facet not in FACETS]
+    if unknown:
+        raise ValidationError(f"Unknown facets: {unknown}; expected any of {list(FACETS)}")
+    return requested
+
+
+def _list_params(*, facets: Optional[list[str]], sort: str, order: str, **params) -> dict:
+    """Validate list parameters; the result's values double as the coalescing key."""
+    if sort not in SORT_KEYS:
+        raise ValidationError(f"Unknown sort key: {sort!r}; expected one of {list(SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise ValidationError("Order must be 'asc' or 'desc'")
+    if params["genre_match"] not in ("any", "all"):
+        raise ValidationError("Genre match must be 'any' or 'all'")
+    year_from, year_to = params["year_from"], params["year_to"]
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise ValidationError("year_from must not be after year_to")
+    return {**params, "facets": _validate_facets(facets), "sort": sort, "order": order}
+
+
+def _genre_names(genre: Optional[str]) -> list[str]:
+    """Split a comma-separated `genre` parameter, dropping blanks and repeats."""
+    names = {}
+    for name in (genre or "").split(","):
+        if name.strip():
+            names.setdefault(name.strip().lower(), name.strip())
+    return list(names.values())
+
+
+def _empty_page(page: int, page_size: int, facets: tuple[str, ...]) -> dict:
+    result = {
+        "page": page,
+        "page_size": page_size,
+        "total_items": 0,
+        "items": [],
+        "next_cursor": None,
+    }
+    if facets:
+        result["facets"] = {facet: [] for facet in facets}
+    return result
+
+
+# Snapshot cursors carry this tag. Titles sort by code point in the snapshot
+# but by collation in SQL, so a cursor only resumes where it was issued.
+_SNAPSHOT_CURSOR = "snapshot"
+
+
+def _encode_cursor(sort: str, order: str, key: tuple, *, snapshot: bool = False) -> str:
+    payload = [sort, order, *key, _SNAPSHOT_CURSOR] if snapshot else [sort, order, *key]
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _is_int(value) -> bool:
+    # bool is an int subclass; the bounds keep the literal within BIGINT.
+    return isinstance(value, int) and not isinstance(value, bool) and -(2**63) <= value < 2**63
+
+
+def _valid_cursor_value(sort: str, value) -> bool:
+    if sort == "title":
+        return isinstance(value, str)
+    if sort == "average_rating":
+        return _is_int(value) or (isinstance(value, float) and math.isfinite(value))
+    return _is_int(value)
+
+
+def _decode_cursor(cursor: str, sort: str, order: str, *, snapshot: bool = False) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        from_snapshot = (
+            isinstance(payload, list) and len(payload) == 5 and payload[4] == _SNAPSHOT_CURSOR
+        )
+        cursor_sort, cursor_order, value, movie_id = payload[:4] if from_snapshot else payload
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor") from None
+    if from_snapshot != snapshot:
+        raise ValidationError("Cursor was issued by another catalog source; start from the first page")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValidationError("Cursor does not match the requested sort and order")
+    # The values become SQL literals; a wrong type would fail in the database.
+    if not _is_int(movie_id) or not _valid_cursor_value(sort, value):
+        raise ValidationError("Invalid cursor")
+    return value, movie_id
+
+
+def _serving_snapshot() -> Optional[CatalogSnapshot]:
+    """The snapshot to answer reads from, or None when reads go to the database."""
+    if not catalog_snapshot.serving:
+        return None
+    snapshot = catalog_snapshot.current()
+    if snapshot is None:
+        raise ServiceUnavailableError("Catalog snapshot is not available")
+    return snapshot
+
+
+def _read_detached(method: str, *args, **kwargs):
+    # Runs on its own session: a read that misses the latency budget keeps
+    # going after the request that started it has returned. Callers pass the
+    # uncoalesced `_` methods; the async path has already coalesced the read.
+    db = get_sessionmaker()()
+    try:
+        return getattr(MoviesService(db), method)(*args, **kwargs)
+    finally:
+        db.close()
+
+
+async def list_movies_async(
+    *,
+    page: int,
+    page_size: int,
+    title: Optional[str] = None,
+    release_year: Optional[int] = None,
+    genre: Optional[str] = None,
+    genre_match: str = "any",
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    director_id: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    min_rating_count: Optional[int] = None,
+    facets: Optional[list[str]] = None,
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+) -> ReadResult:
+    """List movies for an async endpoint; no request session is needed.
+
+    Coalesces on the event loop so waiting callers don't hold threadpool
+    slots, and reads on a session of its own. May return the last known good
+    page, flagged as stale, when the database is slow or failing.
+    """
+    params = _list_params(
+        page=page,
+        page_size=page_size,
+        title=title,
+        release_year=release_year,
+        genre=genre,
+        genre_match=genre_match,
+        year_from=year_from,
+        year_to=year_to,
+        director_id=director_id,
+        min_rating=min_rating,
+        min_rating_count=min_rating_count,
+        facets=facets,
+        sort=sort,
+        order=order,
+        cursor=cursor,
+    )
+    key = tuple(params.values())
+    return await _list_reads.get(
+        key,
+        lambda: _list_flight.do_async(
+            key,
+            lambda: run_in_threadpool(_read_detached, "_list_movies", **params),
+        ),
+    )
+
+
+async def get_movie_detail_async(movie_id: int) -> ReadResult:
+    """Movie detail for an async endpoint; see `list_movies_async`."""
+    return await _detail_reads.get(
+        movie_id,
+        lambda: _detail_flight.do_async(
+            movie_id,
+            lambda: run_in_threadpool(_read_detached, "_get_movie_detail", movie_id),
+        ),
+    )
 
 
 class MoviesService:
@@ -21,70 +230,183 @@ class MoviesService:
         title: Optional[str] = None,
         release_year: Optional[int] = None,
         genre: Optional[str] = None,
+        genre_match: str = "any",
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        director_id: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        min_rating_count: Optional[int] = None,
+        facets: Optional[list[str]] = None,
+        sort: str = "id",
+        order: str = "asc",
+        cursor: Optional[str] = None,
     ) -> dict:
-        total_items, movies, aggregates = self.repository.list_movies(
+        params = _list_params(
             page=page,
             page_size=page_size,
             title=title,
             release_year=release_year,
             genre=genre,
+            genre_match=genre_match,
+            year_from=year_from,
+            year_to=year_to,
+            director_id=director_id,
+            min_rating=min_rating,
+            min_rating_count=min_rating_count,
+            facets=facets,
+            sort=sort,
+            order=order,
+            cursor=cursor,
         )
+        return _list_flight.do(tuple(params.values()), lambda: self._list_movies(**params))
 
-        items = []
-        for movie in movies:
-            rating = aggregates.get(movie.id, {"average_rating": None, "ratings_count": 0})
-            items.append(
-                {
-                    "id": movie.id,
-                    "title": movie.title,
-                    "release_year": movie.release_year,
-                    "director": {
-                        "id": movie.director.id,
-                        "name": movie.director.name,
-                    },
-                    "genres": [genre_item.name for genre_item in movie.genres],
-                    "avg_rating": rating["average_rating"],
-                    "rating_count": rating["ratings_count"],
-                }
+    def _list_movies(
+        self,
+        *,
+        page: int,
+        page_size: int,
+        title: Optional[str] = None,
+        release_year: Optional[int] = None,
+        genre: Optional[str] = None,
+        genre_match: str = "any",
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        director_id: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        min_rating_count: Optional[int] = None,
+        facets: tuple[str, ...] = (),
+        sort: str = "id",
+        order: str = "asc",
+        cursor: Optional[str] = None,
+    ) -> dict:
+        genres = _genre_names(genre)
+        match_all_genres = genre_match == "all"
+        snapshot = _serving_snapshot()
+        # The catalog index only knows genres, years, id order and offset pages.
+        use_index = (
+            snapshot is None
+            and catalog_index.ready
+            and not title
+            and director_id is None
+            and min_rating is None
+            and min_rating_count is None
+            and sort == "id"
+            and order == "asc"
+            and not cursor
+        )
+        if use_index:
+            index_filters = {
+                "release_year": release_year,
+                "year_from": year_from,
+                "year_to": year_to,
+                "genres": genres,
+                "match_all_genres": match_all_genres,
+            }
+            total_items, movie_ids = catalog_index.select(page=page, page_size=page_size, **index_filters)
+            items = self.repository.get_movies_page(movie_ids)
+            next_key = None
+            if movie_ids and (page - 1) * page_size + len(movie_ids) < total_items:
+                next_key = (movie_ids[-1], movie_ids[-1])
+        else:
+            # The snapshot answers with the same methods as the repository.
+            reader = snapshot if snapshot is not None else self.repository
+            genre_ids = []
+            for name in genres:
+                if snapshot is not None:
+                    genre_id = snapshot.genre_id(name)
+                else:
+                    known_genre = genre_cache.resolve(self.repository.db, name)
+                    genre_id = known_genre.id if known_genre is not None else None
+                if genre_id is not None:
+                    genre_ids.append(genre_id)
+                elif match_all_genres:
+                    # No movie has a genre that does not exist.
+                    return _empty_page(page, page_size, facets)
+            if genres and not genre_ids:
+                return _empty_page(page, page_size, facets)
+            filters = MovieFilters(
+                title=title,
+                release_year=release_year,
+                year_from=year_from,
+                year_to=year_to,
+                genre_ids=tuple(genre_ids),
+                match_all_genres=match_all_genres,
+                director_id=director_id,
+                min_rating=min_rating,
+                min_rating_count=min_rating_count,
+            )
+            total_items, items, next_key = reader.list_movies(
+                page=page,
+                page_size=page_size,
+                filters=filters,
+                sort=sort,
+                descending=order == "desc",
+                after=(
+                    _decode_cursor(cursor, sort, order, snapshot=snapshot is not None)
+                    if cursor
+                    else None
+                ),
             )
 
-        return {
+        result = {
             "page": page,
             "page_size": page_size,
             "total_items": total_items,
             "items": items,
+            "next_cursor": (
+                _encode_cursor(sort, order, next_key, snapshot=snapshot is not None)
+                if next_key
+                else None
+            ),
         }
+        if facets and use_index:
+            result["facets"] = catalog_index.facet_counts(facets, **index_filters)
+        elif facets:
+            result["facets"] = reader.facet_counts(list(facets), filters)
+        return result
 
-    def get_movie_detail(self, movie_id: int) -> dict:
-        movie, aggregate = self.repository.get_movie_detail(movie_id)
+    def get_movie_detail(self, movie_id: int) -> MovieDetailRecord:
+        return _detail_flight.do(movie_id, lambda: self._get_movie_detail(movie_id))
+
+    def _get_movie_detail(self, movie_id: int) -> MovieDetailRecord:
+        snapshot = _serving_snapshot()
+        reader = snapshot if snapshot is not None else self.repository
+        movie = reader.get_movie_detail(movie_id)
         if not movie:
             raise NotFoundError("Movie not found")
+        return movie
 
-        return {
-            "id": movie.id,
-            "title": movie.title,
-            "release_year": movie.release_year,
-            "director": {
-                "id": movie.director.id,
-                "name": movie.director.name,
-                "birth_year": movie.director.birth_year,
-                "description": movie.director.description,
-            },
-            "genres": [genre_item.name for genre_item in movie.genres],
-            "cast": movie.cast,
-            "avg_rating": aggregate["average_rating"],
-            "rating_count": aggregate["ratings_count"],
-        }
+    def get_similar_movies(self, movie_id: int, limit: int) -> dict:
+        if not self.repository.get_movie_by_id(movie_id):
+            raise NotFoundError("Movie not found")
+        neighbors = similarity_index.neighbors(movie_id, limit)
+        if neighbors is None:
+            raise ServiceUnavailableError("Similarity index is not available")
+
+        scores = dict(neighbors)
+        items = [
+            {
+                "id": movie.id,
+                "title": movie.title,
+                "release_year": movie.release_year,
+                "director": movie.director,
+                "genres": movie.genres,
+                "avg_rating": movie.avg_rating,
+                "rating_count": movie.rating_count,
+                "score": scores[movie.id],
+            }
+            for movie in self.repository.get_movies_page(list(scores))
+        ]
+        return {"movie_id": movie_id, "items": items}
 
-    def create_movie(self, payload: MovieCreateIn) -> dict:
+    def create_movie(self, payload: MovieCreateIn) -> MovieDetailRecord:
         director = self.repository.get_director_by_id(payload.director_id)
         if not director:
             raise ValidationError("Director not found")
 
-        unique_genre_ids = list(dict.fromkeys(payload.genres))
-        genres = self.repository.get_genres_by_ids(unique_genre_ids)
-        found_ids = {genre.id for genre in genres}
-        missing_ids = sorted(set(unique_genre_ids) - found_ids)
+        genres, missing_ids = genre_cache.get_many(
+            self.repository.db, dict.fromkeys(payload.genres)
+        )
         if missing_ids:
             raise ValidationError(f"Genres not found: {missing_ids}")
 
@@ -94,32 +416,19 @@ class MoviesService:
                 director_id=payload.director_id,
                 release_year=payload.release_year,
                 cast=payload.cast,
-                genres=genres,
+                genre_ids=[genre.id for genre in genres],
             )
             self.repository.db.commit()
         except Exception:
             self.repository.db.rollback()
             raise
+        catalog_index.upsert(movie.id, movie.release_year, [genre.name for genre in genres])
+        genre_cache.invalidate_movie_counts()
 
-        movie_detail, aggregate = self.repository.get_movie_detail(movie.id)
+        movie_detail = self.repository.get_movie_detail(movie.id)
         if not movie_detail:
             raise NotFoundError("Movie not found")
-
-        return {
-            "id": movie_detail.id,
-            "title": movie_detail.title,
-            "release_year": movie_detail.release_year,
-            "director": {
-                "id": movie_detail.director.id,
-                "name": movie_detail.director.name,
-                "birth_year": movie_detail.director.birth_year,
-                "description": movie_detail.director.description,
-            },
-            "genres": [genre_item.name for genre_item in movie_detail.genres],
-            "cast": movie_detail.cast,
-            "avg_rating": aggregate["average_rating"],
-            "rating_count": aggregate["ratings_count"],
-        }
+        return movie_detail
 
     def create_rating(self, movie_id: int, payload: RatingCreateIn) -> dict:
         movie = self.repository.get_movie_by_id(movie_id)
@@ -132,6 +441,7 @@ class MoviesService:
             rating = self.repository.create_rating(
                 movie_id=movie_id,
                 score=payload.score,
+                shards=rating_shards(),
             )
             self.repository.db.commit()
         except Exception:
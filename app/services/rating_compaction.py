@@ -0,0 +1,104 @@
+"""Fold old raw ratings into per-movie, per-day summaries.
+
+Ratings older than `older_than_days` (cut at UTC midnight, so a day is never
+split between the two tables) are counted into `movie_rating_daily` by
+(movie, day, score) and then deleted, in batches that each commit on their
+own. The read paths combine both tables (`app/repositories/rating_aggregates.py`)
+and `movie_rating_stats` is untouched, so no aggregate changes.
+
+Runs from `scripts/compact_ratings.py` or, with `RATING_COMPACTION_ENABLED`,
+periodically from the application lifespan.
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.observability.metrics import registry
+from app.repositories.rating_compaction import RatingCompactionRepository
+
+logger = logging.getLogger("movie_rating")
+
+ratings_compacted = registry.counter(
+    "ratings_compacted_total",
+    "Raw ratings folded into daily summaries and deleted.",
+)
+
+
+@dataclass
+class CompactionResult:
+    ratings: int = 0
+    summary_rows: int = 0
+    batches: int = 0
+
+
+def compaction_cutoff(older_than_days: int, now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    day = (now - timedelta(days=older_than_days)).astimezone(timezone.utc).date()
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+
+def _utc_day(created_at: datetime):
+    # SQLite returns naive UTC timestamps.
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def compact_ratings(
+    session_factory: sessionmaker,
+    *,
+    older_than_days: int,
+    batch_size: int = 10_000,
+    max_batches: Optional[int] = None,
+    pause_s: float = 0.0,
+    now: Optional[datetime] = None,
+) -> CompactionResult:
+    """Compact until no eligible ratings remain or `max_batches` is reached."""
+    cutoff = compaction_cutoff(older_than_days, now)
+    result = CompactionResult()
+    started = time.perf_counter()
+    while max_batches is None or result.batches < max_batches:
+        with session_factory() as db:
+            repository = RatingCompactionRepository(db)
+            try:
+                batch = repository.claim_batch(cutoff, batch_size)
+                if not batch:
+                    db.rollback()
+                    break
+                counts = Counter((row.movie_id, _utc_day(row.created_at), row.score) for row in batch)
+                repository.add_daily_counts(counts)
+                repository.delete_ratings(
+                    [row.id for row in batch],
+                    since=min(row.created_at for row in batch),
+                    before=cutoff,
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        result.batches += 1
+        result.ratings += len(batch)
+        result.summary_rows += len(counts)
+        ratings_compacted.inc(amount=len(batch))
+        if len(batch) < batch_size:
+            break
+        if pause_s:
+            time.sleep(pause_s)
+
+    if result.ratings:
+        logger.info(
+            "Ratings compacted",
+            extra={
+                "ratings": result.ratings,
+                "summary_rows": result.summary_rows,
+                "batches": result.batches,
+                "cutoff": cutoff.isoformat(),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+    return result
@@ -0,0 +1,101 @@
+"""Sharded rating counters and the job that merges them.
+
+Every rating used to increment the movie's single `movie_rating_stats` row,
+so concurrent ratings of one popular movie queued on that row's lock. With
+`RATING_STAT_SHARDS` > 0 a rating increments one of N rows in
+`movie_rating_stat_shards` instead, and `merge_rating_shards` periodically
+adds the shard totals into `movie_rating_stats` and empties the shards.
+
+Until merged, shard counts are missing from `movie_rating_stats` (and so
+from the average_rating/ratings_count list sorts); director totals add the
+pending shards to stay exact. Movie list and detail aggregates are computed
+from the ratings themselves and never lag.
+"""
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.observability.metrics import registry
+from app.repositories.rating_stats import RatingStatsRepository
+
+logger = logging.getLogger("movie_rating")
+
+rating_shards_merged = registry.counter(
+    "rating_shards_merged_total",
+    "Rating counter shard rows merged into movie_rating_stats.",
+)
+
+_shards = 0
+
+
+def configure_rating_shards(shards: int) -> None:
+    global _shards
+    _shards = max(0, shards)
+
+
+def rating_shards() -> int:
+    """Shard rows per movie that new ratings are spread over (0: none)."""
+    return _shards
+
+
+@dataclass
+class MergeResult:
+    shard_rows: int = 0
+    movies: int = 0
+    batches: int = 0
+
+
+def merge_rating_shards(
+    session_factory: sessionmaker,
+    *,
+    batch_size: int = 1000,
+    max_batches: Optional[int] = None,
+) -> MergeResult:
+    """Merge pending shard rows into the stats until none remain or `max_batches` is reached."""
+    result = MergeResult()
+    started = time.perf_counter()
+    while max_batches is None or result.batches < max_batches:
+        with session_factory() as db:
+            repository = RatingStatsRepository(db)
+            try:
+                rows = repository.claim_shards(batch_size)
+                if not rows:
+                    db.rollback()
+                    break
+                totals: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+                for row in rows:
+                    totals[row.movie_id][0] += row.ratings_count
+                    totals[row.movie_id][1] += row.ratings_sum
+                repository.add_to_stats(
+                    [
+                        {"movie_id": movie_id, "ratings_count": count, "ratings_sum": total}
+                        for movie_id, (count, total) in sorted(totals.items())
+                    ]
+                )
+                repository.subtract_from_shards(rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        result.batches += 1
+        result.shard_rows += len(rows)
+        result.movies += len(totals)
+        rating_shards_merged.inc(amount=len(rows))
+        if len(rows) < batch_size:
+            break
+
+    if result.shard_rows:
+        logger.debug(
+            "Rating shards merged",
+            extra={
+                "shard_rows": result.shard_rows,
+                "movies": result.movies,
+                "batches": result.batches,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+    return result
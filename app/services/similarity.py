@@ -0,0 +1,336 @@
+"""Precomputed "similar movies" index.
+
+Each movie is described by three feature blocks:
+
+- its genres, as an L2-normalised row of the genre incidence matrix;
+- its rating profile, the L2-normalised distribution of its scores (1-10);
+- its director, compared by identity.
+
+Similarity is a weighted sum of the two cosine similarities and a same-director
+bonus. The top-K neighbours of every movie are computed offline in blocks of
+dense matrix products (see `scripts/build_similarity_index.py`) and saved as
+a single structured `.npy` file. Workers open it with `mmap_mode="r"`, so the
+OS page cache holds one shared copy and a lookup is a binary search plus one
+row read.
+
+Building is O(movies^2) arithmetic. A batch of rows is scored against one
+chunk of columns at a time and its running top-K is merged chunk by chunk, so
+a block never exceeds `_BLOCK_CELLS` scores whatever the catalog size.
+Incremental updates recompute the rows of the given movies
+and fold their new scores into every other row. Because an evicted neighbour
+is not replaced from outside the stored top-K, rows can drift slightly from a
+full build until the next one.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.movie import Movie, movie_genres
+from app.repositories.rating_aggregates import rating_counts
+
+# numpy is optional and imported on first use (`_require_numpy`), so
+# processes with this feature off never pay for the import.
+np = None
+
+
+def _require_numpy() -> None:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - optional dependency
+            raise RuntimeError("The similarity index requires numpy (pip install numpy)") from None
+        np = numpy
+
+
+def _numpy_available() -> bool:
+    try:
+        _require_numpy()
+    except RuntimeError:
+        return False
+    return True
+
+
+logger = logging.getLogger("movie_rating")
+
+DEFAULT_K = 20
+DEFAULT_WEIGHTS = {"genre": 0.6, "rating": 0.25, "director": 0.15}
+_SCORES = 10
+# Scores per (rows x columns) block: 8M float32 values, ~32 MB plus temporaries.
+_BLOCK_CELLS = 1 << 23
+
+
+def index_dtype(k: int) -> "np.dtype":
+    return np.dtype([("id", "<i4"), ("neighbors", "<i4", (k,)), ("scores", "<f4", (k,))])
+
+
+@dataclass
+class Features:
+    ids: "np.ndarray"
+    directors: "np.ndarray"
+    genres: "np.ndarray"
+    ratings: "np.ndarray"
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def load_features(db: Session) -> Features:
+    """Read the catalog into dense feature matrices (rows in movie id order)."""
+    _require_numpy()
+    movies = db.execute(select(Movie.id, Movie.director_id).order_by(Movie.id)).all()
+    ids = np.array([row.id for row in movies], dtype=np.int32)
+    directors = np.array([row.director_id for row in movies], dtype=np.int32)
+
+    pairs = np.array(
+        db.execute(select(movie_genres.c.movie_id, movie_genres.c.genre_id)).all(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    genre_ids, genre_columns = np.unique(pairs[:, 1], return_inverse=True)
+    genres = np.zeros((len(ids), len(genre_ids)), dtype=np.float32)
+    rows = np.searchsorted(ids, pairs[:, 0])
+    known = rows < len(ids)
+    known[known] = ids[rows[known]] == pairs[known, 0]
+    genres[rows[known], genre_columns[known]] = 1.0
+
+    # Raw and compacted counts may both list a (movie, score); add.at sums them.
+    histogram = np.array(db.execute(select(rating_counts())).all(), dtype=np.int64).reshape(-1, 3)
+    ratings = np.zeros((len(ids), _SCORES), dtype=np.float32)
+    rows = np.searchsorted(ids, histogram[:, 0])
+    known = (rows < len(ids)) & (histogram[:, 1] >= 1) & (histogram[:, 1] <= _SCORES)
+    known[known] = ids[rows[known]] == histogram[known, 0]
+    np.add.at(ratings, (rows[known], histogram[known, 1] - 1), histogram[known, 2])
+
+    return Features(ids, directors, _normalize_rows(genres), _normalize_rows(ratings))
+
+
+def _similarities(
+    features: Features, rows: "np.ndarray", weights: dict[str, float], columns: slice
+) -> "np.ndarray":
+    """Similarity of the movies at `rows` to the movies at `columns`; self-pairs are -inf."""
+    scores = weights["genre"] * (features.genres[rows] @ features.genres[columns].T)
+    scores += weights["rating"] * (features.ratings[rows] @ features.ratings[columns].T)
+    scores += weights["director"] * (features.directors[rows, None] == features.directors[None, columns])
+    local = rows - columns.start
+    inside = (local >= 0) & (local < scores.shape[1])
+    scores[np.nonzero(inside)[0], local[inside]] = -np.inf
+    return scores
+
+
+def _column_chunk(rows: int, k: int) -> int:
+    return max(k, _BLOCK_CELLS // max(rows, 1))
+
+
+def _top_k(scores: "np.ndarray", candidates: "np.ndarray", k: int) -> tuple["np.ndarray", "np.ndarray"]:
+    """Best `k` columns per row, best first; missing slots are (-1, nan)."""
+    width = scores.shape[1]
+    keep = min(k, width)
+    if keep < width:
+        part = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+    else:
+        part = np.broadcast_to(np.arange(width), scores.shape).copy()
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    part = np.take_along_axis(part, order, axis=1)
+    part_scores = np.take_along_axis(part_scores, order, axis=1)
+
+    neighbors = np.full((scores.shape[0], k), -1, dtype=np.int32)
+    best = np.full((scores.shape[0], k), np.nan, dtype=np.float32)
+    picked = np.take_along_axis(candidates, part, axis=1)
+    valid = np.isfinite(part_scores)
+    neighbors[:, :keep] = np.where(valid, picked, -1)
+    best[:, :keep] = np.where(valid, part_scores, np.nan)
+    return neighbors, best
+
+
+def _merge_top_k(
+    neighbors: "np.ndarray", best: "np.ndarray", scores: "np.ndarray", candidates: "np.ndarray", k: int
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """Merge a top-`k` with new `scores` for the `candidates` ids (one per column)."""
+    merged_scores = np.concatenate([np.where(neighbors >= 0, best, -np.inf), scores], axis=1)
+    merged_ids = np.concatenate([neighbors, np.broadcast_to(candidates, scores.shape)], axis=1)
+    return _top_k(merged_scores, merged_ids, k)
+
+
+def _empty_top_k(rows: int, k: int) -> tuple["np.ndarray", "np.ndarray"]:
+    return np.full((rows, k), -1, dtype=np.int32), np.full((rows, k), np.nan, dtype=np.float32)
+
+
+def build_index(
+    features: Features,
+    *,
+    k: int = DEFAULT_K,
+    weights: Optional[dict[str, float]] = None,
+    batch_size: int = 512,
+) -> "np.ndarray":
+    """Compute the top-`k` neighbours of every movie."""
+    _require_numpy()
+    weights = weights or DEFAULT_WEIGHTS
+    ids = features.ids
+    index = np.zeros(len(ids), dtype=index_dtype(k))
+    index["id"] = ids
+    for start in range(0, len(ids), batch_size):
+        rows = np.arange(start, min(start + batch_size, len(ids)))
+        neighbors, best = _empty_top_k(len(rows), k)
+        width = _column_chunk(len(rows), k)
+        for chunk in range(0, len(ids), width):
+            window = slice(chunk, min(chunk + width, len(ids)))
+            scores = _similarities(features, rows, weights, window)
+            neighbors, best = _merge_top_k(neighbors, best, scores, ids[window], k)
+        index["neighbors"][rows] = neighbors
+        index["scores"][rows] = best
+    return index
+
+
+def update_index(
+    existing: "np.ndarray",
+    features: Features,
+    movie_ids: Iterable[int],
+    *,
+    weights: Optional[dict[str, float]] = None,
+    batch_size: int = 512,
+) -> "np.ndarray":
+    """Recompute the given movies (plus any not yet indexed) and fold them into the rest.
+
+    Movies no longer in `features` are dropped, including from neighbour lists.
+    """
+    _require_numpy()
+    weights = weights or DEFAULT_WEIGHTS
+    k = existing.dtype["neighbors"].shape[0]
+    ids = features.ids
+    index = np.zeros(len(ids), dtype=index_dtype(k))
+    index["id"] = ids
+    index["neighbors"] = -1
+    index["scores"] = np.nan
+
+    old_rows = np.searchsorted(existing["id"], ids)
+    found = old_rows < len(existing)
+    found[found] = existing["id"][old_rows[found]] == ids[found]
+    index["neighbors"][found] = existing["neighbors"][old_rows[found]]
+    index["scores"][found] = existing["scores"][old_rows[found]]
+
+    gone = np.setdiff1d(existing["id"], ids)
+    changed = np.union1d(
+        np.intersect1d(np.fromiter(movie_ids, dtype=np.int32), ids), ids[~found]
+    )
+    stale = np.union1d(gone, changed)
+    # Entries pointing at removed or recomputed movies are re-derived below.
+    dropped = np.isin(index["neighbors"], stale)
+    index["neighbors"][dropped] = -1
+    index["scores"][dropped] = np.nan
+
+    for start in range(0, len(changed), batch_size):
+        batch_ids = changed[start:start + batch_size]
+        rows = np.searchsorted(ids, batch_ids)
+        neighbors, best = _empty_top_k(len(rows), k)
+        width = _column_chunk(len(rows), k)
+        for chunk in range(0, len(ids), width):
+            window = slice(chunk, min(chunk + width, len(ids)))
+            scores = _similarities(features, rows, weights, window)
+            neighbors, best = _merge_top_k(neighbors, best, scores, ids[window], k)
+
+            # Offer the recomputed movies as candidates to the rows in this chunk.
+            current = index[window]
+            # Recomputed rows already score every movie, this batch included.
+            unchanged = ~np.isin(ids[window], changed)
+            merged_neighbors, merged_best = _merge_top_k(
+                current["neighbors"], current["scores"], scores.T, batch_ids, k
+            )
+            index["neighbors"][window][unchanged] = merged_neighbors[unchanged]
+            index["scores"][window][unchanged] = merged_best[unchanged]
+        index["neighbors"][rows] = neighbors
+        index["scores"][rows] = best
+    return index
+
+
+def save_index(index: "np.ndarray", path: str) -> None:
+    """Write atomically, so readers never map a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.save(fh, index)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def open_index(path: str) -> "np.ndarray":
+    _require_numpy()
+    return np.load(path, mmap_mode="r")
+
+
+class SimilarityIndex:
+    """Read side: a memory-mapped index that is re-opened when the file is replaced."""
+
+    def __init__(self, path: Optional[str] = None, check_interval_s: float = 1.0) -> None:
+        self.path = path
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._data = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    def configure(self, path: str) -> None:
+        with self._lock:
+            self.path = path
+            self._data = None
+            self._mtime = None
+            self._checked_at = 0.0
+
+    def _current(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return self._data
+        with self._lock:
+            self._checked_at = now
+            if not self.path or not _numpy_available():
+                return None
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except FileNotFoundError:
+                self._data, self._mtime = None, None
+                return None
+            if mtime != self._mtime:
+                self._data = open_index(self.path)
+                self._mtime = mtime
+                logger.info(
+                    "Similarity index opened",
+                    extra={"movies": len(self._data), "path": self.path},
+                )
+            return self._data
+
+    def neighbors(self, movie_id: int, limit: int) -> Optional[list[tuple[int, float]]]:
+        """Return up to `limit` (movie_id, score) pairs, best first.
+
+        None means no index is available; an empty list means the movie is
+        not indexed yet.
+        """
+        data = self._current()
+        if data is None:
+            return None
+        position = int(np.searchsorted(data["id"], movie_id))
+        if position >= len(data) or data["id"][position] != movie_id:
+            return []
+        row = data[position]
+        return [
+            (int(neighbor), float(score))
+            for neighbor, score in zip(row["neighbors"][:limit], row["scores"][:limit])
+            if neighbor >= 0
+        ]
+
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,102 @@
+"""Request coalescing ("single flight") for identical concurrent reads.
+
+When several requests ask for the same thing at the same time, only the first
+(the leader) runs the computation; the others wait for it and receive the same
+result or exception. Nothing is cached: once the leader finishes, the next
+call for that key runs again.
+
+Callers must treat shared results as read-only.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.observability.metrics import registry
+
+coalesced_requests = registry.counter(
+    "singleflight_coalesced_total",
+    "Calls that were served by another in-flight identical call.",
+    ("flight",),
+)
+leader_requests = registry.counter(
+    "singleflight_executions_total",
+    "Calls that executed the underlying computation.",
+    ("flight",),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    `do()` is for sync code (e.g. endpoints running in the threadpool);
+    `do_async()` is for coroutines on a single event loop.
+    """
+
+    def __init__(self, name: str, enabled: bool = True) -> None:
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._async_calls: dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            coalesced_requests.inc(self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        leader_requests.inc(self.name)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+        future = self._async_calls.get(key)
+        if future is not None:
+            coalesced_requests.inc(self.name)
+            # shield: a cancelled follower must not cancel the leader's result.
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        leader_requests.inc(self.name)
+        try:
+            result = await fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers observe the exception; don't warn if there were none.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._async_calls[key]
@@ -0,0 +1,121 @@
+"""Shared helpers for the benchmark scripts.
+
+`use_database()` must be called before anything under `app` is imported,
+because settings and the engine are created from `DATABASE_URL` at import time.
+"""
+import math
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary",
+    "Drama", "Fantasy", "Horror", "Romance", "Sci-Fi", "Thriller",
+]
+
+
+def use_database(database_url: str | None) -> str:
+    """Point the app at `database_url`, defaulting to a fresh temporary SQLite file."""
+    if not database_url:
+        handle, path = tempfile.mkstemp(prefix="movie-bench-", suffix=".db")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    return database_url
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_ms": (sum(values) / len(values) * 1000) if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def seed_catalog(engine, *, movies: int, ratings_per_movie: int, seed: int) -> bool:
+    """Create the schema and fill an empty database with a synthetic catalog.
+
+    Returns False (and leaves the data alone) when movies already exist.
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.models import Base, Director, Genre, Movie, MovieRating, MovieRatingStats, movie_genres
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(Movie)).scalar_one():
+            return False
+
+        rng = random.Random(seed)
+        directors = max(1, movies // 20)
+        conn.execute(
+            insert(Director),
+            [
+                {"id": i, "name": f"Director {i}", "birth_year": rng.randint(1930, 1995)}
+                for i in range(1, directors + 1)
+            ],
+        )
+        conn.execute(
+            insert(Genre),
+            [{"id": i, "name": name} for i, name in enumerate(GENRES, start=1)],
+        )
+        conn.execute(
+            insert(Movie),
+            [
+                {
+                    "id": i,
+                    "title": f"Movie {i}",
+                    "director_id": rng.randint(1, directors),
+                    "release_year": rng.randint(1950, 2025),
+                    "cast": "Actor A, Actor B",
+                }
+                for i in range(1, movies + 1)
+            ],
+        )
+        conn.execute(
+            insert(movie_genres),
+            [
+                {"movie_id": i, "genre_id": genre_id}
+                for i in range(1, movies + 1)
+                for genre_id in rng.sample(range(1, len(GENRES) + 1), rng.randint(1, 3))
+            ],
+        )
+        ratings = []
+        for i in range(1, movies + 1):
+            for _ in range(rng.randint(0, 2 * ratings_per_movie)):
+                ratings.append({"movie_id": i, "score": rng.randint(1, 10)})
+            if len(ratings) >= 50_000:
+                conn.execute(insert(MovieRating), ratings)
+                ratings = []
+        if ratings:
+            conn.execute(insert(MovieRating), ratings)
+        conn.execute(
+            insert(MovieRatingStats).from_select(
+                ["movie_id", "ratings_count", "ratings_sum", "average_rating"],
+                select(
+                    Movie.id,
+                    func.count(MovieRating.id),
+                    func.coalesce(func.sum(MovieRating.score), 0),
+                    func.coalesce(func.avg(MovieRating.score), 0),
+                )
+                .outerjoin(MovieRating, MovieRating.movie_id == Movie.id)
+                .group_by(Movie.id),
+            )
+        )
+    return True
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Measure per-request logging overhead in the request thread.
+
+Emits the same records the list controller logs for each request ("Listing
+movies" + "Movies listed successfully", both with `extra`) against a sink that
+simulates stdout backpressure, once through a synchronous StreamHandler and
+once through the queue pipeline used by `configure_logging`.
+
+Usage:
+    python benchmarks/logging_overhead.py --requests 20000 --sink-latency-us 50
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.logging_config import _build_output_handler, _build_queue_pipeline  # noqa: E402
+
+
+class _SlowSink(io.StringIO):
+    """In-memory stream whose writes block (releasing the GIL) like a full pipe."""
+
+    def __init__(self, latency_s: float) -> None:
+        super().__init__()
+        self._latency_s = latency_s
+
+    def write(self, data: str) -> int:
+        if self._latency_s:
+            time.sleep(self._latency_s)
+        return super().write(data)
+
+
+def _simulate_requests(logger: logging.Logger, requests: int) -> float:
+    route = "/api/v1/movies"
+    start = time.perf_counter()
+    for i in range(requests):
+        logger.info(
+            "Listing movies",
+            extra={"route": route, "page": 1, "page_size": 10, "title": None, "genre": "Drama"},
+        )
+        logger.info(
+            "Movies listed successfully",
+            extra={"route": route, "total_items": 1000, "returned_count": 10, "page": i},
+        )
+    return time.perf_counter() - start
+
+
+def _run(mode: str, requests: int, latency_s: float, queue_size: int) -> dict:
+    logger = logging.getLogger(f"bench.logging.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    output = _build_output_handler("json", _SlowSink(latency_s))
+
+    listener = None
+    if mode == "sync":
+        logger.addHandler(output)
+    else:
+        queue_handler, listener = _build_queue_pipeline(output, queue_size)
+        logger.addHandler(queue_handler)
+        listener.start()
+
+    elapsed = _simulate_requests(logger, requests)
+    dropped = 0
+    if listener is not None:
+        dropped = logger.handlers[0].dropped
+        listener.stop()
+    logger.handlers.clear()
+    return {
+        "mode": mode,
+        "requests": requests,
+        "us_per_request": elapsed / requests * 1e6,
+        "dropped": dropped,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=50.0)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    for mode in ("sync", "queue"):
+        result = _run(mode, args.requests, args.sink_latency_us / 1e6, args.queue_size)
+        print(
+            f"{result['mode']:>5}: {result['us_per_request']:8.2f} us/request "
+            f"({result['requests']} requests, dropped={result['dropped']})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
-"""Run `scripts/seeddb.sql` against the DATABASE_URL without needing `psql`.
+"""Apply a seed SQL file (default `scripts/seeddb.sql`) to DATABASE_URL without needing `psql`.
 
 This script attempts to use `psycopg` (psycopg3) and falls back to `psycopg2`.
-It reads the SQL file, splits into simple statements, and executes them.
-This is intended as a convenience for graders or devs on systems without `psql`.
+The file is streamed line by line and split into statements by a small
+lexer that understands quoted strings, quoted identifiers, dollar quoting and
+comments, so semicolons inside literals are safe. All statements run in a
+single transaction that is rolled back on the first error; BEGIN/COMMIT lines
+in the file are ignored. `COPY ... FROM stdin` blocks (as written by
+`pg_dump`) are streamed to the server with COPY.
+
+Usage:
+    python scripts/run_seed.py [path/to/seed.sql] [--progress-every SECONDS]
 """
+import argparse
 import os
+import re
 import sys
+import time
+from typing import Iterable, Iterator, Optional
 
 HERE = os.path.dirname(__file__)
 SQL_PATH = os.path.join(HERE, "seeddb.sql")
@@ -36,55 +47,297 @@ def _normalize_db_url(url: str) -> str:
 DB_URL = _normalize_db_url(DB_URL)
 
 _connect = None
+_copy_from_lines = None
 try:
     import psycopg as _pg
 
     def _connect(url):
         return _pg.connect(url)
+
+    def _copy_from_lines(cur, sql: str, lines: Iterable[str]) -> int:
+        rows = 0
+        with cur.copy(sql) as copy:
+            for line in lines:
+                copy.write(line)
+                rows += 1
+        return rows
 except Exception:
     try:
         import psycopg2 as _pg
 
         def _connect(url):
             return _pg.connect(url)
+
+        def _copy_from_lines(cur, sql: str, lines: Iterable[str]) -> int:
+            reader = _LineReader(lines)
+            cur.copy_expert(sql, reader)
+            return reader.lines
     except Exception:
         print("Please install either psycopg (pip install psycopg[binary]) or psycopg2-binary")
         sys.exit(1)
 
 
-def load_sql(path: str) -> str:
+class _LineReader:
+    """Minimal file-like object over an iterator of lines, for `copy_expert`."""
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self._lines = iter(lines)
+        self._pending = ""
+        self.lines = 0
+
+    def read(self, size: int = -1) -> str:
+        chunks = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self.lines += 1
+            chunks.append(line)
+            length += len(line)
+        data = "".join(chunks)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+    def readline(self, _size: int = -1) -> str:
+        if self._pending:
+            line, self._pending = self._pending, ""
+            return line
+        line = next(self._lines, "")
+        if line:
+            self.lines += 1
+        return line
+
+
+_NORMAL_SPECIAL = re.compile(r"[;'\"$]|--|/\*")
+_BLOCK_COMMENT = re.compile(r"/\*|\*/")
+_ESCAPE_STRING = re.compile(r"[\\']")
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+_COPY_FROM_STDIN = re.compile(r"^COPY\b.*\bFROM\s+STDIN\b", re.IGNORECASE | re.DOTALL)
+_TRANSACTION_CONTROL = re.compile(
+    r"^(BEGIN|START\s+TRANSACTION|COMMIT|END|ROLLBACK)\b", re.IGNORECASE
+)
+
+
+class StatementSplitter:
+    """Incremental SQL statement splitter.
+
+    Feed it lines (with their newlines); it returns the statements completed by
+    each line, with comments removed. Semicolons inside single-quoted strings
+    (including E'' strings), double-quoted identifiers, dollar-quoted bodies
+    and comments do not end a statement.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []
+        self._state: Optional[str] = None
+        self._dollar_tag = ""
+        self._comment_depth = 0
+
+    def feed(self, line: str) -> list[str]:
+        statements: list[str] = []
+        if self._state is None and not "".join(self._buffer).strip() and line.startswith("\\"):
+            # psql meta-command (e.g. `\connect`); not SQL.
+            return statements
+        i, end = 0, len(line)
+        while i < end:
+            if self._state is None:
+                match = _NORMAL_SPECIAL.search(line, i)
+                if match is None:
+                    self._buffer.append(line[i:])
+                    break
+                self._buffer.append(line[i:match.start()])
+                token = match.group()
+                i = match.end()
+                if token == ";":
+                    statement = "".join(self._buffer).strip()
+                    self._buffer = []
+                    if statement:
+                        statements.append(statement)
+                elif token == "--":
+                    self._buffer.append("\n")
+                    break
+                elif token == "/*":
+                    self._state = "comment"
+                    self._comment_depth = 1
+                    self._buffer.append(" ")
+                elif token == "'":
+                    start = match.start()
+                    escape = (
+                        start > 0
+                        and line[start - 1] in "eE"
+                        and (start < 2 or not (line[start - 2].isalnum() or line[start - 2] == "_"))
+                    )
+                    self._state = "escape_string" if escape else "string"
+                    self._buffer.append(token)
+                elif token == '"':
+                    self._state = "identifier"
+                    self._buffer.append(token)
+                else:
+                    dollar = _DOLLAR_TAG.match(line, match.start())
+                    if dollar is not None:
+                        self._state = "dollar"
+                        self._dollar_tag = dollar.group()
+                        self._buffer.append(self._dollar_tag)
+                        i = dollar.end()
+                    else:
+                        self._buffer.append(token)
+            elif self._state in ("string", "identifier"):
+                quote = "'" if self._state == "string" else '"'
+                j = line.find(quote, i)
+                if j < 0:
+                    self._buffer.append(line[i:])
+                    break
+                if line.startswith(quote, j + 1):
+                    self._buffer.append(line[i:j + 2])
+                    i = j + 2
+                    continue
+                self._buffer.append(line[i:j + 1])
+                self._state = None
+                i = j + 1
+            elif self._state == "escape_string":
+                match = _ESCAPE_STRING.search(line, i)
+                if match is None:
+                    self._buffer.append(line[i:])
+                    break
+                j = match.start()
+                if match.group() == "\\" or line.startswith("'", j + 1):
+                    self._buffer.append(line[i:j + 2])
+                    i = j + 2
+                    continue
+                self._buffer.append(line[i:j + 1])
+                self._state = None
+                i = j + 1
+            elif self._state == "dollar":
+                j = line.find(self._dollar_tag, i)
+                if j < 0:
+                    self._buffer.append(line[i:])
+                    break
+                tag_end = j + len(self._dollar_tag)
+                self._buffer.append(line[i:tag_end])
+                self._state = None
+                i = tag_end
+            else:
+                match = _BLOCK_COMMENT.search(line, i)
+                if match is None:
+                    break
+                i = match.end()
+                self._comment_depth += 1 if match.group() == "/*" else -1
+                if self._comment_depth == 0:
+                    self._state = None
+        return statements
+
+    def finish(self) -> Optional[str]:
+        """Return a trailing statement that was not terminated by `;`."""
+        statement = "".join(self._buffer).strip()
+        self._buffer = []
+        if self._state is not None:
+            raise ValueError("Unterminated string, identifier or comment at end of file")
+        return statement or None
+
+
+def _copy_data(lines: Iterator[str]) -> Iterator[str]:
+    for line in lines:
+        if line.rstrip("\r\n") == "\\.":
+            return
+        yield line
+
+
+def iter_statements(lines: Iterable[str]) -> Iterator[tuple[str, Optional[Iterator[str]]]]:
+    """Yield (statement, copy_data) pairs.
+
+    For `COPY ... FROM stdin` statements `copy_data` iterates the data lines
+    that follow (up to the `\\.` terminator); it is drained automatically if
+    the caller does not consume it.
+    """
+    splitter = StatementSplitter()
+    line_iter = iter(lines)
+    for line in line_iter:
+        for statement in splitter.feed(line):
+            if _COPY_FROM_STDIN.match(statement):
+                data = _copy_data(line_iter)
+                yield statement, data
+                for _ in data:
+                    pass
+            else:
+                yield statement, None
+    trailing = splitter.finish()
+    if trailing:
+        yield trailing, None
+
+
+class _Progress:
+    def __init__(self, every: float) -> None:
+        self.every = every
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.statements = 0
+        self.rows = 0
+
+    def add(self, rows: int) -> None:
+        self.statements += 1
+        self.rows += max(rows, 0)
+        now = time.perf_counter()
+        if self.every and now - self._last >= self.every:
+            self._last = now
+            self.report()
+
+    def report(self, prefix: str = "Progress") -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(
+            f"{prefix}: {self.statements:,} statements, {self.rows:,} rows "
+            f"in {elapsed:.1f}s ({self.rows / elapsed:,.0f} rows/s)",
+            flush=True,
+        )
+
+
+def apply_seed(conn, path: str, progress: _Progress) -> None:
+    cur = conn.cursor()
     with open(path, "r", encoding="utf-8") as fh:
-        return fh.read()
+        for statement, copy_data in iter_statements(fh):
+            if _TRANSACTION_CONTROL.match(statement):
+                continue
+            if copy_data is not None:
+                progress.add(_copy_from_lines(cur, statement, copy_data))
+            else:
+                cur.execute(statement)
+                progress.add(cur.rowcount if cur.rowcount is not None else 0)
+    cur.close()
 
 
 def main() -> int:
-    if not os.path.exists(SQL_PATH):
-        print(f"SQL file not found: {SQL_PATH}")
-        return 2
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=SQL_PATH, help="SQL file to apply")
+    parser.add_argument(
+        "--progress-every",
+        type=float,
+        default=5.0,
+        help="Seconds between progress lines (0 disables)",
+    )
+    args = parser.parse_args()
 
-    sql = load_sql(SQL_PATH)
+    if not os.path.exists(args.path):
+        print(f"SQL file not found: {args.path}")
+        return 2
 
     conn = None
+    progress = _Progress(args.progress_every)
     try:
         conn = _connect(DB_URL)
-        # allow executing BEGIN/COMMIT inside the SQL file
-        try:
-            conn.autocommit = True
-        except Exception:
-            pass
-
-        cur = conn.cursor()
-
-        # Very small/simple splitter for this project's seed SQL.
-        # This is not a full SQL parser but is sufficient for our simple seed file.
-        statements = [s.strip() for s in sql.split(";") if s.strip()]
-        for stmt in statements:
-            cur.execute(stmt + ";")
-
-        print("Seed SQL applied successfully.")
+        apply_seed(conn, args.path, progress)
+        conn.commit()
+        progress.report("Seed SQL applied successfully")
         return 0
     except Exception as exc:
-        print("Error applying seed SQL:", exc)
+        if conn:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        print(f"Error applying seed SQL after {progress.statements:,} statements (rolled back):", exc)
         return 3
     finally:
         if conn:
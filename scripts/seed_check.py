@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """Simple seed validation script.
 
-Connects to the DB defined by `DATABASE_URL` and prints counts for key tables.
+Connects to the DB defined by `DATABASE_URL` and prints row counts for key tables.
+By default counts are the planner's catalog estimates (`pg_class.reltuples`,
+falling back to `pg_stat_user_tables.n_live_tup` for tables that were never
+analyzed), which are instant even on very large tables. Pass `--exact` to run
+`COUNT(*)` instead.
 Attempts to use `psycopg` (psycopg3) and falls back to `psycopg2`.
 """
+import argparse
 import os
 import sys
 
@@ -49,18 +54,44 @@ except Exception:
 
 TABLES = ["directors", "genres", "movies", "movie_genres", "movie_ratings"]
 
+# For partitioned tables the estimate sums the partitions only: since
+# PostgreSQL 14, ANALYZE on the parent sets its reltuples to the total of its
+# children, so counting it as well would double the figure.
+ESTIMATE_SQL = """
+SELECT COALESCE(SUM(
+           CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint
+                ELSE COALESCE(s.n_live_tup, 0) END
+       ), 0)
+FROM pg_class c
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE c.relkind <> 'p'
+  AND (c.oid = to_regclass(%s)
+       OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s)));
+"""
+
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Print row counts for the seeded tables.")
+    parser.add_argument("--exact", action="store_true", help="Use COUNT(*) instead of catalog estimates")
+    args = parser.parse_args()
+
     conn = None
     try:
         conn = _connect(DB_URL)
         cur = conn.cursor()
-        print("Connected to database; counting rows:")
+        if args.exact:
+            print("Connected to database; counting rows:")
+        else:
+            print("Connected to database; estimated row counts (use --exact for COUNT(*)):")
         for t in TABLES:
-            cur.execute(f"SELECT COUNT(*) FROM {t};")
+            if args.exact:
+                cur.execute(f"SELECT COUNT(*) FROM {t};")
+            else:
+                cur.execute(ESTIMATE_SQL, (t, t))
             row = cur.fetchone()
             n = row[0] if row else 0
-            print(f"- {t}: {n}")
+            prefix = "" if args.exact else "~"
+            print(f"- {t}: {prefix}{n}")
         return 0
     except Exception as exc:
         print("Error while checking seed data:", exc)
@@ -36,6 +36,13 @@ INSERT INTO movie_ratings (id, movie_id, score, created_at) VALUES
   (3, 3, 10, now()),
   (4, 2, 7, now());
 
+-- Precomputed rating aggregates used for sorting the movie list
+INSERT INTO movie_rating_stats (movie_id, ratings_count, ratings_sum, average_rating)
+SELECT m.id, COUNT(r.id), COALESCE(SUM(r.score), 0), COALESCE(AVG(r.score), 0)
+FROM movies m
+LEFT JOIN movie_ratings r ON r.movie_id = m.id
+GROUP BY m.id;
+
 -- Ensure sequences (if tables use serial sequences) are set past max(id)
 SELECT setval(pg_get_serial_sequence('directors','id'), COALESCE((SELECT max(id) FROM directors),0));
 SELECT setval(pg_get_serial_sequence('genres','id'), COALESCE((SELECT max(id) FROM genres),0));
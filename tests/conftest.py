@@ -0,0 +1,139 @@
+"""Shared fixtures: a throwaway SQLite database and a small catalog.
+
+Settings and the engine are created from `DATABASE_URL` on first use, so the
+environment is set here, before any test module imports `app`. Set
+`TEST_DATABASE_URL` to run the suite against another database (the
+PostgreSQL-only tests need it); its tables are dropped after every test.
+"""
+import os
+import tempfile
+
+_database_url = os.environ.get("TEST_DATABASE_URL")
+if not _database_url:
+    _database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='movie-tests-'), 'test.db')}"
+os.environ["DATABASE_URL"] = _database_url
+os.environ.setdefault("WARMUP_ENABLED", "false")
+os.environ.setdefault("RATING_SHARD_MERGE_INTERVAL_S", "0")
+os.environ.setdefault("RATING_PARTITION_MONTHS_AHEAD", "0")
+
+from datetime import datetime, timezone  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import insert, text  # noqa: E402
+
+from app.db.database import get_engine, get_sessionmaker  # noqa: E402
+from app.models import (  # noqa: E402
+    Base,
+    Director,
+    Genre,
+    Movie,
+    MovieRating,
+    MovieRatingStats,
+    movie_genres,
+)
+from app.services.genre_cache import genre_cache  # noqa: E402
+
+# (id, title, director_id, release_year, genre ids, scores)
+MOVIES = [
+    (1, "Inception", 1, 2010, (1, 2), (9, 8)),
+    (2, "Little Women", 2, 2019, (1, 3), (7,)),
+    (3, "Interstellar", 1, 2014, (1, 2), (10, 9, 8)),
+    (4, "Lady Bird", 2, 2017, (1, 3), (8, 8)),
+    (5, "Tenet", 1, 2020, (2,), (6, 7)),
+    (6, "Barbie", 2, 2023, (3,), (5,)),
+    (7, "Dunkirk", 1, 2017, (1,), (9,)),
+    (8, "Memento", 1, 2000, (1,), ()),
+    (9, "Frances Ha", 2, 2012, (1, 3), (7, 6)),
+    (10, "Oppenheimer", 1, 2023, (1,), (10, 9)),
+]
+
+
+@pytest.fixture(scope="session")
+def engine():
+    return get_engine()
+
+
+@pytest.fixture(scope="session")
+def session_factory(engine):
+    return get_sessionmaker()
+
+
+@pytest.fixture(autouse=True)
+def _schema(engine):
+    Base.metadata.create_all(engine)
+    genre_cache.invalidate()
+    yield
+    Base.metadata.drop_all(engine)
+    genre_cache.invalidate()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def catalog(engine):
+    """Two directors, three genres and `MOVIES`, with exact rating stats."""
+    rated_at = datetime(2025, 1, 15, 12, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Director),
+            [{"id": 1, "name": "Nolan", "birth_year": 1970}, {"id": 2, "name": "Gerwig", "birth_year": 1983}],
+        )
+        conn.execute(
+            insert(Genre),
+            [{"id": 1, "name": "Drama"}, {"id": 2, "name": "Sci-Fi"}, {"id": 3, "name": "Comedy"}],
+        )
+        conn.execute(
+            insert(Movie),
+            [
+                {"id": movie_id, "title": title, "director_id": director_id, "release_year": year}
+                for movie_id, title, director_id, year, _, _ in MOVIES
+            ],
+        )
+        conn.execute(
+            insert(movie_genres),
+            [
+                {"movie_id": movie_id, "genre_id": genre_id}
+                for movie_id, _, _, _, genre_ids, _ in MOVIES
+                for genre_id in genre_ids
+            ],
+        )
+        conn.execute(
+            insert(MovieRating),
+            [
+                {"movie_id": movie_id, "score": score, "created_at": rated_at}
+                for movie_id, _, _, _, _, scores in MOVIES
+                for score in scores
+            ],
+        )
+        conn.execute(
+            insert(MovieRatingStats),
+            [
+                {
+                    "movie_id": movie_id,
+                    "ratings_count": len(scores),
+                    "ratings_sum": sum(scores),
+                    "average_rating": sum(scores) / len(scores) if scores else 0.0,
+                }
+                for movie_id, _, _, _, _, scores in MOVIES
+            ],
+        )
+        if conn.dialect.name == "postgresql":
+            for table in ("directors", "genres", "movies"):
+                conn.execute(
+                    text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+                )
+    return MOVIES
+
+
+@pytest.fixture
+def client(catalog):
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    with TestClient(create_app()) as test_client:
+        yield test_client
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.resilience.admission import AdmissionLimits, AdmissionMiddleware
+
+
+def _scope(method: str = "GET", path: str = "/api/v1/movies") -> dict:
+    return {"type": "http", "method": method, "path": path, "headers": [], "query_string": b""}
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _request(middleware: AdmissionMiddleware, method: str = "GET") -> tuple[int, dict[str, str]]:
+    messages = []
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await middleware(_scope(method), _receive, send)
+    start = messages[0]
+    headers = {key.decode(): value.decode() for key, value in start.get("headers", [])}
+    return start["status"], headers
+
+
+class _GatedApp:
+    """Answers 200 once `gate` is set; the first `failures` calls raise instead."""
+
+    def __init__(self) -> None:
+        self.gate = asyncio.Event()
+        self.started = asyncio.Event()
+        self.failures = 0
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.started.set()
+        await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("handler failed")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def _middleware(app, max_queue: int, timeout_s: float = 5.0) -> AdmissionMiddleware:
+    limits = AdmissionLimits(max_concurrency=1, max_queue=max_queue, queue_timeout_s=timeout_s)
+    return AdmissionMiddleware(app, read_limits=limits, write_limits=limits, retry_after_s=7)
+
+
+def test_full_queue_is_shed_with_retry_after():
+    async def scenario():
+        app = _GatedApp()
+        middleware = _middleware(app, max_queue=0)
+        first = asyncio.ensure_future(_request(middleware))
+        await app.started.wait()
+
+        status, headers = await _request(middleware)
+        assert status == 503
+        assert headers["retry-after"] == "7"
+
+        app.gate.set()
+        assert (await first)[0] == 200
+        # The slot is free again once the admitted request finished.
+        assert (await _request(middleware))[0] == 200
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_is_shed():
+    async def scenario():
+        app = _GatedApp()
+        middleware = _middleware(app, max_queue=1, timeout_s=0.05)
+        first = asyncio.ensure_future(_request(middleware))
+        await app.started.wait()
+
+        status, headers = await _request(middleware)
+        assert status == 503
+        assert headers["retry-after"] == "7"
+        assert not middleware.readers._waiters
+
+        app.gate.set()
+        assert (await first)[0] == 200
+
+    asyncio.run(scenario())
+
+
+def test_slot_is_released_when_the_handler_raises():
+    async def scenario():
+        app = _GatedApp()
+        app.failures = 1
+        middleware = _middleware(app, max_queue=1)
+        failing = asyncio.ensure_future(_request(middleware))
+        await app.started.wait()
+        queued = asyncio.ensure_future(_request(middleware))
+        await asyncio.sleep(0)
+        assert len(middleware.readers._waiters) == 1
+
+        app.gate.set()
+        with pytest.raises(RuntimeError):
+            await failing
+        # The queued request inherits the slot, and it is free afterwards.
+        assert (await queued)[0] == 200
+        assert (await _request(middleware))[0] == 200
+        assert middleware.readers._active == 0
+
+    asyncio.run(scenario())
+
+
+def test_reads_and_writes_are_limited_separately():
+    async def scenario():
+        app = _GatedApp()
+        middleware = _middleware(app, max_queue=0)
+        read = asyncio.ensure_future(_request(middleware, "GET"))
+        await app.started.wait()
+        app.started.clear()
+
+        write = asyncio.ensure_future(_request(middleware, "POST"))
+        await app.started.wait()
+        assert (await _request(middleware, "DELETE"))[0] == 503
+
+        app.gate.set()
+        assert (await read)[0] == 200
+        assert (await write)[0] == 200
+
+    asyncio.run(scenario())
@@ -0,0 +1,114 @@
+import itertools
+
+import pytest
+from sqlalchemy import update
+
+from app.models import Director, Movie
+from app.repositories.movies_repository import MovieFilters, MoviesRepository
+
+pytest.importorskip("numpy")
+
+from app.exceptions.http_exceptions import ValidationError  # noqa: E402
+from app.services.catalog_snapshot import (  # noqa: E402
+    CatalogSnapshot,
+    build_snapshot,
+    catalog_snapshot,
+    save_snapshot,
+)
+from app.services.movies_service import MoviesService  # noqa: E402
+
+FILTERS = [
+    MovieFilters(),
+    MovieFilters(title="in"),
+    MovieFilters(release_year=2017),
+    MovieFilters(year_from=2012, year_to=2020),
+    MovieFilters(genre_ids=(1, 3)),
+    MovieFilters(genre_ids=(1, 3), match_all_genres=True),
+    MovieFilters(director_id=2, min_rating=7),
+    MovieFilters(min_rating_count=2),
+]
+SORTS = ["id", "release_year", "title", "average_rating", "ratings_count"]
+
+
+def _record(record) -> tuple:
+    director = record.director
+    return (
+        record.id,
+        record.title,
+        record.release_year,
+        (director.id, director.name, director.birth_year, director.description),
+        tuple(record.genres),
+        None if record.avg_rating is None else round(record.avg_rating, 9),
+        record.rating_count,
+        getattr(record, "cast", None),
+    )
+
+
+@pytest.fixture
+def snapshot(catalog, db, tmp_path):
+    db.execute(update(Movie).where(Movie.id.in_([1, 3])).values(cast="A, B"))
+    db.execute(update(Director).where(Director.id == 2).values(description="Writer and director"))
+    db.commit()
+    header, arrays = build_snapshot(db)
+    path = str(tmp_path / "catalog.snapshot")
+    save_snapshot(header, arrays, path)
+    return CatalogSnapshot(path)
+
+
+def test_snapshot_covers_the_catalog(snapshot, catalog):
+    assert len(snapshot) == len(catalog)
+    assert snapshot.genre_id("sci-fi") == 2
+    assert snapshot.genre_id("Western") is None
+
+
+@pytest.mark.parametrize("filters, sort, descending", list(itertools.product(FILTERS, SORTS, [False, True])))
+def test_list_pages_match_the_repository(snapshot, db, filters, sort, descending):
+    repository = MoviesRepository(db)
+    after = None
+    for page in (1, 2, 3):
+        expected = repository.list_movies(
+            page=page, page_size=2, filters=filters, sort=sort, descending=descending, after=after
+        )
+        actual = snapshot.list_movies(
+            page=page, page_size=2, filters=filters, sort=sort, descending=descending, after=after
+        )
+        assert actual[0] == expected[0]
+        assert [_record(item) for item in actual[1]] == [_record(item) for item in expected[1]]
+        assert actual[2] == expected[2]
+        if expected[2] is None:
+            break
+        # Alternate offset and keyset pages.
+        after = expected[2] if page % 2 else None
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_facets_match_the_repository(snapshot, db, filters):
+    facets = ["genre", "release_year"]
+    assert snapshot.facet_counts(facets, filters) == MoviesRepository(db).facet_counts(facets, filters)
+
+
+def test_details_match_the_repository(snapshot, db, catalog):
+    repository = MoviesRepository(db)
+    for movie_id in [0, *(movie[0] for movie in catalog), 99]:
+        expected = repository.get_movie_detail(movie_id)
+        actual = snapshot.get_movie_detail(movie_id)
+        assert (actual and _record(actual)) == (expected and _record(expected))
+
+
+@pytest.fixture
+def serving(snapshot):
+    previous = catalog_snapshot.path, catalog_snapshot.serving
+    catalog_snapshot.configure(snapshot.path, serving=True)
+    yield
+    catalog_snapshot.configure(previous[0], serving=previous[1])
+
+
+def test_serving_mode_only_accepts_its_own_cursors(db, serving):
+    service = MoviesService(db)
+    first = service.list_movies(page=1, page_size=3, sort="title")
+    second = service.list_movies(page=1, page_size=3, sort="title", cursor=first["next_cursor"])
+    assert [item.id for item in second["items"]] == [1, 3, 4]
+
+    catalog_snapshot.configure(catalog_snapshot.path, serving=False)
+    with pytest.raises(ValidationError, match="another catalog source"):
+        service.list_movies(page=1, page_size=3, sort="title", cursor=first["next_cursor"])
@@ -0,0 +1,99 @@
+import base64
+import json
+
+import pytest
+
+from app.exceptions.http_exceptions import ValidationError
+from app.services.movies_service import _decode_cursor, _encode_cursor
+
+SORTS = ["id", "release_year", "title", "average_rating", "ratings_count"]
+
+
+def _raw_cursor(payload) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "sort, key",
+    [
+        ("id", (7, 7)),
+        ("release_year", (2017, 4)),
+        ("title", ("Lady Bird", 4)),
+        ("average_rating", (8.5, 1)),
+        ("average_rating", (9, 3)),
+        ("ratings_count", (0, 8)),
+    ],
+)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_round_trip(sort, key, order):
+    assert _decode_cursor(_encode_cursor(sort, order, key), sort, order) == key
+
+
+@pytest.mark.parametrize(
+    "sort, cursor",
+    [
+        ("id", "not base64!"),
+        ("id", _raw_cursor({"sort": "id"})),
+        ("id", _raw_cursor(["id", "asc", 1])),
+        ("id", _raw_cursor(["id", "asc", "1", 1])),
+        ("id", _raw_cursor(["id", "asc", 1, True])),
+        ("id", _raw_cursor(["id", "asc", 1, 1.5])),
+        ("id", _raw_cursor(["id", "asc", 1, 2**63])),
+        ("release_year", _raw_cursor(["release_year", "asc", None, 1])),
+        ("title", _raw_cursor(["title", "asc", 3, 1])),
+        ("average_rating", _raw_cursor(["average_rating", "asc", "8.5", 1])),
+        ("average_rating", base64.urlsafe_b64encode(b'["average_rating","asc",NaN,1]').decode()),
+    ],
+)
+def test_malformed_cursor_is_rejected(sort, cursor):
+    with pytest.raises(ValidationError):
+        _decode_cursor(cursor, sort, "asc")
+
+
+def test_cursor_from_another_catalog_source_is_rejected():
+    key = ("Inception", 1)
+    database_cursor = _encode_cursor("title", "asc", key)
+    snapshot_cursor = _encode_cursor("title", "asc", key, snapshot=True)
+    assert _decode_cursor(snapshot_cursor, "title", "asc", snapshot=True) == key
+    with pytest.raises(ValidationError, match="another catalog source"):
+        _decode_cursor(database_cursor, "title", "asc", snapshot=True)
+    with pytest.raises(ValidationError, match="another catalog source"):
+        _decode_cursor(snapshot_cursor, "title", "asc")
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = _encode_cursor("release_year", "asc", (2010, 1))
+    with pytest.raises(ValidationError, match="does not match"):
+        _decode_cursor(cursor, "release_year", "desc")
+    with pytest.raises(ValidationError, match="does not match"):
+        _decode_cursor(cursor, "title", "asc")
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_the_catalog_once(client, catalog, sort, order):
+    seen = []
+    params = {"page_size": 3, "sort": sort, "order": order}
+    while True:
+        body = client.get("/api/v1/movies", params=params).json()["data"]
+        seen.extend(item["id"] for item in body["items"])
+        if not body["next_cursor"]:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    offset_pages = [
+        item["id"]
+        for page in range(1, 5)
+        for item in client.get(
+            "/api/v1/movies", params={"page": page, "page_size": 3, "sort": sort, "order": order}
+        ).json()["data"]["items"]
+    ]
+    assert seen == offset_pages
+    assert sorted(seen) == sorted(movie[0] for movie in catalog)
+
+
+def test_api_rejects_invalid_cursor(client):
+    response = client.get("/api/v1/movies", params={"cursor": _raw_cursor(["id", "asc", "x", 1])})
+    assert response.status_code == 422
+    assert response.json()["error"]["message"] == "Invalid cursor"
@@ -0,0 +1,124 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import inspect, select, text
+
+from app.db import partitions
+from app.db.partitions import (
+    _has_default_partition,
+    add_months,
+    detach_rating_partitions,
+    ensure_rating_partitions,
+    list_rating_partitions,
+    month_start,
+    partition_name,
+)
+from app.repositories.movie import MovieRepository
+from app.repositories.rating_aggregates import rating_aggregates
+
+
+def test_month_arithmetic():
+    assert month_start(date(2025, 3, 31)) == date(2025, 3, 1)
+    assert add_months(date(2025, 11, 1), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2025, 2, 1)) == "movie_ratings_p2025_02"
+
+
+def test_detach_is_a_no_op_on_an_unpartitioned_table(engine, catalog):
+    assert detach_rating_partitions(engine, before=date(2100, 1, 1)) == []
+    assert ensure_rating_partitions(engine, since=date(2025, 1, 1)) == []
+
+
+@pytest.fixture
+def partitioned_ratings(engine):
+    """Rebuild `movie_ratings` as migration 0005 does, with partitions for 2025."""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("rating partitions are PostgreSQL only (set TEST_DATABASE_URL)")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE movie_ratings"))
+        conn.execute(
+            text(
+                """
+                CREATE TABLE movie_ratings (
+                    id serial,
+                    movie_id integer NOT NULL REFERENCES movies (id),
+                    score integer NOT NULL,
+                    created_at timestamp with time zone NOT NULL DEFAULT now(),
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at)
+                """
+            )
+        )
+        conn.execute(text("CREATE TABLE movie_ratings_default PARTITION OF movie_ratings DEFAULT"))
+    ensure_rating_partitions(engine, since=date(2025, 1, 1), months_ahead=0, today=date(2025, 3, 1))
+    yield
+    with engine.begin() as conn:
+        for name in inspect(conn).get_table_names():
+            if name.startswith("movie_ratings_p"):
+                conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+def _aggregates(db) -> dict:
+    aggregates = rating_aggregates()
+    return {row.movie_id: (round(row.avg_rating, 9), row.rating_count) for row in db.execute(select(aggregates))}
+
+
+@pytest.mark.parametrize("concurrently", [False, True])
+def test_detached_months_stay_counted_and_do_not_block_deletes(
+    engine, partitioned_ratings, catalog, db, concurrently
+):
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO movie_ratings (movie_id, score, created_at) VALUES (1, 4, :at)"),
+            {"at": datetime(2025, 2, 3, tzinfo=timezone.utc)},
+        )
+    before = _aggregates(db)
+    db.rollback()
+
+    detached = detach_rating_partitions(engine, before=date(2025, 2, 1), concurrently=concurrently)
+
+    assert detached == ["movie_ratings_p2025_01"]
+    with engine.connect() as conn:
+        assert [name for name, _ in list_rating_partitions(conn)] == [
+            "movie_ratings_p2025_02",
+            "movie_ratings_p2025_03",
+        ]
+        # The archive keeps its rows but no longer references movies.
+        assert conn.execute(text("SELECT count(*) FROM movie_ratings_p2025_01")).scalar() > 0
+        assert not inspect(conn).get_foreign_keys("movie_ratings_p2025_01")
+        # A concurrent detach puts the DEFAULT partition back afterwards.
+        assert _has_default_partition(conn)
+    assert _aggregates(db) == before
+
+    MovieRepository(db).delete_movie(1)
+    db.commit()
+    assert 1 not in _aggregates(db)
+
+
+def test_concurrent_detach_reattaches_the_default_partition_on_failure(
+    engine, partitioned_ratings, catalog, monkeypatch
+):
+    def fail(connection, name):
+        raise RuntimeError("summary failed")
+
+    monkeypatch.setattr(partitions, "_summarise_detached", fail)
+    with pytest.raises(RuntimeError):
+        detach_rating_partitions(engine, before=date(2025, 2, 1), concurrently=True)
+
+    with engine.connect() as conn:
+        assert _has_default_partition(conn)
+        assert [name for name, _ in list_rating_partitions(conn)] == [
+            "movie_ratings_p2025_02",
+            "movie_ratings_p2025_03",
+        ]
+
+
+def test_detach_and_drop(engine, partitioned_ratings, catalog, db):
+    before = _aggregates(db)
+    db.rollback()
+
+    assert detach_rating_partitions(engine, before=date(2025, 2, 1), drop=True) == ["movie_ratings_p2025_01"]
+
+    with engine.connect() as conn:
+        assert "movie_ratings_p2025_01" not in inspect(conn).get_table_names()
+    assert _aggregates(db) == before
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+
+from app.observability.query_budget import QueryBudgetExceeded, assert_query_budget
+
+
+@pytest.mark.parametrize(
+    "url, budget",
+    [
+        ("/api/v1/movies?page_size=10", 4),
+        ("/api/v1/movies?genre=Drama,Comedy&genre_match=all&sort=average_rating&order=desc", 4),
+        ("/api/v1/movies?page_size=10&facets=genre,release_year", 5),
+        ("/api/v1/movies/3", 2),
+        ("/api/v1/directors", 2),
+        ("/api/v1/directors/1", 4),
+    ],
+)
+def test_read_endpoints_stay_within_budget(client, engine, url, budget):
+    # Each statement runs once whatever the page size, so there is no N+1.
+    with assert_query_budget(engine, budget, max_repeats=1):
+        assert client.get(url).status_code == 200
+
+
+def test_genre_counts_are_served_from_cache(client, engine):
+    client.get("/api/v1/genres")
+    with assert_query_budget(engine, 0):
+        counts = {genre["name"]: genre["movie_count"] for genre in client.get("/api/v1/genres").json()["data"]}
+    assert counts == {"Comedy": 4, "Drama": 8, "Sci-Fi": 3}
+
+    assert client.delete("/api/v1/movies/2").status_code == 204
+    counts = {genre["name"]: genre["movie_count"] for genre in client.get("/api/v1/genres").json()["data"]}
+    assert counts == {"Comedy": 3, "Drama": 7, "Sci-Fi": 3}
+
+
+def test_budget_fails_when_exceeded(engine):
+    with pytest.raises(QueryBudgetExceeded, match="at most 1 queries, executed 2"):
+        with assert_query_budget(engine, 1):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+def test_budget_fails_on_repeated_statements(engine):
+    with pytest.raises(QueryBudgetExceeded, match="repeated more than 1 times"):
+        with assert_query_budget(engine, 10, max_repeats=1):
+            with engine.connect() as conn:
+                for movie_id in (1, 2, 3):
+                    conn.execute(text("SELECT :id"), {"id": movie_id})
@@ -0,0 +1,77 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from app.models import MovieRating, MovieRatingDaily
+from app.repositories.rating_aggregates import rating_aggregates
+from app.services.rating_compaction import compact_ratings, compaction_cutoff
+
+NOW = datetime(2025, 6, 10, 15, 30, tzinfo=timezone.utc)
+
+
+def _aggregates(db) -> dict[int, tuple[float, int]]:
+    aggregates = rating_aggregates()
+    return {
+        row.movie_id: (round(row.avg_rating, 9), row.rating_count)
+        for row in db.execute(select(aggregates))
+    }
+
+
+def _daily(db) -> dict[tuple[int, date, int], int]:
+    return {
+        (row.movie_id, row.day, row.score): row.ratings_count
+        for row in db.execute(select(MovieRatingDaily)).scalars()
+    }
+
+
+def test_cutoff_is_utc_midnight():
+    assert compaction_cutoff(30, NOW) == datetime(2025, 5, 11, tzinfo=timezone.utc)
+    local = NOW.astimezone(timezone(timedelta(hours=-8)))
+    assert compaction_cutoff(30, local) == datetime(2025, 5, 11, tzinfo=timezone.utc)
+
+
+def test_compaction_moves_old_ratings_without_changing_aggregates(catalog, db, session_factory):
+    cutoff = compaction_cutoff(30, NOW)
+    with db.begin():
+        db.execute(
+            insert(MovieRating),
+            [
+                {"movie_id": 2, "score": 9, "created_at": cutoff - timedelta(seconds=1)},
+                {"movie_id": 2, "score": 9, "created_at": cutoff - timedelta(hours=3)},
+                {"movie_id": 2, "score": 4, "created_at": cutoff},
+                {"movie_id": 8, "score": 6, "created_at": NOW},
+            ],
+        )
+    before = _aggregates(db)
+    raw_before = db.execute(select(func.count()).select_from(MovieRating)).scalar_one()
+
+    result = compact_ratings(session_factory, older_than_days=30, batch_size=4, now=NOW)
+
+    # The catalog's ratings (2025-01-15) and the two from the day before the
+    # cutoff are compacted; ratings from the cutoff day on are kept.
+    assert result.ratings == raw_before - 2
+    assert result.batches == -(-result.ratings // 4)
+    remaining = db.execute(select(MovieRating.movie_id, MovieRating.score).order_by(MovieRating.score)).all()
+    assert [tuple(row) for row in remaining] == [(2, 4), (8, 6)]
+    daily = _daily(db)
+    assert daily[(2, (cutoff - timedelta(days=1)).date(), 9)] == 2
+    assert daily[(3, date(2025, 1, 15), 9)] == 1
+    assert sum(daily.values()) == result.ratings
+    assert _aggregates(db) == before
+
+
+def test_compacting_again_adds_to_existing_summaries(catalog, db, session_factory):
+    compact_ratings(session_factory, older_than_days=30, now=NOW)
+    with db.begin():
+        db.execute(
+            insert(MovieRating),
+            [{"movie_id": 1, "score": 9, "created_at": datetime(2025, 1, 15, 20, tzinfo=timezone.utc)}],
+        )
+    before = _aggregates(db)
+
+    result = compact_ratings(session_factory, older_than_days=30, now=NOW)
+
+    assert result.ratings == 1
+    assert _daily(db)[(1, date(2025, 1, 15), 9)] == 2
+    assert _aggregates(db) == before
+    assert compact_ratings(session_factory, older_than_days=30, now=NOW).ratings == 0
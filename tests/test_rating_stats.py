@@ -0,0 +1,68 @@
+from sqlalchemy import func, select
+
+from app.models import MovieRatingStatShard, MovieRatingStats
+from app.repositories.directors_repository import DirectorsRepository
+from app.repositories.rating_stats import RatingStatsRepository
+from app.services.rating_stats import merge_rating_shards
+
+
+def _stats(db, movie_id: int) -> tuple[int, int]:
+    row = db.get(MovieRatingStats, movie_id)
+    db.expire_all()
+    return row.ratings_count, row.ratings_sum
+
+
+def _pending(db) -> tuple[int, int]:
+    return tuple(
+        db.execute(
+            select(
+                func.coalesce(func.sum(MovieRatingStatShard.ratings_count), 0),
+                func.coalesce(func.sum(MovieRatingStatShard.ratings_sum), 0),
+            )
+        ).one()
+    )
+
+
+def test_sharded_ratings_are_merged_into_stats(catalog, db, session_factory):
+    repository = RatingStatsRepository(db)
+    for score in (10, 6, 8, 4, 7):
+        repository.add(8, score, shards=4)
+    repository.add(1, 5, shards=4)
+    db.commit()
+
+    assert _stats(db, 8) == (0, 0)
+    assert _pending(db) == (6, 40)
+    # Director totals count pending shards before they are merged.
+    assert DirectorsRepository(db).get_career_stats(1)["ratings_count"] == 16
+
+    shard_rows = db.execute(select(func.count()).select_from(MovieRatingStatShard)).scalar_one()
+    result = merge_rating_shards(session_factory, batch_size=2)
+
+    assert result.shard_rows == shard_rows
+    assert result.batches == -(-shard_rows // 2)
+    assert _stats(db, 8) == (5, 35)
+    assert _stats(db, 1) == (3, 22)
+    assert _pending(db) == (0, 0)
+    assert DirectorsRepository(db).get_career_stats(1)["ratings_count"] == 16
+
+
+def test_merge_keeps_increments_made_after_the_claim(catalog, db):
+    repository = RatingStatsRepository(db)
+    repository.add(8, 9, shards=1)
+    db.commit()
+
+    claimed = repository.claim_shards(10)
+    # A rating that lands between the claim and the subtraction (possible
+    # where the claim does not lock, as on SQLite) must survive the merge.
+    repository.add(8, 3, shards=1)
+    repository.add_to_stats([{"movie_id": 8, "ratings_count": 1, "ratings_sum": 9}])
+    repository.subtract_from_shards(claimed)
+    db.commit()
+
+    assert _stats(db, 8) == (1, 9)
+    assert _pending(db) == (1, 3)
+
+
+def test_merge_with_nothing_pending(catalog, session_factory):
+    result = merge_rating_shards(session_factory)
+    assert (result.shard_rows, result.batches) == (0, 0)
@@ -0,0 +1,110 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services import similarity  # noqa: E402
+from app.services.similarity import (  # noqa: E402
+    DEFAULT_WEIGHTS,
+    Features,
+    _normalize_rows,
+    build_index,
+    update_index,
+)
+
+similarity._require_numpy()
+
+
+def _features(ids, seed: int) -> Features:
+    rng = np.random.default_rng(seed)
+    ids = np.asarray(ids, dtype=np.int32)
+    genres = (rng.random((len(ids), 6)) < 0.4).astype(np.float32)
+    ratings = rng.integers(0, 5, size=(len(ids), 10)).astype(np.float32)
+    directors = rng.integers(1, 6, size=len(ids)).astype(np.int32)
+    return Features(ids, directors, _normalize_rows(genres), _normalize_rows(ratings))
+
+
+def _brute_force(features: Features) -> "np.ndarray":
+    """Full similarity matrix, self-pairs excluded."""
+    w = DEFAULT_WEIGHTS
+    scores = w["genre"] * (features.genres @ features.genres.T)
+    scores += w["rating"] * (features.ratings @ features.ratings.T)
+    scores += w["director"] * (features.directors[:, None] == features.directors[None, :])
+    np.fill_diagonal(scores, -np.inf)
+    return scores
+
+
+def _assert_rows_match(index, features, rows):
+    """Stored scores are the true top-k and every stored pair scores what it claims."""
+    k = index.dtype["neighbors"].shape[0]
+    full = _brute_force(features)
+    position = {int(movie_id): row for row, movie_id in enumerate(features.ids)}
+    for row in rows:
+        expected = np.sort(full[row])[::-1][:k]
+        expected = expected[np.isfinite(expected)]
+        entry = index[row]
+        valid = entry["neighbors"] >= 0
+        assert valid.sum() == len(expected)
+        np.testing.assert_allclose(entry["scores"][valid], expected, rtol=1e-5, atol=1e-6)
+        assert np.isnan(entry["scores"][~valid]).all()
+        pairs = [full[row, position[int(neighbor)]] for neighbor in entry["neighbors"][valid]]
+        np.testing.assert_allclose(entry["scores"][valid], pairs, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("block_cells", [1, 64, 1 << 23])
+@pytest.mark.parametrize("batch_size", [1, 7, 512])
+def test_build_matches_brute_force(monkeypatch, block_cells, batch_size):
+    monkeypatch.setattr(similarity, "_BLOCK_CELLS", block_cells)
+    features = _features(range(1, 54), seed=1)
+    index = build_index(features, k=5, batch_size=batch_size)
+    assert index["id"].tolist() == features.ids.tolist()
+    _assert_rows_match(index, features, range(len(features.ids)))
+
+
+def test_build_pads_rows_when_there_are_fewer_movies_than_k(monkeypatch):
+    monkeypatch.setattr(similarity, "_BLOCK_CELLS", 4)
+    features = _features(range(1, 5), seed=2)
+    index = build_index(features, k=6, batch_size=2)
+    assert (index["neighbors"][:, 3:] == -1).all()
+    _assert_rows_match(index, features, range(4))
+
+
+def test_update_without_changes_keeps_the_index(monkeypatch):
+    monkeypatch.setattr(similarity, "_BLOCK_CELLS", 64)
+    features = _features(range(1, 41), seed=3)
+    index = build_index(features, k=5, batch_size=7)
+    updated = update_index(index, features, [], batch_size=7)
+    assert updated.tobytes() == index.tobytes()
+
+
+def test_update_covers_changed_added_and_removed_movies(monkeypatch):
+    monkeypatch.setattr(similarity, "_BLOCK_CELLS", 64)
+    old = _features(range(1, 41), seed=4)
+    existing = build_index(old, k=5, batch_size=7)
+
+    removed, changed, added = [3, 17], [5, 20], [41, 42, 43]
+    kept = [movie_id for movie_id in old.ids.tolist() if movie_id not in removed]
+    new = _features(kept + added, seed=5)
+    # Unchanged movies keep their features; 41 is a duplicate of movie 10.
+    for row, movie_id in enumerate(new.ids.tolist()):
+        if movie_id in changed or movie_id in (42, 43):
+            continue
+        old_row = (10 if movie_id == 41 else movie_id) - 1
+        new.genres[row] = old.genres[old_row]
+        new.ratings[row] = old.ratings[old_row]
+        new.directors[row] = old.directors[old_row]
+
+    updated = update_index(existing, new, changed, batch_size=7)
+
+    assert updated["id"].tolist() == new.ids.tolist()
+    assert not np.isin(updated["neighbors"], removed).any()
+    position = {int(movie_id): row for row, movie_id in enumerate(new.ids)}
+    _assert_rows_match(updated, new, [position[movie_id] for movie_id in changed + added])
+    # Every remaining row lists valid pairs, best first, possibly fewer than k.
+    full = _brute_force(new)
+    for row, entry in enumerate(updated):
+        valid = entry["neighbors"] >= 0
+        assert (np.diff(entry["scores"][valid]) <= 1e-6).all()
+        pairs = [full[row, position[int(neighbor)]] for neighbor in entry["neighbors"][valid]]
+        np.testing.assert_allclose(entry["scores"][valid], pairs, rtol=1e-5, atol=1e-6)
+    # The added duplicate was folded into its twin's row as the best match.
+    assert updated[position[10]]["neighbors"][0] == 41
@@ -0,0 +1,160 @@
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.resilience import circuit_breaker, stale
+from app.resilience.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, database_breaker
+from app.services.movies_service import MoviesService, configure_stale_reads
+
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+class _Clock:
+    """Stands in for the `time` module: monotonic time plus a settable offset."""
+
+    def __init__(self) -> None:
+        self.offset = 0.0
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.offset
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(circuit_breaker, "time", fake)
+    monkeypatch.setattr(stale, "time", fake)
+    return fake
+
+
+def test_breaker_opens_then_half_opens_then_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout_s=10)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.offset += 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time while half-open.
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout_s=10)
+    breaker.record_failure()
+    clock.offset += 10
+    assert breaker.allow() and breaker.state == HALF_OPEN
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_the_reset_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout_s=10)
+    breaker.record_failure()
+    clock.offset += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    clock.offset += 10
+    assert breaker.allow()
+
+
+@pytest.fixture
+def stale_reads(client):
+    configure_stale_reads(
+        enabled=True,
+        budget_ms=50,
+        max_age_s=3600,
+        max_entries=100,
+        failure_threshold=5,
+        reset_timeout_s=30,
+    )
+    yield client
+    configure_stale_reads(
+        enabled=False,
+        budget_ms=300,
+        max_age_s=3600,
+        max_entries=2048,
+        failure_threshold=5,
+        reset_timeout_s=30,
+    )
+    database_breaker.record_success()
+
+
+def _patch_detail(monkeypatch, before):
+    original = MoviesService._get_movie_detail
+
+    def detail(self, movie_id):
+        before()
+        return original(self, movie_id)
+
+    monkeypatch.setattr(MoviesService, "_get_movie_detail", detail)
+
+
+def test_slow_read_is_answered_from_the_last_known_good_value(stale_reads, clock, monkeypatch):
+    fresh = stale_reads.get("/api/v1/movies/1")
+    assert fresh.status_code == 200
+    assert "Warning" not in fresh.headers
+
+    clock.offset += 120
+    _patch_detail(monkeypatch, lambda: time.sleep(0.3))
+    response = stale_reads.get("/api/v1/movies/1")
+    assert response.status_code == 200
+    assert response.headers["Warning"] == STALE_WARNING
+    assert response.headers["Age"] == "120"
+    assert response.json() == fresh.json()
+
+    # The slow read kept going and refreshed the cache when it finished.
+    time.sleep(0.5)
+    refreshed = stale_reads.get("/api/v1/movies/1")
+    assert refreshed.headers["Warning"] == STALE_WARNING
+    assert refreshed.headers["Age"] == "0"
+
+
+def test_database_error_is_answered_from_the_last_known_good_value(stale_reads, monkeypatch):
+    fresh = stale_reads.get("/api/v1/movies/1")
+    assert fresh.status_code == 200
+
+    def fail():
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    _patch_detail(monkeypatch, fail)
+    response = stale_reads.get("/api/v1/movies/1")
+    assert response.status_code == 200
+    assert response.headers["Warning"] == STALE_WARNING
+    assert "Age" in response.headers
+    assert response.json() == fresh.json()
+
+
+def test_open_breaker_serves_cached_values_and_sheds_the_rest(stale_reads, monkeypatch):
+    assert stale_reads.get("/api/v1/movies/1").status_code == 200
+    for _ in range(database_breaker.failure_threshold):
+        database_breaker.record_failure()
+
+    def unreachable():
+        raise AssertionError("the open breaker should not query the database")
+
+    _patch_detail(monkeypatch, unreachable)
+    cached = stale_reads.get("/api/v1/movies/1")
+    assert cached.status_code == 200
+    assert cached.headers["Warning"] == STALE_WARNING
+    assert stale_reads.get("/api/v1/movies/2").status_code == 503
+
+
+def test_reads_are_fresh_while_disabled(client, monkeypatch):
+    assert client.get("/api/v1/movies/1").status_code == 200
+    _patch_detail(monkeypatch, lambda: time.sleep(0.1))
+    response = client.get("/api/v1/movies/1")
+    assert response.status_code == 200
+    assert "Warning" not in response.headers